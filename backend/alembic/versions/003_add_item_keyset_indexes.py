@@ -0,0 +1,26 @@
+"""Add composite indexes for keyset pagination of items.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "003"
+down_revision: str | Sequence[str] | None = "002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_items_name_id", "items", ["name", "id"], unique=False)
+    op.create_index("ix_items_price_id", "items", ["price", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_price_id", table_name="items")
+    op.drop_index("ix_items_name_id", table_name="items")
@@ -0,0 +1,39 @@
+"""Add a sequence-backed version column to items for ETags.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "004"
+down_revision: str | Sequence[str] | None = "003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("items_version_seq")))
+    # nextval() is volatile, so existing rows each get their own version
+    op.add_column(
+        "items",
+        sa.Column(
+            "version",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('items_version_seq')"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_items_version", "items", ["version"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_version", table_name="items")
+    op.drop_column("items", "version")
+    op.execute(sa.schema.DropSequence(sa.Sequence("items_version_seq")))
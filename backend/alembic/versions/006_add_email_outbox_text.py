@@ -0,0 +1,26 @@
+"""Add a plaintext part to email_outbox.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "006"
+down_revision: str | Sequence[str] | None = "005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("email_outbox", sa.Column("text_content", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("email_outbox", "text_content")
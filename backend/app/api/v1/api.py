@@ -2,9 +2,18 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, health, items
+from app.api.v1.endpoints import admin, auth, health, items
 
-api_router = APIRouter()
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(health.router, prefix="/health", tags=["health"])
-api_router.include_router(items.router, prefix="/items", tags=["items"])
+
+def build_api_router(use_async: bool = False) -> APIRouter:
+    """Aggregate the v1 routers, using the async-engine handlers when requested."""
+    api_router = APIRouter()
+    for module, prefix, tag in (
+        (admin, "/admin", "admin"),
+        (auth, "/auth", "auth"),
+        (health, "/health", "health"),
+        (items, "/items", "items"),
+    ):
+        router = module.async_router if use_async else module.router
+        api_router.include_router(router, prefix=prefix, tags=[tag])
+    return api_router
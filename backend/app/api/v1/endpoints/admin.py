@@ -0,0 +1,114 @@
+"""Admin endpoints."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.v1.endpoints.auth import get_current_active_user, get_current_active_user_async
+from app.core.config import settings
+from app.core.exceptions import ForbiddenException, ServiceUnavailableException
+from app.core.log_sampling import access_log_policy, rules_from_dict, rules_to_dict
+from app.core.logging import get_logger
+from app.schemas.admin import LogSamplingConfig
+from app.schemas.auth import User as UserSchema
+
+router = APIRouter()
+async_router = APIRouter()
+logger = get_logger(__name__)
+
+
+def _require_admin(user: UserSchema) -> UserSchema:
+    if user.username not in settings.ADMIN_USERNAMES:
+        logger.warning("admin_access_denied", username=user.username)
+        raise ForbiddenException("Admin access required")
+    return user
+
+
+def require_admin(
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
+) -> UserSchema:
+    """Allow only users listed in ADMIN_USERNAMES."""
+    return _require_admin(current_user)
+
+
+async def require_admin_async(
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+) -> UserSchema:
+    """Allow only users listed in ADMIN_USERNAMES (async engine)."""
+    return _require_admin(current_user)
+
+
+def _current_config() -> LogSamplingConfig:
+    return LogSamplingConfig.model_validate(rules_to_dict(access_log_policy.rules))
+
+
+async def _read_config(request: Request) -> LogSamplingConfig:
+    store = request.app.state.log_rules_store
+    if store is not None:
+        # Another worker may have changed them since this one last synced
+        try:
+            await run_in_threadpool(access_log_policy.sync, store)
+        except store.errors as exc:
+            logger.warning("log_sampling_sync_failed", error=str(exc))
+    return _current_config()
+
+
+async def _apply_config(
+    request: Request, config: LogSamplingConfig, admin: UserSchema
+) -> LogSamplingConfig:
+    rules = rules_from_dict(config.model_dump())
+    store = request.app.state.log_rules_store
+    if store is not None:
+        try:
+            await run_in_threadpool(store.save, rules)
+        except store.errors as exc:
+            logger.error("log_sampling_save_failed", error=str(exc))
+            raise ServiceUnavailableException("Logging rules could not be saved") from exc
+    access_log_policy.update(rules)
+    logger.info(
+        "log_sampling_updated",
+        username=admin.username,
+        shared=store is not None,
+        **config.model_dump(),
+    )
+    return _current_config()
+
+
+@router.get("/logging", response_model=LogSamplingConfig)
+async def read_log_sampling(request: Request, admin: Annotated[UserSchema, Depends(require_admin)]):
+    """Current access-log sampling rules and per-route log levels."""
+    return await _read_config(request)
+
+
+@async_router.get("/logging", response_model=LogSamplingConfig)
+async def read_log_sampling_async(
+    request: Request, admin: Annotated[UserSchema, Depends(require_admin_async)]
+):
+    """Current access-log sampling rules and per-route log levels."""
+    return await _read_config(request)
+
+
+@router.put("/logging", response_model=LogSamplingConfig)
+async def update_log_sampling(
+    request: Request,
+    config: LogSamplingConfig,
+    admin: Annotated[UserSchema, Depends(require_admin)],
+):
+    """Replace the logging rules; takes effect immediately in this worker.
+
+    With LOG_RULES_BACKEND=redis the rules are saved for every worker, which
+    adopt them within LOG_RULES_SYNC_SECONDS; with ``memory`` they apply to
+    this worker process only.
+    """
+    return await _apply_config(request, config, admin)
+
+
+@async_router.put("/logging", response_model=LogSamplingConfig)
+async def update_log_sampling_async(
+    request: Request,
+    config: LogSamplingConfig,
+    admin: Annotated[UserSchema, Depends(require_admin_async)],
+):
+    """Replace the logging rules (see ``update_log_sampling``)."""
+    return await _apply_config(request, config, admin)
@@ -1,68 +1,162 @@
 """Authentication endpoints."""
 
+import time
 from datetime import UTC, datetime, timedelta
 from typing import Annotated
 from uuid import uuid4
 
 import jwt
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt import PyJWTError as JWTError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.invalidation import create_invalidation_log
 from app.core.logging import get_logger
 from app.core.security import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
-    get_password_hash,
-    verify_password,
+    needs_rehash,
+    password_hasher,
+)
+from app.database import (
+    get_async_db,
+    get_async_read_db,
+    get_db,
+    get_read_db,
+    violated_constraint,
 )
-from app.database import get_db
 from app.models import User
 from app.schemas.auth import SignupResponse, Token, UserSignup
 from app.schemas.auth import User as UserSchema
-from app.services.email import send_confirmation_email
+from app.services.email_outbox import add_email
+from app.services.email_templates import render
 
 router = APIRouter()
+async_router = APIRouter()
 logger = get_logger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+# Issued tokens must not be stored by caches (RFC 6749 section 5.1)
+TOKEN_CACHE_CONTROL = "no-store"
 
 
-def get_current_active_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
-) -> User:
-    """Get current active user from token."""
-    credentials_exception = HTTPException(
+# Principals keyed by (token subject, token id); cleared when a user's status changes
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+# With PRINCIPAL_CACHE_INVALIDATION=redis, invalidations reach every worker through Redis
+principal_invalidations = create_invalidation_log(
+    settings.PRINCIPAL_CACHE_INVALIDATION, settings.REDIS_URL, key="principal-invalidations"
+)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> dict:
+    """Validate a bearer token and return its claims."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        username: str | None = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception from None
+        raise _credentials_exception() from None
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _principal_key(payload: dict) -> tuple[str, str | None]:
+    return payload["sub"], payload.get("jti")
+
+
+def _cached_principal(payload: dict) -> UserSchema | None:
+    return principal_cache.get(_principal_key(payload))
+
 
+def _cache_principal(payload: dict, principal: UserSchema) -> None:
+    # Never keep a principal past its token's expiry
+    remaining = payload["exp"] - time.time() if "exp" in payload else None
+    principal_cache.set(_principal_key(payload), principal, ttl=remaining)
+
+
+def drop_principal(username: str) -> None:
+    """Drop a user's cached principals from this process's cache."""
+    principal_cache.delete_matching(lambda key: key[0] == username)
+
+
+def invalidate_principal(username: str) -> None:
+    """Drop cached principals for a user, e.g. after activation or deactivation.
+
+    Call it after committing any change to a user. Other workers drop theirs
+    within PRINCIPAL_CACHE_SYNC_SECONDS with PRINCIPAL_CACHE_INVALIDATION=redis,
+    otherwise when their entries expire. Blocks on Redis when shared.
+    """
+    drop_principal(username)
+    if principal_invalidations is None:
+        return
+    try:
+        principal_invalidations.publish(username)
+    except principal_invalidations.errors as exc:
+        logger.warning("principal_invalidation_failed", username=username, error=str(exc))
+
+
+def _load_principal(db: Session, username: str) -> UserSchema:
+    """Look up the user a token was issued for."""
     user = db.query(User).filter(User.username == username).first()
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    return _user_info(user)
 
 
-@router.post("/login", response_model=Token)
-def login(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
-):
-    """Login endpoint to get access token."""
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        logger.warning("login_failed", username=form_data.username)
+def get_current_active_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_read_db),
+) -> UserSchema:
+    """Get current active user from token.
+
+    Repeat requests with the same token are served from the principal cache
+    without touching the database.
+    """
+    payload = _decode_token(token)
+    principal = _cached_principal(payload)
+    if principal is None:
+        principal = _load_principal(db, payload["sub"])
+        _cache_principal(payload, principal)
+    return principal
+
+
+async def get_current_active_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_read_db),
+) -> UserSchema:
+    """Get current active user from token (async engine)."""
+    payload = _decode_token(token)
+    principal = _cached_principal(payload)
+    if principal is None:
+        principal = await db.run_sync(_load_principal, payload["sub"])
+        _cache_principal(payload, principal)
+    return principal
+
+
+def _get_user_by_username(db: Session, username: str) -> User | None:
+    return db.query(User).filter(User.username == username).first()
+
+
+def _issue_token(user: User | None, password_ok: bool, username: str) -> dict:
+    """Check login outcome and issue an access token."""
+    if not user or not password_ok:
+        logger.warning("login_failed", username=username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -70,7 +164,7 @@ def login(
         )
 
     if not user.is_active:
-        logger.warning("login_inactive", username=form_data.username)
+        logger.warning("login_inactive", username=username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Account not activated. Please confirm your email.",
@@ -86,68 +180,173 @@ def login(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+async def _check_password(user: User | None, password: str) -> bool:
+    return user is not None and await password_hasher.verify(password, user.hashed_password)
+
+
+def _store_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+async def _rehashed_password(user: User, password: str) -> str | None:
+    """New hash at the configured cost if the stored one differs, else None."""
+    if not needs_rehash(user.hashed_password):
+        return None
+    try:
+        return await password_hasher.hash(password)
+    except ServiceUnavailableException:
+        # The login itself succeeded; upgrade the hash on a later login
+        logger.info("password_rehash_deferred", username=user.username)
+        return None
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    response: Response,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Login endpoint to get access token.
+
+    Async so the bcrypt check waits on the password hasher pool rather than
+    holding a shared threadpool slot; the query still runs in the threadpool.
+    A hash stored at a cost other than BCRYPT_ROUNDS is replaced. The token
+    is sent ``no-store``, so neither caches nor Idempotency-Key replays keep it.
+    """
+    response.headers["Cache-Control"] = TOKEN_CACHE_CONTROL
+    user = await run_in_threadpool(_get_user_by_username, db, form_data.username)
+    password_ok = await _check_password(user, form_data.password)
+    token = _issue_token(user, password_ok, form_data.username)
+    if hashed_password := await _rehashed_password(user, form_data.password):
+        await run_in_threadpool(_store_password_hash, db, user, hashed_password)
+        logger.info("password_rehashed", username=user.username)
+    return token
+
+
+@async_router.post("/login", response_model=Token)
+async def login_async(
+    response: Response,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Login endpoint to get access token."""
+    response.headers["Cache-Control"] = TOKEN_CACHE_CONTROL
+    user = await db.run_sync(_get_user_by_username, form_data.username)
+    password_ok = await _check_password(user, form_data.password)
+    token = _issue_token(user, password_ok, form_data.username)
+    if hashed_password := await _rehashed_password(user, form_data.password):
+        await db.run_sync(_store_password_hash, user, hashed_password)
+        logger.info("password_rehashed", username=user.username)
+    return token
+
+
+def _user_info(user: User) -> UserSchema:
+    return UserSchema(
+        username=user.username,
+        email=user.email,
+        is_active=user.is_active,
+    )
+
+
 @router.get("/me", response_model=UserSchema)
 def read_users_me(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
 ):
     """Get current authenticated user info."""
-    return UserSchema(
-        username=current_user.username,
-        email=current_user.email,
-        is_active=current_user.is_active,
-    )
+    return current_user
 
 
-@router.post("/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
-def signup(
-    user_data: UserSignup,
-    db: Session = Depends(get_db),
+@async_router.get("/me", response_model=UserSchema)
+async def read_users_me_async(
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
 ):
-    """Register a new user and send confirmation email."""
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken",
-        )
+    """Get current authenticated user info."""
+    return current_user
 
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
 
+# Unique indexes from 001_initial, and the error a signup violating each gets
+SIGNUP_CONFLICTS = {
+    "ix_users_username": "Username already taken",
+    "ix_users_email": "Email already registered",
+}
+
+
+def _create_user(db: Session, user_data: UserSignup, hashed_password: str) -> None:
+    """Insert an inactive user and, in the same transaction, its confirmation email.
+
+    No lookups first: the unique indexes reject a taken username or email, in
+    the INSERT itself, and the violated index picks the error.
+    """
     confirmation_token = str(uuid4())
     token_expires = datetime.now(UTC) + timedelta(hours=24)
 
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         is_active=False,
         confirmation_token=confirmation_token,
         confirmation_token_expires=token_expires,
     )
 
+    confirmation_url = f"{settings.CORS_ORIGINS[0]}/confirm-signup?token={confirmation_token}"
+
+    email = render(
+        "confirmation",
+        user_data.email,
+        username=user_data.username,
+        confirmation_url=confirmation_url,
+    )
+
     db.add(new_user)
-    db.commit()
+    add_email(db, email.to_email, email.subject, email.html_content, email.text_content)
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        conflict = violated_constraint(exc, SIGNUP_CONFLICTS)
+        if conflict is None:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=SIGNUP_CONFLICTS[conflict],
+        ) from None
 
-    confirmation_url = f"{settings.CORS_ORIGINS[0]}/confirm-signup?token={confirmation_token}"
-    send_confirmation_email(user_data.email, user_data.username, confirmation_url)
 
+def _signup_response(user_data: UserSignup) -> SignupResponse:
     logger.info("user_signed_up", username=user_data.username, email=user_data.email)
     return SignupResponse(
         message="Account created. Please check your email to confirm your account."
     )
 
 
-@router.get("/confirm/{token}")
-def confirm_signup(
-    token: str,
+@router.post("/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
+async def signup(
+    user_data: UserSignup,
     db: Session = Depends(get_db),
 ):
-    """Confirm user email and activate account."""
+    """Register a new user and queue their confirmation email."""
+    hashed_password = await password_hasher.hash(user_data.password)
+    await run_in_threadpool(_create_user, db, user_data, hashed_password)
+    return _signup_response(user_data)
+
+
+@async_router.post(
+    "/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED
+)
+async def signup_async(
+    user_data: UserSignup,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Register a new user and queue their confirmation email."""
+    hashed_password = await password_hasher.hash(user_data.password)
+    await db.run_sync(_create_user, user_data, hashed_password)
+    return _signup_response(user_data)
+
+
+def _confirm_signup(db: Session, token: str) -> tuple[dict, str | None]:
+    """Activate the user holding ``token``; also return their username if it changed."""
     user = db.query(User).filter(User.confirmation_token == token).first()
 
     if not user:
@@ -157,7 +356,7 @@ def confirm_signup(
         )
 
     if user.is_active:
-        return {"message": "Account already confirmed"}
+        return {"message": "Account already confirmed"}, None
 
     if user.confirmation_token_expires and user.confirmation_token_expires < datetime.now(UTC):
         raise HTTPException(
@@ -171,4 +370,28 @@ def confirm_signup(
     db.commit()
 
     logger.info("user_confirmed", username=user.username)
-    return {"message": "Account confirmed successfully"}
+    return {"message": "Account confirmed successfully"}, user.username
+
+
+@router.get("/confirm/{token}")
+def confirm_signup(
+    token: str,
+    db: Session = Depends(get_db),
+):
+    """Confirm user email and activate account."""
+    result, confirmed = _confirm_signup(db, token)
+    if confirmed:
+        invalidate_principal(confirmed)
+    return result
+
+
+@async_router.get("/confirm/{token}")
+async def confirm_signup_async(
+    token: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Confirm user email and activate account."""
+    result, confirmed = await db.run_sync(_confirm_signup, token)
+    if confirmed:
+        await run_in_threadpool(invalidate_principal, confirmed)
+    return result
@@ -1,23 +1,35 @@
 """Health check endpoints."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
 
 from app.core.logging import get_logger
-from app.database import get_db
+from app.core.pool import pool_status
+from app.core.replicas import ReplicaSet
+from app.core.security import password_hasher
+from app.database import get_async_db, get_db
 
 router = APIRouter()
+async_router = APIRouter()
 logger = get_logger(__name__)
 
 
 @router.get("/")
+@async_router.get("/")
 async def health_check():
     """Basic health check (no DB)."""
     logger.debug("health_check_called")
     return {"status": "healthy"}
 
 
+def _database_unhealthy(e: Exception) -> dict:
+    logger.error("database_health_check_failed", error=str(e))
+    return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+
+
 @router.get("/db")
 def health_check_db(db: Session = Depends(get_db)):
     """Health check that verifies database connection."""
@@ -25,5 +37,45 @@ def health_check_db(db: Session = Depends(get_db)):
         db.execute(text("SELECT 1"))
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
-        logger.error("database_health_check_failed", error=str(e))
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+        return _database_unhealthy(e)
+
+
+@async_router.get("/db")
+async def health_check_db_async(db: AsyncSession = Depends(get_async_db)):
+    """Health check that verifies database connection."""
+    try:
+        await db.execute(text("SELECT 1"))
+        return {"status": "healthy", "database": "connected"}
+    except Exception as e:
+        return _database_unhealthy(e)
+
+
+def _pool_report(pool: Pool, replica_set: ReplicaSet) -> dict:
+    report = pool_status(pool)
+    if replica_set:
+        report["replicas"] = [
+            {**status, **pool_status(replica.engine.pool)}
+            for status, replica in zip(replica_set.status(), replica_set.replicas, strict=True)
+        ]
+    return report
+
+
+@router.get("/pool")
+def health_check_pool(request: Request):
+    """Connection pool gauges (checked out, overflow, checkout waits, timeouts)."""
+    database = request.app.state.database
+    return _pool_report(database.engine.pool, database.replicas)
+
+
+@async_router.get("/pool")
+async def health_check_pool_async(request: Request):
+    """Connection pool gauges (checked out, overflow, checkout waits, timeouts)."""
+    database = request.app.state.database
+    return _pool_report(database.async_engine.pool, database.async_replicas)
+
+
+@router.get("/hasher")
+@async_router.get("/hasher")
+async def health_check_hasher():
+    """Password hashing pool load (in flight, completed, rejected with 503)."""
+    return password_hasher.stats()
@@ -5,88 +5,679 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    Float,
+    Integer,
+    String,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.v1.endpoints.auth import get_current_active_user
+from app.api.v1.endpoints.auth import get_current_active_user, get_current_active_user_async
+from app.core.config import settings
+from app.core.etag import (
+    digest,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_validators,
+    strip_encoding,
+)
 from app.core.logging import get_logger
-from app.database import get_db
-from app.models import Item, User
-from app.schemas.item import ItemCreate, ItemResponse
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.replicas import use_primary
+from app.core.response_cache import cache_key, response_cache
+from app.core.responses import FastJSONResponse, PydanticJSONResponse
+from app.database import get_async_db, get_async_read_db, get_db, get_read_db
+from app.models import Item
+from app.schemas.auth import User as UserSchema
+from app.schemas.item import (
+    ItemBulkDelete,
+    ItemBulkResponse,
+    ItemBulkResult,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemListQuery,
+    ItemResponse,
+)
+from app.services.export import MEDIA_TYPES, aiter_export, iter_export
 
 router = APIRouter()
+async_router = APIRouter()
 logger = get_logger(__name__)
 
+# Sortable columns; each has a (column, id) index so pages are index range scans
+SORT_COLUMNS = {"id": Item.id, "name": Item.name, "price": Item.price}
+SORT_KEY_TYPES = {"id": (int,), "name": (str,), "price": (int, float)}
 
-@router.get("/{item_id}")
-def read_item(
-    item_id: int,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+# Response cache tags: every list page is tagged ITEMS_TAG, each item "item:<id>"
+ITEMS_TAG = "items"
+
+EXPORT_FIELDS = ("item_id", "name", "price", "description")
+EXPORT_FORMAT = Query(pattern=r"^(ndjson|csv)$")
+
+
+def _item_tag(item_id: int) -> str:
+    return f"item:{item_id}"
+
+
+def _write_tags(item_ids) -> tuple[str, ...]:
+    """Cache tags to invalidate after writing ``item_ids``: all lists plus each item."""
+    return (ITEMS_TAG, *(_item_tag(item_id) for item_id in item_ids))
+
+
+def _export_statement():
+    return (
+        select(Item.id, Item.name, Item.price, Item.description)
+        .order_by(Item.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+
+
+def _export_response(chunks, format: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
+    )
+
+
+@router.get("/export")
+def export_items(
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
+    db: Session = Depends(get_read_db),
+    format: Annotated[str, EXPORT_FORMAT] = "ndjson",
+):
+    """Stream every item as NDJSON or CSV.
+
+    Rows are read through a server-side cursor in batches of
+    ``EXPORT_BATCH_SIZE`` and written out as they arrive, so memory use stays
+    flat regardless of table size.
+    """
+    result = db.execute(_export_statement())
+    logger.info("items_export_started", username=current_user.username, format=format)
+    return _export_response(iter_export(format, result.partitions(), EXPORT_FIELDS), format)
+
+
+@async_router.get("/export")
+async def export_items_async(
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_read_db),
+    format: Annotated[str, EXPORT_FORMAT] = "ndjson",
+):
+    """Stream every item as NDJSON or CSV."""
+    result = await db.stream(_export_statement())
+    logger.info("items_export_started", username=current_user.username, format=format)
+    return _export_response(aiter_export(format, result.partitions(), EXPORT_FIELDS), format)
+
+
+BULK_BODY = Body(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+def _create_items_bulk(
+    db: Session, items: list[ItemCreate], current_user: UserSchema
+) -> ItemBulkResponse:
+    """Create many items with one multi-row INSERT ... RETURNING."""
+    rows = db.execute(
+        insert(Item).returning(Item.id, Item.name, Item.price, sort_by_parameter_order=True),
+        [{"name": item.name, "price": item.price} for item in items],
+    ).all()
+    db.commit()
+    logger.info("items_bulk_created", username=current_user.username, count=len(rows))
+    return ItemBulkResponse(
+        results=[
+            ItemBulkResult(
+                index=index, status="created", item_id=row.id, name=row.name, price=row.price
+            )
+            for index, row in enumerate(rows)
+        ]
+    )
+
+
+@router.post("/bulk", response_model=ItemBulkResponse)
+def create_items_bulk(
+    items: Annotated[list[ItemCreate], BULK_BODY],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
     db: Session = Depends(get_db),
 ):
-    """Read an item by ID."""
+    """Create many items in one statement."""
+    result = _create_items_bulk(db, items, current_user)
+    response_cache.invalidate(ITEMS_TAG)
+    return PydanticJSONResponse(result)
+
+
+@async_router.post("/bulk", response_model=ItemBulkResponse)
+async def create_items_bulk_async(
+    items: Annotated[list[ItemCreate], BULK_BODY],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create many items in one statement."""
+    result = await db.run_sync(_create_items_bulk, items, current_user)
+    await response_cache.ainvalidate(ITEMS_TAG)
+    return PydanticJSONResponse(result)
+
+
+def _update_items_bulk(
+    db: Session, items: list[ItemBulkUpdate], current_user: UserSchema
+) -> ItemBulkResponse:
+    """Update many items with one UPDATE ... FROM (VALUES ...) RETURNING."""
+    if len({item.item_id for item in items}) != len(items):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Duplicate item_id in bulk update",
+        )
+
+    changes = values(
+        column("id", Integer), column("name", String), column("price", Float), name="changes"
+    ).data([(item.item_id, item.name, item.price) for item in items])
+    rows = db.execute(
+        update(Item)
+        .where(Item.id == changes.c.id)
+        .values(name=changes.c.name, price=changes.c.price)
+        .returning(Item.id, Item.name, Item.price)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+
+    updated = {row.id: row for row in rows}
+    logger.info("items_bulk_updated", username=current_user.username, count=len(updated))
+    return ItemBulkResponse(
+        results=[
+            ItemBulkResult(
+                index=index,
+                status="updated",
+                item_id=item.item_id,
+                name=updated[item.item_id].name,
+                price=updated[item.item_id].price,
+            )
+            if item.item_id in updated
+            else ItemBulkResult(index=index, status="not_found", item_id=item.item_id)
+            for index, item in enumerate(items)
+        ]
+    )
+
+
+@router.put("/bulk", response_model=ItemBulkResponse)
+def update_items_bulk(
+    items: Annotated[list[ItemBulkUpdate], BULK_BODY],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
+    db: Session = Depends(get_db),
+):
+    """Update many items in one statement."""
+    result = _update_items_bulk(db, items, current_user)
+    response_cache.invalidate(*_write_tags(item.item_id for item in items))
+    return PydanticJSONResponse(result)
+
+
+@async_router.put("/bulk", response_model=ItemBulkResponse)
+async def update_items_bulk_async(
+    items: Annotated[list[ItemBulkUpdate], BULK_BODY],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update many items in one statement."""
+    result = await db.run_sync(_update_items_bulk, items, current_user)
+    await response_cache.ainvalidate(*_write_tags(item.item_id for item in items))
+    return PydanticJSONResponse(result)
+
+
+def _delete_items_bulk(
+    db: Session, payload: ItemBulkDelete, current_user: UserSchema
+) -> ItemBulkResponse:
+    """Delete many items with one DELETE ... WHERE id = ANY(...) RETURNING."""
+    if len(set(payload.ids)) != len(payload.ids):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Duplicate id in bulk delete",
+        )
+
+    deleted = set(
+        db.execute(
+            delete(Item)
+            .where(Item.id == any_(bindparam("ids", payload.ids, type_=ARRAY(Integer))))
+            .returning(Item.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    db.commit()
+    logger.info("items_bulk_deleted", username=current_user.username, count=len(deleted))
+    return ItemBulkResponse(
+        results=[
+            ItemBulkResult(
+                index=index,
+                status="deleted" if item_id in deleted else "not_found",
+                item_id=item_id,
+            )
+            for index, item_id in enumerate(payload.ids)
+        ]
+    )
+
+
+@router.delete("/bulk", response_model=ItemBulkResponse)
+def delete_items_bulk(
+    payload: ItemBulkDelete,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
+    db: Session = Depends(get_db),
+):
+    """Delete many items in one statement."""
+    result = _delete_items_bulk(db, payload, current_user)
+    response_cache.invalidate(*_write_tags(payload.ids))
+    return PydanticJSONResponse(result)
+
+
+@async_router.delete("/bulk", response_model=ItemBulkResponse)
+async def delete_items_bulk_async(
+    payload: ItemBulkDelete,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete many items in one statement."""
+    result = await db.run_sync(_delete_items_bulk, payload, current_user)
+    await response_cache.ainvalidate(*_write_tags(payload.ids))
+    return PydanticJSONResponse(result)
+
+
+def _item_key(item_id: int) -> str:
+    return cache_key("items/{item_id}", item_id=item_id)
+
+
+def _item_etag(item) -> str:
+    """ETag of an ``Item`` or a row with its ``id`` and ``version``."""
+    # version comes from a table-wide sequence, so it alone identifies a row state
+    return make_etag("item", item.id, item.version)
+
+
+def _if_match_versions(if_match: str, item_id: int) -> list[int] | None:
+    """Versions of the item that satisfy ``If-Match``; ``None`` for ``*`` (any version)."""
+    versions = []
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return None
+        # If-Match compares strongly: weak tags never match
+        if candidate.startswith("W/"):
+            continue
+        # A compressed response's tag names the same version
+        kind, _, rest = strip_encoding(candidate).strip('"').partition("-")
+        row_id, _, version = rest.partition("-")
+        if kind == "item" and row_id == str(item_id) and version.isdigit():
+            versions.append(int(version))
+    return versions
+
+
+def _where_item(statement, item_id: int, if_match: str | None):
+    """Restrict a write to the item, and with ``If-Match`` to the versions it names."""
+    statement = statement.where(Item.id == item_id)
+    if if_match is not None:
+        versions = _if_match_versions(if_match, item_id)
+        if versions is not None:
+            statement = statement.where(Item.version.in_(versions))
+    return statement
+
+
+def _missing_item(if_match: str | None) -> HTTPException:
+    """Error for a write that matched no row: 412 if it was conditional, else 404."""
+    if if_match is not None:
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Item has been modified"
+        )
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+
+
+def _cache_source[S: (Session, AsyncSession)](db: S) -> S:
+    """``db`` for a load into the response cache, pinned to the primary when it stores.
+
+    A lagging replica's payload, version and ETag would otherwise be served
+    for the whole TTL after the write that invalidated the entry.
+    """
+    if response_cache.stores:
+        use_primary(db)
+    return db
+
+
+def _read_item(db: Session, item_id: int) -> tuple[dict, str]:
     item = db.query(Item).filter(Item.id == item_id).first()
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    return {"item_id": item.id, "name": item.name, "price": item.price}
+    return {"item_id": item.id, "name": item.name, "price": item.price}, _item_etag(item)
+
+
+def _item_response(cached: tuple[dict, str], if_none_match: str | None) -> Response:
+    payload, etag = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response = FastJSONResponse(payload)
+    set_validators(response, etag)
+    return response
+
+
+@router.get("/{item_id}")
+def read_item(
+    item_id: int,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
+    db: Session = Depends(get_read_db),
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Read an item by ID.
+
+    The response carries a strong ``ETag``; sending it back in
+    ``If-None-Match`` yields ``304 Not Modified`` while the item is unchanged.
+    """
+    cached = response_cache.get_or_load(
+        _item_key(item_id), (_item_tag(item_id),), lambda: _read_item(_cache_source(db), item_id)
+    )
+    return _item_response(cached, if_none_match)
+
+
+@async_router.get("/{item_id}")
+async def read_item_async(
+    item_id: int,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_read_db),
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Read an item by ID."""
+    cached = await response_cache.aget_or_load(
+        _item_key(item_id),
+        (_item_tag(item_id),),
+        lambda: _cache_source(db).run_sync(_read_item, item_id),
+    )
+    return _item_response(cached, if_none_match)
+
+
+def _create_item(db: Session, item: ItemCreate) -> tuple[ItemResponse, str]:
+    """Insert the item with one INSERT ... RETURNING, including its new version."""
+    row = db.execute(
+        insert(Item)
+        .values(name=item.name, price=item.price)
+        .returning(Item.id, Item.name, Item.price, Item.version)
+    ).one()
+    db.commit()
+    logger.info("create_item_called", item_name=item.name, item_price=item.price)
+    return ItemResponse(item_id=row.id, name=row.name, price=row.price), _item_etag(row)
 
 
 @router.post("", response_model=ItemResponse)
 def create_item(
     item: ItemCreate,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    response: Response,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
     db: Session = Depends(get_db),
 ):
     """Create a new item."""
-    db_item = Item(name=item.name, price=item.price)
-    db.add(db_item)
+    result, etag = _create_item(db, item)
+    response_cache.invalidate(ITEMS_TAG)
+    set_validators(response, etag)
+    return result
+
+
+@async_router.post("", response_model=ItemResponse)
+async def create_item_async(
+    item: ItemCreate,
+    response: Response,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new item."""
+    result, etag = await db.run_sync(_create_item, item)
+    await response_cache.ainvalidate(ITEMS_TAG)
+    set_validators(response, etag)
+    return result
+
+
+def _update_item(
+    db: Session, item_id: int, item: ItemCreate, if_match: str | None = None
+) -> tuple[ItemResponse, str]:
+    """Update the item with one UPDATE ... RETURNING.
+
+    ``If-Match`` becomes ``AND version IN (...)``, so the version check and
+    the write are a single atomic statement.
+    """
+    row = db.execute(
+        _where_item(update(Item), item_id, if_match)
+        .values(name=item.name, price=item.price)
+        .returning(Item.id, Item.name, Item.price, Item.version)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        db.rollback()
+        raise _missing_item(if_match)
     db.commit()
-    db.refresh(db_item)
-    logger.info("create_item_called", item_name=item.name, item_price=item.price)
-    return ItemResponse(item_id=db_item.id, name=db_item.name, price=db_item.price)
+    logger.info("item_updated", item_id=item_id, item_name=item.name)
+    return ItemResponse(item_id=row.id, name=row.name, price=row.price), _item_etag(row)
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
 def update_item(
     item_id: int,
     item: ItemCreate,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    response: Response,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
     db: Session = Depends(get_db),
+    if_match: Annotated[str | None, Header()] = None,
+):
+    """Update an item.
+
+    With ``If-Match``, the update only applies if the item still has that
+    ETag; otherwise it fails with ``412 Precondition Failed``.
+    """
+    result, etag = _update_item(db, item_id, item, if_match)
+    response_cache.invalidate(*_write_tags([item_id]))
+    set_validators(response, etag)
+    return result
+
+
+@async_router.put("/{item_id}", response_model=ItemResponse)
+async def update_item_async(
+    item_id: int,
+    item: ItemCreate,
+    response: Response,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_db),
+    if_match: Annotated[str | None, Header()] = None,
 ):
     """Update an item."""
-    db_item = db.query(Item).filter(Item.id == item_id).first()
-    if not db_item:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    db_item.name = item.name
-    db_item.price = item.price
+    result, etag = await db.run_sync(_update_item, item_id, item, if_match)
+    await response_cache.ainvalidate(*_write_tags([item_id]))
+    set_validators(response, etag)
+    return result
+
+
+def _delete_item(db: Session, item_id: int, if_match: str | None = None) -> dict:
+    """Delete the item with one DELETE ... RETURNING, conditional like ``_update_item``."""
+    deleted = db.execute(
+        _where_item(delete(Item), item_id, if_match)
+        .returning(Item.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if deleted is None:
+        db.rollback()
+        raise _missing_item(if_match)
     db.commit()
-    db.refresh(db_item)
-    logger.info("item_updated", item_id=item_id, item_name=item.name)
-    return ItemResponse(item_id=db_item.id, name=db_item.name, price=db_item.price)
+    logger.info("item_deleted", item_id=item_id)
+    return {"message": "Item deleted successfully"}
 
 
 @router.delete("/{item_id}")
 def delete_item(
     item_id: int,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
     db: Session = Depends(get_db),
+    if_match: Annotated[str | None, Header()] = None,
 ):
-    """Delete an item."""
-    db_item = db.query(Item).filter(Item.id == item_id).first()
-    if not db_item:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    db.delete(db_item)
-    db.commit()
-    logger.info("item_deleted", item_id=item_id)
-    return {"message": "Item deleted successfully"}
+    """Delete an item (conditionally, with ``If-Match``)."""
+    result = _delete_item(db, item_id, if_match)
+    response_cache.invalidate(*_write_tags([item_id]))
+    return result
+
+
+@async_router.delete("/{item_id}")
+async def delete_item_async(
+    item_id: int,
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_db),
+    if_match: Annotated[str | None, Header()] = None,
+):
+    """Delete an item (conditionally, with ``If-Match``)."""
+    result = await db.run_sync(_delete_item, item_id, if_match)
+    await response_cache.ainvalidate(*_write_tags([item_id]))
+    return result
+
+
+def _filter_items(query, params: ItemListQuery):
+    if params.min_price is not None:
+        query = query.filter(Item.price >= params.min_price)
+    if params.max_price is not None:
+        query = query.filter(Item.price <= params.max_price)
+    if params.name_from is not None:
+        query = query.filter(Item.name >= params.name_from)
+    if params.name_to is not None:
+        query = query.filter(Item.name < params.name_to)
+    return query
+
+
+def _read_items_page(
+    db: Session, params: ItemListQuery, current_user: UserSchema
+) -> tuple[list[dict], str | None]:
+    """Fetch one page of items and the cursor for the next page, if any."""
+    descending = params.sort.startswith("-")
+    sort_field = params.sort.removeprefix("-")
+    sort_column = SORT_COLUMNS[sort_field]
+
+    query = _filter_items(db.query(Item.id, Item.name, Item.price), params)
+
+    if params.cursor is not None:
+        try:
+            key, last_id = decode_cursor(params.cursor, params.sort)
+            if not isinstance(key, SORT_KEY_TYPES[sort_field]) or isinstance(key, bool):
+                raise ValueError("Cursor key does not match sort column")
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from None
+        if sort_field == "id":
+            query = query.filter(Item.id < last_id if descending else Item.id > last_id)
+        else:
+            position, bound = tuple_(sort_column, Item.id), tuple_(key, last_id)
+            query = query.filter(position < bound if descending else position > bound)
+
+    order_by = [Item.id] if sort_field == "id" else [sort_column, Item.id]
+    if descending:
+        order_by = [column.desc() for column in order_by]
+
+    rows = query.order_by(*order_by).limit(params.limit + 1).all()
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(params.sort, getattr(last, sort_field), last.id)
+
+    logger.info("items_fetched", username=current_user.username, count=len(rows))
+    items = [{"item_id": row.id, "name": row.name, "price": row.price} for row in rows]
+    return items, next_cursor
+
+
+def _collection_version(db: Session, params: ItemListQuery) -> tuple[int, int]:
+    """Highest version and row count among items matching the filters.
+
+    Versions come from one table-wide sequence, so an insert or update of a
+    matching row raises the maximum and a delete (or a row leaving the
+    filter) lowers the count; either changes the collection ETag. No rows
+    are loaded.
+    """
+    query = _filter_items(db.query(func.max(Item.version), func.count(Item.id)), params)
+    max_version, count = query.one()
+    return max_version or 0, count
+
+
+def _version_key(params: ItemListQuery) -> str:
+    filters = params.model_dump(include={"min_price", "max_price", "name_from", "name_to"})
+    return cache_key("items/version", **filters)
+
+
+def _page_key(params: ItemListQuery) -> str:
+    return cache_key("items", **params.model_dump())
+
+
+def _page_etag(params: ItemListQuery, version: tuple[int, int]) -> str:
+    max_version, count = version
+    return make_etag("items", max_version, count, digest(_page_key(params)))
+
+
+def _page_response(page: tuple[list[dict], str | None], etag: str) -> Response:
+    # The cached rows are already JSON-ready dicts; encode them once, with orjson
+    items, next_cursor = page
+    response = FastJSONResponse(items)
+    set_validators(response, etag)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 
 @router.get("")
 def read_items(
-    current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    params: Annotated[ItemListQuery, Query()],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user)],
+    db: Session = Depends(get_read_db),
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Get a page of items using keyset pagination.
+
+    Items are ordered by ``sort`` (prefix with ``-`` for descending) with the
+    item id as tie-breaker. When more rows exist, the ``X-Next-Cursor``
+    response header carries an opaque cursor for the next page. Pages are
+    served from the response cache until an item write invalidates them.
+
+    The ``ETag`` covers every item matching the filters; a matching
+    ``If-None-Match`` is answered with 304 before any page is loaded.
+    """
+    version = response_cache.get_or_load(
+        _version_key(params), (ITEMS_TAG,), lambda: _collection_version(_cache_source(db), params)
+    )
+    etag = _page_etag(params, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    page = response_cache.get_or_load(
+        _page_key(params),
+        (ITEMS_TAG,),
+        lambda: _read_items_page(_cache_source(db), params, current_user),
+    )
+    return _page_response(page, etag)
+
+
+@async_router.get("")
+async def read_items_async(
+    params: Annotated[ItemListQuery, Query()],
+    current_user: Annotated[UserSchema, Depends(get_current_active_user_async)],
+    db: AsyncSession = Depends(get_async_read_db),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    """Get all items for the authenticated user."""
-    items = db.query(Item).all()
-    logger.info("items_fetched", username=current_user.username, count=len(items))
-    return [{"item_id": item.id, "name": item.name, "price": item.price} for item in items]
+    """Get a page of items using keyset pagination."""
+    version = await response_cache.aget_or_load(
+        _version_key(params),
+        (ITEMS_TAG,),
+        lambda: _cache_source(db).run_sync(_collection_version, params),
+    )
+    etag = _page_etag(params, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    page = await response_cache.aget_or_load(
+        _page_key(params),
+        (ITEMS_TAG,),
+        lambda: _cache_source(db).run_sync(_read_items_page, params, current_user),
+    )
+    return _page_response(page, etag)
@@ -0,0 +1,237 @@
+"""Content-negotiated response compression (zstd, brotli, gzip).
+
+A pure ASGI middleware. Bodies sent in one message are compressed in one
+shot if they reach ``minimum_size``; streaming bodies are compressed chunk by
+chunk, each chunk flushed so clients receive data as it is produced.
+Responses that already carry a ``Content-Encoding`` or whose type is already
+compressed (images, archives, ...) pass through untouched. Compressing
+changes the bytes of the representation, so a strong ``ETag`` gets the
+encoding as a suffix (``"item-42-1337-gzip"``): it stays strong, usable in
+``If-Match``, and ``etag_matches`` strips the suffix again.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.etag import encoded_etag
+
+try:
+    import brotli  # optional: uv sync --extra compression
+except ImportError:
+    brotli = None
+
+try:
+    from compression import zstd  # standard library from Python 3.14
+except ImportError:
+    zstd = None
+
+# Content types that are already compressed, or must not be buffered or transformed
+EXCLUDED_CONTENT_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/pdf",
+    "application/octet-stream",
+    "text/event-stream",
+)
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstd.ZstdCompressor(level=level)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data, zstd.ZstdCompressor.FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data, zstd.ZstdCompressor.FLUSH_FRAME)
+
+
+_ENCODERS = {"gzip": _GzipEncoder, "br": _BrotliEncoder, "zstd": _ZstdEncoder}
+
+# Highest levels, for bodies compressed once and served many times
+MAX_LEVELS = {"gzip": 9, "br": 11, "zstd": 19}
+
+
+def compress(data: bytes, encoding: str, level: int | None = None) -> bytes:
+    """``data`` compressed in one shot; ``level`` defaults to the encoding's highest."""
+    return _ENCODERS[encoding](MAX_LEVELS[encoding] if level is None else level).finish(data)
+
+
+def available_encodings() -> list[str]:
+    """Encodings this process can produce, in order of preference."""
+    return [
+        name
+        for name, module in (("zstd", zstd), ("br", brotli), ("gzip", zlib))
+        if module is not None
+    ]
+
+
+def negotiate(accept_encoding: str, encodings: list[str]) -> str | None:
+    """Pick the encoding for an Accept-Encoding header, or ``None`` for identity.
+
+    The client's q-values decide first; among equal ones, the order of
+    ``encodings`` (the server's preference) does.
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in encodings:
+        quality = qualities.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Compresses responses in the best encoding the client accepts.
+
+    Args:
+        app: The ASGI application
+        minimum_size: Bodies sent in one message smaller than this stay uncompressed
+        gzip_level: zlib level, 1 (fast) to 9 (small)
+        brotli_quality: 0 (fast) to 11 (small)
+        zstd_level: 1 (fast) to 22 (small)
+        encodings: Encodings to offer, in order of preference; defaults to all available
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        encodings: list[str] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [
+            name for name in (encodings or available_encodings()) if name in available_encodings()
+        ]
+        self._factories = {
+            "gzip": lambda: _GzipEncoder(gzip_level),
+            "br": lambda: _BrotliEncoder(brotli_quality),
+            "zstd": lambda: _ZstdEncoder(zstd_level),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressedResponder(send, encoding, self._factories[encoding], self)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressedResponder:
+    """Per-request state: holds back the response start until the first body chunk."""
+
+    def __init__(self, send: Send, encoding: str, factory, middleware: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.minimum_size = middleware.minimum_size
+        self.start: Message | None = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message.get("headers", []))
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or not content_type
+                or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            ):
+                self.passthrough = True
+                await self._send(message)
+        elif message["type"] == "http.response.body":
+            await self._body(message)
+        else:
+            await self._send(message)
+
+    async def _body(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = MutableHeaders(scope=self.start)
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                # Whole body known and too small to be worth it
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+            self.encoder = self.factory()
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = encoded_etag(etag, self.encoding)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.encoder.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._send(self.start)
+
+        if more_body and not body:
+            return
+        body = self.encoder.chunk(body) if more_body else self.encoder.finish(body)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,71 @@
+"""Entity tags for conditional requests."""
+
+import hashlib
+
+from fastapi import Response, status
+
+# Authenticated payloads: browsers may keep them but must revalidate every use
+CACHE_CONTROL = "private, no-cache"
+
+# Content codings whose representations get their own strong ETag, see encoded_etag
+CONTENT_CODINGS = ("gzip", "br", "zstd")
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag joining ``parts``, e.g. ``"item-42-1337"``."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def digest(value: str | bytes) -> str:
+    """Short hash of ``value`` for use as an ETag part."""
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.blake2b(value, digest_size=8).hexdigest()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Strong ETag of the ``encoding`` representation, e.g. ``"item-42-1337-gzip"``."""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_encoding(etag: str) -> str:
+    """``etag`` without the content-coding suffix added by ``encoded_etag``."""
+    for encoding in CONTENT_CODINGS:
+        if etag.endswith(f'-{encoding}"'):
+            return etag[: -len(encoding) - 2] + '"'
+    return etag
+
+
+def etag_matches(header: str | None, etag: str, weak: bool = True) -> bool:
+    """Whether ``etag`` is listed in an If-None-Match / If-Match header value.
+
+    If-None-Match compares weakly (``W/`` prefixes ignored); If-Match must
+    compare strongly, so pass ``weak=False`` and weak tags never match. The
+    tag of a compressed representation matches the resource's own tag.
+    """
+    if header is None:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if strip_encoding(candidate) == strip_encoding(etag.removeprefix("W/")):
+            return True
+    return False
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the validators; no body is serialized."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -11,10 +11,12 @@ class AppException(Exception):
         message: str = "An error occurred",
         status_code: int = 500,
         extra: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
     ):
         self.message = message
         self.status_code = status_code
         self.extra = extra or {}
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -51,3 +53,12 @@ class ConflictException(AppException):
 
     def __init__(self, message: str = "Resource conflict"):
         super().__init__(message=message, status_code=409)
+
+
+class ServiceUnavailableException(AppException):
+    """Temporarily overloaded; the client should retry later."""
+
+    def __init__(self, message: str = "Service unavailable", retry_after: int = 1):
+        super().__init__(
+            message=message, status_code=503, headers={"Retry-After": str(retry_after)}
+        )
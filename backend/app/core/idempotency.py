@@ -0,0 +1,417 @@
+"""Idempotency-Key support for retried writes.
+
+A ``POST``/``PUT``/``PATCH`` carrying an ``Idempotency-Key`` header runs
+once; its response is stored and replayed, without running the handler, for
+retries with the same key. Keys are scoped to the caller's ``Authorization``
+header. Each key remembers a fingerprint of the request (method, path, query,
+body): reusing a key for a different request is rejected with 422.
+
+While the first request is in flight, the key holds a pending marker, and
+duplicates wait for its result rather than running the handler too. The marker
+is extended while the request runs and only expires (after ``lock_ttl``) if
+the process serving it died. Duplicates still waiting after ``wait_timeout``
+get 409. Responses with a 5xx or 429 status are not stored, so the retry runs
+again, and neither are responses marked ``Cache-Control: no-store``, such as
+the bearer tokens issued by login. Backends:
+
+- ``memory``: per process; retries routed to another worker run again
+- ``redis``: shared by all workers (``uv sync --extra redis``)
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.etag import digest
+from app.core.logging import get_logger
+from app.core.responses import FastJSONResponse
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+
+
+class MemoryIdempotencyBackend:
+    """Per-process store of records (dicts), expiring after their TTL."""
+
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self._cache.get(key)
+
+    def claim(self, key: str, record: dict[str, Any], ttl: float) -> bool:
+        """Store ``record`` unless ``key`` already holds one; return whether it was stored."""
+        with self._lock:
+            if key in self._cache:
+                return False
+            self._cache.set(key, record, ttl)
+            return True
+
+    def set(self, key: str, record: dict[str, Any], ttl: float) -> None:
+        self._cache.set(key, record, ttl)
+
+    def extend(self, key: str, ttl: float) -> None:
+        """Let the pending marker at ``key`` live for another ``ttl`` seconds."""
+        with self._lock:
+            record = self._cache.get(key)
+            if record is not None and record.get("pending"):
+                self._cache.set(key, record, ttl)
+
+    def release(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._cache)}
+
+
+class RedisIdempotencyBackend:
+    """Shared store speaking the Redis protocol; records are stored as JSON.
+
+    Redis errors are logged and the request runs without idempotency, as
+    it would without the header.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str | None = None, client: Any = None, prefix: str = "idem:"):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = client if client is not None else redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._errors = (redis.RedisError,)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except self._errors as exc:
+            logger.warning("idempotency_store_unavailable", operation="get", error=str(exc))
+            return None
+        return None if raw is None else orjson.loads(raw)
+
+    def claim(self, key: str, record: dict[str, Any], ttl: float) -> bool:
+        try:
+            return bool(
+                self.client.set(self.prefix + key, orjson.dumps(record), nx=True, px=_ms(ttl))
+            )
+        except self._errors as exc:
+            logger.warning("idempotency_store_unavailable", operation="claim", error=str(exc))
+            return True
+
+    def set(self, key: str, record: dict[str, Any], ttl: float) -> None:
+        try:
+            self.client.set(self.prefix + key, orjson.dumps(record), px=_ms(ttl))
+        except self._errors as exc:
+            logger.warning("idempotency_store_unavailable", operation="set", error=str(exc))
+
+    def extend(self, key: str, ttl: float) -> None:
+        try:
+            self.client.pexpire(self.prefix + key, _ms(ttl))
+        except self._errors as exc:
+            logger.warning("idempotency_store_unavailable", operation="extend", error=str(exc))
+
+    def release(self, key: str) -> None:
+        try:
+            self.client.delete(self.prefix + key)
+        except self._errors as exc:
+            # The pending marker blocks retries until it expires
+            logger.error("idempotency_release_failed", error=str(exc))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> dict[str, int]:
+        return {}
+
+
+def _ms(seconds: float) -> int:
+    return max(1, int(seconds * 1000))
+
+
+class IdempotencyStore:
+    """Records of keyed requests, plus the requests in flight in this process.
+
+    Args:
+        backend: Memory or Redis backend
+        ttl: Seconds a stored response is replayed for
+        lock_ttl: Seconds a pending marker outlives a process that died mid-request;
+            while the request runs, the marker is extended every third of that
+    """
+
+    def __init__(self, backend, ttl: float = 86400.0, lock_ttl: float = 60.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.executions = 0
+        self.replays = 0
+        self.mismatches = 0
+        self.timeouts = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        return await self._call(self.backend.get, key)
+
+    async def claim(self, key: str, fingerprint: str) -> bool:
+        record = {"fingerprint": fingerprint, "pending": True}
+        return await self._call(self.backend.claim, key, record, self.lock_ttl)
+
+    async def hold(self, key: str, done: asyncio.Event) -> None:
+        """Keep extending the pending marker at ``key`` until ``done`` is set."""
+        while True:
+            try:
+                await asyncio.wait_for(done.wait(), self.lock_ttl / 3)
+                return
+            except TimeoutError:
+                await self._call(self.backend.extend, key, self.lock_ttl)
+
+    async def complete(self, key: str, record: dict[str, Any]) -> None:
+        await self._call(self.backend.set, key, record, self.ttl)
+
+    async def release(self, key: str) -> None:
+        await self._call(self.backend.release, key)
+
+    def begin(self, key: str) -> None:
+        """Mark ``key`` in flight in this process, so duplicates here can await it."""
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+
+    def end(self, key: str) -> None:
+        self._inflight.pop(key).set_result(None)
+
+    def in_flight(self, key: str) -> asyncio.Future | None:
+        return self._inflight.get(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "executions": self.executions,
+            "replays": self.replays,
+            "mismatches": self.mismatches,
+            "timeouts": self.timeouts,
+            "in_flight": len(self._inflight),
+            **self.backend.stats(),
+        }
+
+
+def create_idempotency_store(settings) -> IdempotencyStore:
+    """Store configured by the IDEMPOTENCY_* settings."""
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        backend = RedisIdempotencyBackend(settings.REDIS_URL)
+    else:
+        backend = MemoryIdempotencyBackend(
+            settings.IDEMPOTENCY_MAX_SIZE, settings.IDEMPOTENCY_TTL_SECONDS
+        )
+    return IdempotencyStore(
+        backend,
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_ttl=settings.IDEMPOTENCY_LOCK_SECONDS,
+    )
+
+
+def _cacheable(start: Message) -> bool:
+    # Server errors and throttling are transient: let the retry run again
+    if start["status"] >= 500 or start["status"] == 429:
+        return False
+    # Responses carrying credentials are marked no-store and must not be kept
+    cache_control = Headers(raw=start.get("headers", [])).get("cache-control", "")
+    return "no-store" not in cache_control.lower()
+
+
+class IdempotencyMiddleware:
+    """Runs keyed writes once and replays their stored response to retries.
+
+    Args:
+        app: The ASGI application
+        store: Where records live
+        methods: Methods the header applies to
+        wait_timeout: Seconds a duplicate waits for the in-flight request
+        poll_interval: Seconds between checks for a request in flight in another process
+        max_body_size: Larger responses are sent but not stored
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore,
+        methods: tuple[str, ...] = ("POST", "PUT", "PATCH"),
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+        max_body_size: int = 1_000_000,
+    ):
+        self.app = app
+        self.store = store
+        self.methods = methods
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            detail = f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+            await FastJSONResponse({"detail": detail}, status_code=400)(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        key = digest(f"{headers.get('authorization', '')}\n{idempotency_key}")
+        fingerprint = digest(
+            b"\n".join(
+                (scope["method"].encode(), scope["path"].encode(), scope["query_string"], body)
+            )
+        )
+
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            record = await self.store.get(key)
+            if record is None:
+                if await self.store.claim(key, fingerprint):
+                    break
+                continue
+            if record["fingerprint"] != fingerprint:
+                self.store.mismatches += 1
+                detail = "Idempotency-Key was already used for a different request"
+                await FastJSONResponse({"detail": detail}, status_code=422)(scope, receive, send)
+                return
+            if not record.get("pending"):
+                self.store.replays += 1
+                await _replay(record, send)
+                return
+            if not await self._wait(key, deadline):
+                self.store.timeouts += 1
+                detail = "A request with this Idempotency-Key is still being processed"
+                await FastJSONResponse({"detail": detail}, status_code=409)(scope, receive, send)
+                return
+
+        await self._execute(scope, _replay_body(body, receive), send, key, fingerprint)
+
+    async def _wait(self, key: str, deadline: float) -> bool:
+        """Wait for the request holding ``key`` to make progress; ``False`` past the deadline."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        future = self.store.in_flight(key)
+        if future is None:
+            # In flight in another process: poll the store
+            await asyncio.sleep(min(self.poll_interval, remaining))
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(future), remaining)
+        except TimeoutError:
+            return False
+        return True
+
+    async def _execute(
+        self, scope: Scope, receive: Receive, send: Send, key: str, fingerprint: str
+    ) -> None:
+        self.store.executions += 1
+        self.store.begin(key)
+        start: Message | None = None
+        chunks: list[bytes] = []
+        size = 0
+        complete = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, size, complete
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= self.max_body_size:
+                    chunks.append(body)
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        done = asyncio.Event()
+        hold = asyncio.create_task(self.store.hold(key, done))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            try:
+                # Stop extending the marker before it is replaced or released
+                done.set()
+                await hold
+                storable = complete and size <= self.max_body_size and _cacheable(start)
+                if storable:
+                    record = {
+                        "fingerprint": fingerprint,
+                        "status": start["status"],
+                        "headers": [
+                            [name.decode("latin-1"), value.decode("latin-1")]
+                            for name, value in start.get("headers", [])
+                        ],
+                        # latin-1 maps bytes 1:1, so the record stays JSON-safe
+                        "body": b"".join(chunks).decode("latin-1"),
+                    }
+                    await self.store.complete(key, record)
+                else:
+                    await self.store.release(key)
+            finally:
+                self.store.end(key)
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    """``receive`` for the app: the body already read, then the client's messages."""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+async def _replay(record: dict[str, Any], send: Send) -> None:
+    headers = [
+        (name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]
+    ]
+    headers.append(REPLAYED_HEADER)
+    await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+    await send({"type": "http.response.body", "body": record["body"].encode("latin-1")})
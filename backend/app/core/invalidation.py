@@ -0,0 +1,78 @@
+"""Cache invalidations shared between workers.
+
+A worker that drops entries from an in-process cache publishes the name it
+dropped to a capped Redis stream; every worker reads the stream at a fixed
+interval and drops the same entries from its own cache. A worker that cannot
+reach Redis keeps its entries until they expire.
+"""
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RedisInvalidationLog:
+    """Names invalidated by any worker, in a Redis stream of at most ~``maxlen`` entries.
+
+    Entries are read by id: ``read(after)`` returns those published after
+    ``after``, with the id to pass next time.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        client: Any = None,
+        key: str = "invalidations",
+        maxlen: int = 10000,
+    ):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = client if client is not None else redis.Redis.from_url(url)
+        self.key = key
+        self.maxlen = maxlen
+        self.errors = (redis.RedisError,)
+
+    def publish(self, name: str) -> None:
+        self.client.xadd(self.key, {"name": name}, maxlen=self.maxlen, approximate=True)
+
+    def latest(self) -> bytes:
+        """Id of the newest entry; reading after it returns only later ones."""
+        newest = self.client.xrevrange(self.key, count=1)
+        return newest[0][0] if newest else b"0-0"
+
+    def read(self, after: bytes) -> tuple[list[str], bytes]:
+        """Names published after entry ``after``, and the id of the last one read."""
+        streams = self.client.xread({self.key: after})
+        if not streams:
+            return [], after
+        entries = streams[0][1]
+        return [fields[b"name"].decode() for _, fields in entries], entries[-1][0]
+
+
+def create_invalidation_log(backend: str, url: str, key: str) -> RedisInvalidationLog | None:
+    """Shared log for ``backend="redis"``; ``None`` keeps invalidations per process."""
+    if backend == "redis":
+        return RedisInvalidationLog(url, key=key)
+    return None
+
+
+async def watch_invalidations(
+    log: RedisInvalidationLog, invalidate: Callable[[str], Any], interval: float
+) -> None:
+    """Call ``invalidate`` for every name other workers publish, until cancelled."""
+    after = None
+    while True:
+        try:
+            if after is None:
+                after = await asyncio.to_thread(log.latest)
+            else:
+                names, after = await asyncio.to_thread(log.read, after)
+                for name in names:
+                    invalidate(name)
+        except log.errors as exc:
+            logger.warning("invalidation_sync_failed", key=log.key, error=str(exc))
+        await asyncio.sleep(interval)
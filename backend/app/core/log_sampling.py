@@ -0,0 +1,185 @@
+"""Access-log sampling and per-route log levels.
+
+Rules are held in one immutable object that is swapped on update, so they can
+be changed at runtime (see the admin endpoint) without locking readers. With
+a ``RedisRulesStore``, rules changed by one worker are saved in Redis and the
+other workers adopt them when they next sync (``watch_rules``).
+"""
+
+import asyncio
+import random
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import orjson
+import structlog
+from starlette.types import Scope
+
+from app.core.config import settings
+from app.core.metrics import route_template
+
+# Not app.core.logging.get_logger: that module imports this one
+logger = structlog.get_logger(__name__)
+
+LEVELS = {
+    "debug": 10,
+    "info": 20,
+    "warning": 30,
+    "warn": 30,
+    "error": 40,
+    "exception": 40,
+    "critical": 50,
+    "fatal": 50,
+}
+
+# Scope of the request being handled, for resolving per-route log levels
+_request_scope: ContextVar[Scope | None] = ContextVar("log_request_scope", default=None)
+
+
+@dataclass(frozen=True)
+class RouteLogRule:
+    """Overrides for one route template; ``None`` means use the default."""
+
+    sample_rate: float | None = None
+    level: str | None = None
+
+    def __post_init__(self):
+        if self.sample_rate is not None and not 0.0 <= self.sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if self.level is not None and self.level not in LEVELS:
+            raise ValueError(f"Unknown log level: {self.level}")
+
+
+@dataclass(frozen=True)
+class LogSamplingRules:
+    """Access logs are sampled at a per-route rate, except errors and slow requests."""
+
+    default_sample_rate: float = 1.0
+    slow_request_ms: float = 1000.0
+    routes: dict[str, RouteLogRule] = field(default_factory=dict)
+
+
+def rules_to_dict(rules: LogSamplingRules) -> dict[str, Any]:
+    return asdict(rules)
+
+
+def rules_from_dict(data: dict[str, Any]) -> LogSamplingRules:
+    return LogSamplingRules(
+        default_sample_rate=data["default_sample_rate"],
+        slow_request_ms=data["slow_request_ms"],
+        routes={route: RouteLogRule(**rule) for route, rule in data["routes"].items()},
+    )
+
+
+class RedisRulesStore:
+    """Rules shared by every worker, stored as JSON under one Redis key."""
+
+    def __init__(self, url: str | None = None, client: Any = None, key: str = "log-rules"):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = client if client is not None else redis.Redis.from_url(url)
+        self.key = key
+        self.errors = (redis.RedisError,)
+
+    def load(self) -> LogSamplingRules | None:
+        """The saved rules, or ``None`` if none were saved yet."""
+        raw = self.client.get(self.key)
+        return None if raw is None else rules_from_dict(orjson.loads(raw))
+
+    def save(self, rules: LogSamplingRules) -> None:
+        self.client.set(self.key, orjson.dumps(rules_to_dict(rules)))
+
+
+class AccessLogPolicy:
+    """Decides whether and at which level a request's access line is logged."""
+
+    def __init__(self, rules: LogSamplingRules | None = None):
+        self.update(rules or LogSamplingRules())
+
+    def update(self, rules: LogSamplingRules) -> None:
+        self.rules = rules
+        self._has_level_overrides = any(rule.level for rule in rules.routes.values())
+
+    def sync(self, store: RedisRulesStore) -> bool:
+        """Adopt the rules saved in ``store``, if any differ; return whether they did."""
+        rules = store.load()
+        if rules is None or rules == self.rules:
+            return False
+        self.update(rules)
+        return True
+
+    def access_level(self, route: str, status_code: int, duration_ms: float) -> str | None:
+        """Log level for the access line, or ``None`` if it is sampled out."""
+        if status_code >= 500:
+            return "error"
+        if duration_ms >= self.rules.slow_request_ms:
+            return "warning"
+        rate = self.sample_rate(route)
+        if rate < 1.0 and random.random() >= rate:
+            return None
+        return "info"
+
+    def sample_rate(self, route: str) -> float:
+        rule = self.rules.routes.get(route)
+        if rule and rule.sample_rate is not None:
+            return rule.sample_rate
+        return self.rules.default_sample_rate
+
+    def min_level(self, scope: Scope) -> str | None:
+        if not self._has_level_overrides:
+            return None
+        rule = self.rules.routes.get(route_template(scope))
+        return rule.level if rule else None
+
+
+def rules_from_settings() -> LogSamplingRules:
+    return LogSamplingRules(
+        default_sample_rate=settings.LOG_SAMPLE_RATE,
+        slow_request_ms=settings.LOG_SLOW_REQUEST_MS,
+        routes={route: RouteLogRule(**rule) for route, rule in settings.LOG_ROUTE_RULES.items()},
+    )
+
+
+access_log_policy = AccessLogPolicy(rules_from_settings())
+
+
+def create_rules_store(settings) -> RedisRulesStore | None:
+    """Shared store for LOG_RULES_BACKEND=redis; ``None`` keeps rules per process."""
+    if settings.LOG_RULES_BACKEND == "redis":
+        return RedisRulesStore(settings.REDIS_URL)
+    return None
+
+
+async def watch_rules(store: RedisRulesStore, interval: float) -> None:
+    """Adopt rules saved by other workers every ``interval`` seconds, until cancelled."""
+    while True:
+        try:
+            if await asyncio.to_thread(access_log_policy.sync, store):
+                logger.info("log_sampling_synced", **rules_to_dict(access_log_policy.rules))
+        except store.errors as exc:
+            logger.warning("log_sampling_sync_failed", error=str(exc))
+        await asyncio.sleep(interval)
+
+
+def bind_request_scope(scope: Scope):
+    """Make the current request's route visible to the route level filter."""
+    return _request_scope.set(scope)
+
+
+def unbind_request_scope(token) -> None:
+    _request_scope.reset(token)
+
+
+def route_level_filter(logger: Any, method_name: str, event_dict: dict) -> dict:
+    """structlog processor dropping events below the current route's level override.
+
+    Overrides can only make a route quieter than LOG_LEVEL, never more verbose.
+    """
+    scope = _request_scope.get()
+    if scope is None:
+        return event_dict
+    min_level = access_log_policy.min_level(scope)
+    if min_level is not None and LEVELS.get(method_name, 20) < LEVELS[min_level]:
+        raise structlog.DropEvent
+    return event_dict
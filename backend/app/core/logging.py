@@ -1,21 +1,186 @@
 """Structured logging configuration."""
 
+import atexit
 import logging
+import queue
 import sys
+import threading
+from typing import IO, Any
 
+import orjson
 import structlog
 
+from app.core.log_sampling import route_level_filter
 
-def configure_logging(json_logs: bool = False, log_level: str = "INFO") -> None:
+QUEUE_OVERFLOW_POLICIES = ("drop", "block")
+
+
+class LogQueue:
+    """Bounded queue of log records drained by a background writer thread.
+
+    Callers only enqueue, so a slow stdout pipe never stalls the event loop.
+    The writer serializes event dicts with orjson and writes them in batches
+    of up to ``batch_size`` lines. When the queue is full, ``overflow="drop"``
+    discards the record and counts it; ``"block"`` makes the caller wait.
+    Once closed, records are written synchronously.
+    """
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        maxsize: int = 10000,
+        batch_size: int = 256,
+        overflow: str = "drop",
+    ):
+        if overflow not in QUEUE_OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log queue overflow policy: {overflow}")
+        self.stream = stream
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.written = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._closed = False
+        # Separate locks: counting a drop must never wait on a stalled write
+        self._write_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record: dict[str, Any] | str) -> None:
+        if self._closed:
+            with self._write_lock:
+                self.stream.write(self._encode(record))
+                self.stream.flush()
+        elif self.overflow == "block":
+            self._queue.put(record)
+        else:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                with self._count_lock:
+                    self.dropped += 1
+
+    def _encode(self, record: dict[str, Any] | str) -> bytes:
+        if isinstance(record, str):
+            return record.encode("utf-8") + b"\n"
+        return orjson.dumps(record, default=str, option=orjson.OPT_APPEND_NEWLINE)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [record for record in batch if record is not None]
+            dropped = self.dropped
+            if dropped != self._reported_dropped:
+                batch.append(
+                    {"event": "log_records_dropped", "count": dropped - self._reported_dropped}
+                )
+                self._reported_dropped = dropped
+            try:
+                with self._write_lock:
+                    self.stream.write(b"".join(self._encode(record) for record in batch))
+                    self.stream.flush()
+            except Exception:
+                # Nowhere left to report it; keep draining so callers never block forever
+                continue
+            self.written += len(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._closed = True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+class QueueLogger:
+    """structlog logger that hands finished event dicts (or lines) to a LogQueue."""
+
+    def __init__(self, log_queue: LogQueue, name: str | None = None):
+        self._queue = log_queue
+        self.name = name
+
+    def msg(self, record: dict[str, Any] | str) -> None:
+        self._queue.put(record)
+
+    log = debug = info = warning = warn = error = critical = exception = fatal = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, log_queue: LogQueue):
+        self._queue = log_queue
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self._queue, args[0] if args else None)
+
+
+class _QueueHandler(logging.Handler):
+    """Routes stdlib records (uvicorn, SQLAlchemy, ...) through the same queue."""
+
+    def __init__(self, log_queue: LogQueue):
+        super().__init__()
+        self._queue = log_queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._queue.put(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+_log_queue: LogQueue | None = None
+_queue_handler: logging.Handler | None = None
+_shutdown_registered = False
+
+
+def _pass_event_dict(logger: Any, method_name: str, event_dict: dict) -> tuple:
+    # Final processor: hand the dict itself to QueueLogger; the writer serializes it
+    return (event_dict,), {}
+
+
+def configure_logging(
+    json_logs: bool = False,
+    log_level: str = "INFO",
+    queued: bool = False,
+    queue_size: int = 10000,
+    batch_size: int = 256,
+    overflow: str = "drop",
+) -> None:
     """Configure structlog for structured logging.
 
+    Loggers are not cached on first use: a module-level logger obtained before
+    a later call would otherwise keep the old renderer and, in queued mode,
+    write synchronously to the closed queue.
+
     Args:
         json_logs: If True, output JSON. If False, output colored console logs.
         log_level: The minimum log level to output.
+        queued: If True, log calls only enqueue; a background thread writes
+            batches to stdout (see LogQueue).
+        queue_size: Maximum records waiting to be written in queued mode.
+        batch_size: Maximum records per write in queued mode.
+        overflow: "drop" or "block" when the queue is full in queued mode.
     """
     timestamper = structlog.processors.TimeStamper(fmt="iso")
 
     shared_processors = [
+        route_level_filter,
         structlog.contextvars.merge_contextvars,
         structlog.stdlib.add_log_level,
         structlog.stdlib.add_logger_name,
@@ -23,6 +188,11 @@ def configure_logging(json_logs: bool = False, log_level: str = "INFO") -> None:
         structlog.processors.format_exc_info,
     ]
 
+    shutdown_logging()
+    if queued:
+        _configure_queued(shared_processors, json_logs, log_level, queue_size, batch_size, overflow)
+        return
+
     if json_logs:
         # JSON output for production
         structlog.configure(
@@ -34,7 +204,7 @@ def configure_logging(json_logs: bool = False, log_level: str = "INFO") -> None:
             wrapper_class=structlog.stdlib.BoundLogger,
             context_class=dict,
             logger_factory=structlog.stdlib.LoggerFactory(),
-            cache_logger_on_first_use=True,
+            cache_logger_on_first_use=False,
         )
     else:
         # Colored console output for development
@@ -46,7 +216,7 @@ def configure_logging(json_logs: bool = False, log_level: str = "INFO") -> None:
             wrapper_class=structlog.stdlib.BoundLogger,
             context_class=dict,
             logger_factory=structlog.stdlib.LoggerFactory(),
-            cache_logger_on_first_use=True,
+            cache_logger_on_first_use=False,
         )
 
     # Configure standard library logging
@@ -57,6 +227,57 @@ def configure_logging(json_logs: bool = False, log_level: str = "INFO") -> None:
     )
 
 
+def _configure_queued(
+    shared_processors: list,
+    json_logs: bool,
+    log_level: str,
+    queue_size: int,
+    batch_size: int,
+    overflow: str,
+) -> None:
+    global _log_queue, _queue_handler, _shutdown_registered
+    _log_queue = LogQueue(
+        sys.stdout.buffer, maxsize=queue_size, batch_size=batch_size, overflow=overflow
+    )
+    level = getattr(logging, log_level.upper())
+
+    if json_logs:
+        # JSON is rendered by the writer thread, off the caller's thread
+        renderers = [structlog.processors.dict_tracebacks, _pass_event_dict]
+    else:
+        renderers = [structlog.dev.ConsoleRenderer(colors=False)]
+    structlog.configure(
+        processors=shared_processors + renderers,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        context_class=dict,
+        logger_factory=QueueLoggerFactory(_log_queue),
+        cache_logger_on_first_use=False,
+    )
+
+    _queue_handler = _QueueHandler(_log_queue)
+    _queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(handlers=[_queue_handler], level=level, force=True)
+    if not _shutdown_registered:
+        atexit.register(shutdown_logging)
+        _shutdown_registered = True
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the log writer thread, if queued logging is active."""
+    global _log_queue, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _log_queue is not None:
+        _log_queue.close()
+        _log_queue = None
+
+
+def log_queue_stats() -> dict[str, int]:
+    """Queue depth and written/dropped counters (empty unless queued logging is on)."""
+    return _log_queue.stats() if _log_queue is not None else {}
+
+
 def get_logger(name: str = None):
     """Get a structlog logger instance."""
     return structlog.get_logger(name)
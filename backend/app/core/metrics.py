@@ -0,0 +1,157 @@
+"""Prometheus metrics.
+
+Request metrics are labelled by route template (``/api/v1/items/{item_id}``),
+never the raw path, so label cardinality stays bounded. With several workers,
+set ``PROMETHEUS_MULTIPROC_DIR`` to a shared, empty directory before the
+workers start; each worker then writes its samples to mmap files there and
+``/metrics`` aggregates them.
+"""
+
+import os
+from collections.abc import Callable
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import Scope
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the response body was sent",
+    ["method", "route"],
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes",
+    "Request body size (Content-Length)",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size as sent",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """Full path template of the route that handled the request.
+
+    Routes inside included routers may only know their path relative to the
+    router's prefix, so the prefix is recovered from the request path.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+    try:
+        concrete = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError):
+        return path_format
+    path = scope["path"]
+    if not path.endswith(concrete):
+        return path_format
+    return path[: len(path) - len(concrete)] + path_format
+
+
+def request_size(scope: Scope) -> int:
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return 0
+    return 0
+
+
+def observe_request(
+    scope: Scope, route: str, status_code: int, duration: float, response_bytes: int
+) -> None:
+    """Record one finished request under its route template."""
+    method = scope["method"]
+    REQUESTS.labels(method, route, str(status_code)).inc()
+    REQUEST_DURATION.labels(method, route).observe(duration)
+    REQUEST_SIZE.labels(method, route).observe(request_size(scope))
+    RESPONSE_SIZE.labels(method, route).observe(response_bytes)
+
+
+class StatsCollector(Collector):
+    """Exposes numeric fields of stats dicts (pool, hasher, caches) as gauges.
+
+    ``sources`` maps a metric prefix to a callable returning the current stats.
+    These values live in this process only, so in multiprocess mode they carry
+    a ``pid`` label.
+    """
+
+    def __init__(self, sources: dict[str, Callable[[], dict[str, Any]]]):
+        self.sources = sources
+
+    def describe(self):
+        # Names depend on the stats at scrape time; don't collect at registration
+        return []
+
+    def collect(self):
+        labels = {"pid": str(os.getpid())} if multiprocess_enabled() else {}
+        for prefix, stats in self.sources.items():
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, int | float):
+                    continue
+                gauge = GaugeMetricFamily(f"{prefix}_{key}", f"{prefix} {key}", labels=labels)
+                gauge.add_metric(list(labels.values()), value)
+                yield gauge
+
+
+_stats_collector: StatsCollector | None = None
+
+
+def register_stats(sources: dict[str, Callable[[], dict[str, Any]]]) -> None:
+    """Expose application stats on /metrics (replaces earlier registrations)."""
+    global _stats_collector
+    if _stats_collector is not None:
+        REGISTRY.unregister(_stats_collector)
+    _stats_collector = StatsCollector(sources)
+    REGISTRY.register(_stats_collector)
+
+
+def multiprocess_enabled() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Metrics in the Prometheus text format, and their content type."""
+    if not multiprocess_enabled():
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    if _stats_collector is not None:
+        registry.register(_stats_collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a dead worker's live gauges; call from gunicorn's ``child_exit`` hook."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
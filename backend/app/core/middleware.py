@@ -2,64 +2,105 @@
 
 import time
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.log_sampling import access_log_policy, bind_request_scope, unbind_request_scope
 from app.core.logging import get_logger
+from app.core.metrics import REQUESTS_IN_PROGRESS, observe_request, route_template
 
 logger = get_logger(__name__)
 
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+}
+
+
+class RequestMiddleware:
+    """Request timing, access logging and security headers in one ASGI layer.
+
+    Pure ASGI rather than ``BaseHTTPMiddleware``: it runs in the request's own
+    task and only rewrites the ``http.response.start`` message, so response
+    bodies (including streaming ones) pass through untouched. Security headers
+    are encoded once, when the middleware is built. With ``metrics`` enabled it
+    also feeds the Prometheus request metrics (see ``app.core.metrics``).
+    Each request produces at most one ``http_request`` access line, sampled by
+    ``access_log_policy``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        security_headers: dict[str, str] | None = None,
+        metrics: bool = True,
+    ):
+        self.app = app
+        self.metrics = metrics
+        self.security_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (security_headers or SECURITY_HEADERS).items()
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class RequestTimingMiddleware(BaseHTTPMiddleware):
-    """Middleware to add X-Process-Time header to responses."""
-
-    async def dispatch(self, request: Request, call_next):
         start_time = time.perf_counter()
-
-        response = await call_next(request)
-
-        process_time = time.perf_counter() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-
-        return response
-
-
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all incoming requests."""
-
-    async def dispatch(self, request: Request, call_next):
-        method = request.method
-        path = request.url.path
-        client_host = request.client.host if request.client else "unknown"
-
-        logger.info(
-            "request_started",
-            method=method,
-            path=path,
-            client=client_host,
+        method = scope["method"]
+        scope_token = bind_request_scope(scope)
+
+        status_code = 500
+        response_bytes = 0
+        if self.metrics:
+            REQUESTS_IN_PROGRESS.labels(method).inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", ()))
+                present = {name for name, _ in headers}
+                headers.extend(
+                    header for header in self.security_headers if header[0] not in present
+                )
+                process_time = time.perf_counter() - start_time
+                headers.append((b"x-process-time", str(process_time).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            route = route_template(scope)
+            if self.metrics:
+                REQUESTS_IN_PROGRESS.labels(method).dec()
+                observe_request(scope, route, status_code, duration, response_bytes)
+            self._log_access(scope, route, status_code, duration, response_bytes)
+            unbind_request_scope(scope_token)
+
+    def _log_access(
+        self, scope: Scope, route: str, status_code: int, duration: float, response_bytes: int
+    ) -> None:
+        """One combined access line per request, subject to access_log_policy."""
+        duration_ms = round(duration * 1000, 3)
+        level = access_log_policy.access_level(route, status_code, duration_ms)
+        if level is None:
+            return
+        client = scope.get("client")
+        getattr(logger, level)(
+            "http_request",
+            method=scope["method"],
+            path=scope["path"],
+            route=route,
+            status_code=status_code,
+            duration_ms=duration_ms,
+            response_bytes=response_bytes,
+            client=client[0] if client else "unknown",
+            sample_rate=access_log_policy.sample_rate(route),
         )
-
-        response = await call_next(request)
-
-        logger.info(
-            "request_completed",
-            method=method,
-            path=path,
-            status_code=response.status_code,
-        )
-
-        return response
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware to add security headers to responses."""
-
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-
-        return response
@@ -0,0 +1,325 @@
+"""Precomputed OpenAPI document and documentation pages.
+
+FastAPI keeps the schema as a dict and encodes it again on every fetch. Here
+it is encoded once, compressed once per encoding at the highest level, and
+served from those bytes with a strong ETag per representation and a
+``Cache-Control`` that lets gateways and codegen pollers reuse it. The
+document is built at startup (or on first request), or read from a file
+written at build time by ``scripts/export_openapi.py``.
+
+A fingerprint of everything that shapes the document (app metadata and each
+route's parameters, body, responses and security, with the JSON schemas of
+their models) is embedded in it as ``x-route-fingerprint``. A file whose
+fingerprint does not match the running app is ignored, and ``refresh()`` only
+rebuilds when it has changed.
+
+The Swagger UI and ReDoc pages are rendered on their first request and kept.
+"""
+
+from pathlib import Path
+from typing import Annotated, Any
+
+import orjson
+from fastapi import FastAPI, Request, Response, status
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import get_flat_params
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
+from fastapi.responses import HTMLResponse
+from fastapi.routing import APIRoute
+from fastapi.security.base import SecurityBase
+from pydantic import TypeAdapter
+from pydantic.json_schema import JsonSchemaMode
+
+from app.core.compression import available_encodings, compress, negotiate
+from app.core.etag import digest, etag_matches, make_etag
+from app.core.logging import get_logger
+
+try:
+    from fastapi.routing import iter_route_contexts  # FastAPI keeps included routers nested
+except ImportError:
+    iter_route_contexts = iter  # older FastAPI flattens them into app.routes
+
+logger = get_logger(__name__)
+
+FINGERPRINT_KEY = "x-route-fingerprint"
+
+
+def _schema(field: Any, mode: JsonSchemaMode) -> dict:
+    """JSON schema of a parameter, body or response field, with its constraints and docs."""
+    info = field.field_info
+    return TypeAdapter(Annotated[info.annotation, info]).json_schema(mode=mode)
+
+
+def _params(dependant: Dependant) -> list:
+    """Location, alias and schema of each path, query, header and cookie parameter."""
+    return [
+        [type(field.field_info).__name__, field.alias, _schema(field, "validation")]
+        for field in get_flat_params(dependant)
+    ]
+
+
+def _security(dependant: Dependant) -> list:
+    """Security schemes and scopes required by a route's dependencies."""
+    schemes = []
+    for dependency in dependant.dependencies:
+        if isinstance(dependency.call, SecurityBase):
+            schemes.append(
+                [
+                    dependency.call.scheme_name,
+                    dependency.call.model.model_dump(mode="json", exclude_none=True),
+                    dependency.own_oauth_scopes,
+                ]
+            )
+        schemes.extend(_security(dependency))
+    return schemes
+
+
+def _route_shape(route: Any) -> list:
+    """Everything about one route that appears in the document."""
+    response_fields = getattr(route, "response_fields", {})
+    return [
+        route.path,
+        sorted(route.methods or ()),
+        route.name,
+        route.operation_id,
+        route.summary,
+        route.description,
+        route.response_description,
+        route.tags,
+        route.deprecated,
+        route.status_code,
+        route.responses,
+        _params(route.dependant),
+        route.body_field and _schema(route.body_field, "validation"),
+        route.response_field and _schema(route.response_field, "serialization"),
+        {code: _schema(field, "serialization") for code, field in response_fields.items()},
+        _security(route.dependant),
+        route.openapi_extra,
+    ]
+
+
+def route_fingerprint(app: FastAPI) -> str:
+    """Hash of what shapes the document: app metadata and each documented route.
+
+    Routes contribute their parameters, request body and responses as JSON
+    schemas, so a change to a model's fields changes the fingerprint too.
+    """
+    routes = sorted(
+        (
+            _route_shape(route)
+            for route in iter_route_contexts(app.routes)
+            if isinstance(getattr(route, "route", route), APIRoute) and route.include_in_schema
+        ),
+        key=lambda shape: (shape[0], shape[1]),
+    )
+    info = [
+        app.title,
+        app.version,
+        app.openapi_version,
+        app.summary,
+        app.description,
+        app.terms_of_service,
+        app.contact,
+        app.license_info,
+        app.openapi_tags,
+        app.servers,
+    ]
+    # Responses and tags may hold enums, models or non-string keys
+    return digest(
+        orjson.dumps(
+            [info, routes],
+            default=repr,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS,
+        )
+    )
+
+
+def export_openapi(app: FastAPI, root_path: str = "") -> bytes:
+    """The app's OpenAPI document, encoded, with its route fingerprint."""
+    schema = {**app.openapi(), FINGERPRINT_KEY: route_fingerprint(app)}
+    if root_path and app.root_path_in_servers:
+        # As FastAPI does: advertise the proxy prefix as the first server
+        servers = schema.get("servers", [])
+        if root_path not in {server.get("url") for server in servers}:
+            schema["servers"] = [{"url": root_path}, *servers]
+    return orjson.dumps(schema)
+
+
+class OpenAPIDocument:
+    """One encoded document and a precompressed copy per available encoding."""
+
+    def __init__(self, body: bytes, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.bodies = {"identity": body}
+        for encoding in available_encodings():
+            self.bodies[encoding] = compress(body, encoding)
+        tag = digest(body)
+        self.etags = {
+            encoding: make_etag("openapi", tag)
+            if encoding == "identity"
+            else make_etag("openapi", tag, encoding)
+            for encoding in self.bodies
+        }
+        self.encodings = [encoding for encoding in self.bodies if encoding != "identity"]
+
+
+class OpenAPICache:
+    """Serves the OpenAPI document and docs pages from bytes built once.
+
+    Documents are kept per ``root_path``, since a proxy prefix is advertised
+    in ``servers``.
+
+    Args:
+        app: The application to document
+        max_age: Seconds clients and gateways may reuse the document without revalidating
+        schema_file: Document written by ``scripts/export_openapi.py``, used if current
+    """
+
+    def __init__(self, app: FastAPI, max_age: int = 3600, schema_file: str = ""):
+        self.app = app
+        self.cache_control = f"public, max-age={max_age}"
+        self.schema_file = schema_file
+        self.builds = 0
+        self._documents: dict[str, OpenAPIDocument] = {}
+        self._pages: dict[tuple[str, str], bytes] = {}
+
+    def document(self, root_path: str = "") -> OpenAPIDocument:
+        document = self._documents.get(root_path)
+        if document is None:
+            document = self._documents[root_path] = self._build(root_path)
+        return document
+
+    def refresh(self) -> bool:
+        """Build the document, unless the current one still matches the routes."""
+        fingerprint = route_fingerprint(self.app)
+        current = self._documents.get("")
+        if current is not None and current.fingerprint == fingerprint:
+            return False
+        self._documents.clear()
+        # Older FastAPI versions keep the schema dict until it is reset
+        self.app.openapi_schema = None
+        self._documents[""] = self._build("", fingerprint)
+        return True
+
+    def _build(self, root_path: str, fingerprint: str | None = None) -> OpenAPIDocument:
+        fingerprint = fingerprint or route_fingerprint(self.app)
+        body = self._read_file(fingerprint) if self.schema_file and not root_path else None
+        source = "file" if body is not None else "app"
+        if body is None:
+            body = export_openapi(self.app, root_path)
+        document = OpenAPIDocument(body, fingerprint)
+        self.builds += 1
+        logger.info(
+            "openapi_document_built",
+            source=source,
+            root_path=root_path,
+            fingerprint=fingerprint,
+            size=len(body),
+            compressed={
+                encoding: len(document.bodies[encoding]) for encoding in document.encodings
+            },
+        )
+        return document
+
+    def _read_file(self, fingerprint: str) -> bytes | None:
+        path = Path(self.schema_file)
+        try:
+            body = path.read_bytes()
+            stored = orjson.loads(body).get(FINGERPRINT_KEY)
+        except (OSError, orjson.JSONDecodeError, AttributeError) as exc:
+            logger.warning("openapi_file_unreadable", path=str(path), error=str(exc))
+            return None
+        if stored != fingerprint:
+            logger.warning("openapi_file_stale", path=str(path), fingerprint=stored)
+            return None
+        return body
+
+    def response(self, request: Request) -> Response:
+        """The document in the best encoding the client accepts, or 304."""
+        document = self.document(request.scope.get("root_path", "").rstrip("/"))
+        accept_encoding = request.headers.get("accept-encoding", "")
+        encoding = negotiate(accept_encoding, document.encodings) or "identity"
+        headers = {
+            "ETag": document.etags[encoding],
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        # Every representation carries the same document, so any of its tags is current
+        if_none_match = request.headers.get("if-none-match")
+        if any(etag_matches(if_none_match, etag) for etag in document.etags.values()):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(document.bodies[encoding], media_type="application/json", headers=headers)
+
+    def page(self, request: Request, name: str, render) -> HTMLResponse:
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        body = self._pages.get((name, root_path))
+        if body is None:
+            body = self._pages[(name, root_path)] = render(root_path).body
+        return HTMLResponse(body)
+
+
+def setup_openapi(
+    app: FastAPI,
+    openapi_url: str,
+    docs_url: str | None = "/docs",
+    redoc_url: str | None = "/redoc",
+    max_age: int = 3600,
+    schema_file: str = "",
+) -> OpenAPICache:
+    """Serve the OpenAPI document and docs pages from an ``OpenAPICache``.
+
+    Create the app with ``openapi_url=None`` so FastAPI does not add its own routes.
+    """
+    cache = OpenAPICache(app, max_age=max_age, schema_file=schema_file)
+    app.openapi_url = openapi_url
+
+    async def openapi(request: Request) -> Response:
+        return cache.response(request)
+
+    app.add_route(openapi_url, openapi, include_in_schema=False)
+
+    if docs_url:
+        oauth2_redirect_url = app.swagger_ui_oauth2_redirect_url
+
+        def render_swagger_ui(root_path: str) -> HTMLResponse:
+            return get_swagger_ui_html(
+                openapi_url=root_path + openapi_url,
+                title=f"{app.title} - Swagger UI",
+                oauth2_redirect_url=root_path + oauth2_redirect_url
+                if oauth2_redirect_url
+                else None,
+                init_oauth=app.swagger_ui_init_oauth,
+                swagger_ui_parameters=app.swagger_ui_parameters,
+            )
+
+        async def swagger_ui(request: Request) -> HTMLResponse:
+            return cache.page(request, "swagger_ui", render_swagger_ui)
+
+        app.add_route(docs_url, swagger_ui, include_in_schema=False)
+
+        if oauth2_redirect_url:
+
+            async def swagger_ui_redirect(request: Request) -> HTMLResponse:
+                return cache.page(
+                    request, "oauth2_redirect", lambda _: get_swagger_ui_oauth2_redirect_html()
+                )
+
+            app.add_route(oauth2_redirect_url, swagger_ui_redirect, include_in_schema=False)
+
+    if redoc_url:
+
+        def render_redoc(root_path: str) -> HTMLResponse:
+            return get_redoc_html(openapi_url=root_path + openapi_url, title=f"{app.title} - ReDoc")
+
+        async def redoc(request: Request) -> HTMLResponse:
+            return cache.page(request, "redoc", render_redoc)
+
+        app.add_route(redoc_url, redoc, include_in_schema=False)
+
+    return cache
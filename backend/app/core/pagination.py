@@ -0,0 +1,46 @@
+"""Opaque cursors for keyset pagination."""
+
+import base64
+import json
+from typing import Any
+
+
+def encode_cursor(sort: str, key: Any, last_id: int) -> str:
+    """Encode the position after the last row of a page.
+
+    Args:
+        sort: Sort specification the page was produced with (e.g. "-price")
+        key: Value of the sort column in the last row
+        last_id: Primary key of the last row
+
+    Returns:
+        URL-safe opaque cursor string
+    """
+    raw = json.dumps([sort, key, last_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    """Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string received from the client
+        sort: Sort specification of the current request
+
+    Returns:
+        Tuple of (sort key value, last id)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, key, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+
+    if cursor_sort != sort:
+        raise ValueError("Cursor does not match sort order")
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("Malformed cursor")
+    return key, last_id
@@ -0,0 +1,141 @@
+"""Read-replica selection and the session class that routes reads to replicas."""
+
+import itertools
+import math
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds the replica is behind the primary; 0 when fully replayed or not a standby
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+BALANCING_STRATEGIES = ("round_robin", "least_connections")
+
+# Session.info keys
+REPLICAS_KEY = "replicas"
+PRIMARY_ONLY_KEY = "primary_only"
+
+
+class Replica:
+    """One replica engine and its most recently measured replication lag."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.lag = 0.0
+        self.checked_at = -math.inf
+        self._refresh_lock = threading.Lock()
+
+
+class ReplicaSet:
+    """Picks a replica engine for read-only work.
+
+    Replicas lagging more than ``max_lag`` seconds (or unreachable) are skipped
+    until their next lag check; when none qualify, ``choose`` returns ``None``
+    and the caller falls back to the primary.
+    """
+
+    def __init__(
+        self,
+        engines: list[Engine],
+        balancing: str = "round_robin",
+        max_lag: float = 5.0,
+        check_interval: float = 2.0,
+    ):
+        if balancing not in BALANCING_STRATEGIES:
+            raise ValueError(f"Unknown replica balancing strategy: {balancing}")
+        self.replicas = [Replica(engine) for engine in engines]
+        self.balancing = balancing
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def measure_lag(self, replica: Replica) -> float:
+        with replica.engine.connect() as connection:
+            return float(connection.execute(REPLICA_LAG_SQL).scalar_one())
+
+    def _refresh(self, replica: Replica) -> None:
+        if time.monotonic() - replica.checked_at < self.check_interval:
+            return
+        # One thread refreshes; the others keep using the previous measurement
+        if not replica._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            try:
+                replica.lag = self.measure_lag(replica)
+            except Exception as e:
+                logger.warning("replica_unavailable", replica=_host(replica), error=str(e))
+                replica.lag = math.inf
+            else:
+                if replica.lag > self.max_lag:
+                    logger.warning("replica_lagging", replica=_host(replica), lag=replica.lag)
+            replica.checked_at = time.monotonic()
+        finally:
+            replica._refresh_lock.release()
+
+    def choose(self) -> Engine | None:
+        """Return a healthy replica engine, or ``None`` to use the primary."""
+        for replica in self.replicas:
+            self._refresh(replica)
+        healthy = [replica for replica in self.replicas if replica.lag <= self.max_lag]
+        if not healthy:
+            return None
+        if self.balancing == "least_connections":
+            return min(healthy, key=lambda replica: replica.engine.pool.checkedout()).engine
+        return healthy[next(self._counter) % len(healthy)].engine
+
+    def status(self) -> list[dict[str, Any]]:
+        """Lag and health of each replica as of its last check."""
+        return [
+            {
+                "replica": _host(replica),
+                "lag_seconds": None if math.isinf(replica.lag) else round(replica.lag, 3),
+                "healthy": replica.lag <= self.max_lag,
+            }
+            for replica in self.replicas
+        ]
+
+
+def _host(replica: Replica) -> str:
+    url = replica.engine.url
+    return f"{url.host}:{url.port}/{url.database}"
+
+
+def use_primary(session: Session | AsyncSession) -> None:
+    """Send the rest of ``session``'s statements, reads included, to the primary."""
+    session.info[PRIMARY_ONLY_KEY] = True
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to a replica until it writes.
+
+    The first flush or non-SELECT statement pins the session to the primary for
+    the rest of its life, so a request reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        replicas: ReplicaSet | None = self.info.get(REPLICAS_KEY)
+        if not replicas or self.info.get(PRIMARY_ONLY_KEY):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or not getattr(clause, "is_select", False):
+            self.info[PRIMARY_ONLY_KEY] = True
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replicas.choose() or super().get_bind(mapper, clause=clause, **kw)
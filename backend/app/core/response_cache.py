@@ -0,0 +1,384 @@
+"""Server-side cache for read endpoint payloads.
+
+Entries are JSON-compatible payloads stored under a key built from the route
+and its query parameters, and tagged (``items``, ``item:42``) so writes can
+invalidate everything they affect. Backends:
+
+- ``memory``: per-process LRU with a TTL; other workers only see a write once
+  their own entries expire
+- ``redis``: shared by all workers (``uv sync --extra redis``)
+- ``none``: nothing is stored; concurrent identical reads are still coalesced
+
+Concurrent misses on one key are coalesced so only one of them hits the
+database; the others wait for its result.
+
+Backends keep a generation that every invalidation bumps (one counter per
+process in memory, one per tag in Redis). A load reads it first and its
+result is only stored if it is unchanged, so a read racing a write, in any
+worker, never caches the pre-write payload.
+"""
+
+import asyncio
+import math
+import threading
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+from urllib.parse import urlencode
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Seconds a tag's generation outlives its last invalidation; longer than any load
+GENERATION_TTL = 3600
+
+_UNKNOWN_GENERATION = object()
+
+
+def cache_key(route: str, **params: Any) -> str:
+    """Key for ``route`` and its parameters; ``None`` values are left out."""
+    query = urlencode(sorted((name, value) for name, value in params.items() if value is not None))
+    return f"{route}?{query}"
+
+
+class NullCacheBackend:
+    """Stores nothing."""
+
+    blocking = False
+    stores = False
+
+    def get(self, key: str) -> Any | None:
+        return None
+
+    def generation(self, tags: Iterable[str]) -> Any:
+        return None
+
+    def set(
+        self, key: str, value: Any, ttl: float, tags: Iterable[str], generation: Any = None
+    ) -> None:
+        pass
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, int]:
+        return {}
+
+
+class MemoryCacheBackend:
+    """Per-process LRU/TTL backend; payloads are stored as-is, not serialized."""
+
+    blocking = False
+    stores = True
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, key: str) -> Any | None:
+        return self._cache.get(key)
+
+    def generation(self, tags: Iterable[str]) -> int:
+        """Bumped by every invalidation in this process."""
+        return self._generation
+
+    def set(
+        self, key: str, value: Any, ttl: float, tags: Iterable[str], generation: Any = None
+    ) -> None:
+        """Store ``value``, unless ``generation`` is given and an invalidation came since."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._cache.set(key, value, ttl)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            # Evicted and expired keys linger in the tag index until pruned
+            if len(self._tags) > 2 * self._cache.maxsize:
+                self._prune()
+
+    def _prune(self) -> None:
+        for tag, keys in list(self._tags.items()):
+            live = {key for key in keys if key in self._cache}
+            if live:
+                self._tags[tag] = live
+            else:
+                del self._tags[tag]
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            keys = set().union(*(self._tags.pop(tag, ()) for tag in tags))
+        for key in keys:
+            self._cache.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tags.clear()
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._cache)}
+
+
+class RedisCacheBackend:
+    """Shared backend speaking the Redis protocol; payloads are stored as JSON.
+
+    Each tag is a set of the keys stored under it, plus a generation counter
+    that invalidations increment; an entry is stored only if the generations
+    of its tags are those read before it was loaded (checked under ``WATCH``).
+    Redis errors are logged and treated as misses, so an unavailable cache
+    degrades to uncached reads.
+    """
+
+    blocking = True
+    stores = True
+
+    def __init__(self, url: str | None = None, client: Any = None, prefix: str = "rc:"):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = client if client is not None else redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._errors = (redis.RedisError,)
+        self._watch_error = redis.WatchError
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _generation_key(self, tag: str) -> str:
+        return f"{self.prefix}gen:{tag}"
+
+    def get(self, key: str) -> Any | None:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except self._errors as exc:
+            logger.warning("response_cache_unavailable", operation="get", error=str(exc))
+            return None
+        return None if raw is None else orjson.loads(raw)
+
+    def generation(self, tags: Iterable[str]) -> Any:
+        """Generations of ``tags``, shared by every worker."""
+        generation_keys = [self._generation_key(tag) for tag in tags]
+        if not generation_keys:
+            return []
+        try:
+            return self.client.mget(generation_keys)
+        except self._errors as exc:
+            logger.warning("response_cache_unavailable", operation="generation", error=str(exc))
+            # Matches nothing, so the load is not stored
+            return _UNKNOWN_GENERATION
+
+    def set(
+        self, key: str, value: Any, ttl: float, tags: Iterable[str], generation: Any = None
+    ) -> None:
+        """Store ``value``, unless ``generation`` is given and a tag was invalidated since."""
+        if generation is _UNKNOWN_GENERATION:
+            return
+        tags = list(tags)
+        generation_keys = [self._generation_key(tag) for tag in tags]
+        try:
+            with self.client.pipeline() as pipe:
+                if generation is not None and generation_keys:
+                    # Invalidations from here to EXEC abort the write
+                    pipe.watch(*generation_keys)
+                    if pipe.mget(generation_keys) != generation:
+                        return
+                    pipe.multi()
+                pipe.set(self.prefix + key, orjson.dumps(value), px=max(1, int(ttl * 1000)))
+                for tag in tags:
+                    # A tag outlives the entries added to it
+                    pipe.sadd(self._tag_key(tag), self.prefix + key)
+                    pipe.expire(self._tag_key(tag), math.ceil(ttl))
+                pipe.execute()
+        except self._watch_error:
+            pass
+        except self._errors as exc:
+            logger.warning("response_cache_unavailable", operation="set", error=str(exc))
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                # Before the entries go, so loads that started earlier are not stored
+                pipe.incr(self._generation_key(tag))
+                pipe.expire(self._generation_key(tag), GENERATION_TTL)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            keys = set().union(*pipe.execute()[2 * len(tags) :])
+            self.client.delete(*keys, *tag_keys)
+        except self._errors as exc:
+            # Entries stay stale until their TTL runs out
+            logger.error("response_cache_invalidation_failed", tags=tags, error=str(exc))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> dict[str, int]:
+        return {}
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self._async_calls: dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Call ``fn`` unless another thread is already running it for ``key``."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()`` unless another task is already awaiting it for ``key``.
+
+        ``fn()`` runs in a task of its own that every caller awaits shielded,
+        so a cancelled caller (say, a client that disconnected) neither stops
+        the load nor fails the others.
+        """
+        task = self._async_calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._async_calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._async_calls.get(key) is task:
+            del self._async_calls[key]
+        if not task.cancelled():
+            # Mark retrieved, in case every caller was cancelled
+            task.exception()
+
+
+class ResponseCache:
+    """Read-through payload cache with tag invalidation and single-flight loads.
+
+    A load that overlaps an invalidation of one of its tags is returned but
+    not stored; with the Redis backend this holds across workers.
+    """
+
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._flight = SingleFlight()
+
+    @property
+    def stores(self) -> bool:
+        """Whether loaded payloads are kept (``False`` for the none backend)."""
+        return self.backend.stores
+
+    def get_or_load(self, key: str, tags: Iterable[str], loader: Callable[[], T]) -> T:
+        """Cached payload for ``key``, or the result of ``loader()`` (then cached)."""
+        cached = self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        return self._flight.do(key, lambda: self._load(key, tags, loader))
+
+    def _load(self, key: str, tags: Iterable[str], loader: Callable[[], T]) -> T:
+        tags = tuple(tags)
+        generation = self.backend.generation(tags)
+        value = loader()
+        self.backend.set(key, value, self.ttl, tags, generation)
+        return value
+
+    async def aget_or_load(
+        self, key: str, tags: Iterable[str], loader: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Async ``get_or_load``; blocking backends run in the threadpool."""
+        cached = await self._call(self.backend.get, key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        return await self._flight.ado(key, lambda: self._aload(key, tags, loader))
+
+    async def _aload(self, key: str, tags: Iterable[str], loader: Callable[[], Awaitable[T]]):
+        tags = tuple(tags)
+        generation = await self._call(self.backend.generation, tags)
+        value = await loader()
+        await self._call(self.backend.set, key, value, self.ttl, tags, generation)
+        return value
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry stored under any of ``tags``."""
+        self.invalidations += 1
+        self.backend.invalidate(tags)
+
+    async def ainvalidate(self, *tags: str) -> None:
+        self.invalidations += 1
+        await self._call(self.backend.invalidate, tags)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+            "invalidations": self.invalidations,
+            **self.backend.stats(),
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    """Response cache configured by the RESPONSE_CACHE_* settings."""
+    ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        backend = RedisCacheBackend(settings.REDIS_URL)
+    elif settings.RESPONSE_CACHE_BACKEND == "memory":
+        backend = MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_SIZE, ttl)
+    else:
+        backend = NullCacheBackend()
+    return ResponseCache(backend, ttl)
+
+
+response_cache = create_response_cache()
@@ -0,0 +1,49 @@
+"""JSON response classes.
+
+``FastJSONResponse`` is the application's default response class. Endpoints
+on hot paths return a response instance themselves, so FastAPI skips its
+``jsonable_encoder`` pass and the validation of their ``response_model``:
+
+- plain dicts and lists: ``FastJSONResponse(content)``
+- validated pydantic values: ``PydanticJSONResponse(model)``, serialized in
+  one pass by pydantic-core (pass a ``TypeAdapter`` for lists)
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import PydanticSerializationError, to_jsonable_python
+
+
+def _default(value: Any) -> Any:
+    # Types orjson does not handle natively: pydantic models, Decimal, exceptions, ...
+    try:
+        return to_jsonable_python(value)
+    except PydanticSerializationError:
+        return str(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class PydanticJSONResponse(Response):
+    """Response for an already validated model, or a value matching ``adapter``."""
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, adapter: TypeAdapter | None = None, **kwargs: Any):
+        self.adapter = adapter
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if self.adapter is not None:
+            return self.adapter.dump_json(content)
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        raise TypeError("PydanticJSONResponse needs a model or a TypeAdapter")
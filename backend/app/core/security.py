@@ -1,12 +1,19 @@
 """Security utilities for authentication."""
 
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
 import bcrypt
 import jwt
 
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
 
 # Security configuration
 SECRET_KEY = getattr(settings, "SECRET_KEY", "your-secret-key-change-in-production")
@@ -24,14 +31,119 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
+def get_password_hash(password: str, rounds: int | None = None) -> str:
+    """Hash a password using bcrypt at ``rounds`` (default: BCRYPT_ROUNDS)."""
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode("utf-8")
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a bcrypt hash was made at a cost other than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+def calibrate_bcrypt_rounds(
+    target_seconds: float, min_rounds: int = 4, max_rounds: int = 16
+) -> int:
+    """Highest bcrypt cost whose hash takes at most ``target_seconds`` on this host.
+
+    Each extra round doubles the work, so this measures increasing costs until
+    one exceeds the target; the total time spent is about twice the target.
+    """
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        started_at = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=rounds))
+        if time.perf_counter() - started_at > target_seconds:
+            break
+        best = rounds
+    return best
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-capped thread pool.
+
+    Keeps slow hashing off Starlette's shared threadpool so a burst of logins
+    cannot starve other endpoints. bcrypt releases the GIL, so threads hash in
+    parallel. Calls beyond ``max_workers`` running plus ``max_pending`` queued
+    are rejected with a 503 instead of waiting.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(max_workers, 1), thread_name_prefix="password-hash"
+        )
+
+    def _timed(self, submitted_at: float, fn: Callable[..., Any], *args: Any) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.queue_seconds_total += started_at - submitted_at
+                self.run_seconds_total += time.perf_counter() - started_at
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the hashing pool, or raise a 503 if it is saturated."""
+        with self._lock:
+            if self.in_flight >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise ServiceUnavailableException("Too many authentication requests, retry")
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        # Also runs if the request is cancelled before the job starts
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_seconds_total": round(self.queue_seconds_total, 6),
+                "run_seconds_total": round(self.run_seconds_total, 6),
+            }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def create_access_token(
     data: dict[str, Any], expires_delta: timedelta | None = None
 ) -> str:
@@ -52,6 +164,8 @@ def create_access_token(
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
+    # Token id: distinguishes tokens for the same subject (e.g. principal cache keys)
+    to_encode.setdefault("jti", uuid4().hex)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -1,28 +1,222 @@
 """Database configuration and session management."""
 
-from sqlalchemy import create_engine
+from collections.abc import AsyncIterator, Collection
+from functools import cache, cached_property
+
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.pool import pool_options
+from app.core.replicas import REPLICAS_KEY, ReplicaSet, RoutingSession
 from app.models.base import Base
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=False,
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class Database:
+    """Engines and session factories for one set of settings.
+
+    Engines are created on first use. Each app built by ``create_app`` has
+    one on ``app.state.database``, which its lifespan creates at startup and
+    disposes of on shutdown; sessions for requests come from it.
+
+    Args:
+        settings: DATABASE_*, ASYNC_DATABASE_URL and DB_* settings to use
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def _replica_set(self, engines: list[Engine]) -> ReplicaSet:
+        return ReplicaSet(
+            engines,
+            balancing=self.settings.DB_REPLICA_BALANCING,
+            max_lag=self.settings.DB_REPLICA_MAX_LAG_SECONDS,
+            check_interval=self.settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+        )
+
+    @cached_property
+    def engine(self) -> Engine:
+        return create_engine(self.settings.DATABASE_URL, echo=False, **pool_options(self.settings))
+
+    @cached_property
+    def session_factory(self) -> sessionmaker[Session]:
+        return sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    @cached_property
+    def replicas(self) -> ReplicaSet:
+        """One engine per DATABASE_REPLICA_URLS entry."""
+        return self._replica_set(
+            [
+                create_engine(url, echo=False, **pool_options(self.settings))
+                for url in self.settings.DATABASE_REPLICA_URLS
+            ]
+        )
+
+    @cached_property
+    def read_session_factory(self) -> sessionmaker[Session]:
+        """Sessions for read-only work, routed to replicas when possible."""
+        return sessionmaker(
+            class_=RoutingSession,
+            autocommit=False,
+            autoflush=False,
+            bind=self.engine,
+            info={REPLICAS_KEY: self.replicas},
+        )
+
+    @property
+    def async_url(self) -> str:
+        """ASYNC_DATABASE_URL when set, otherwise DATABASE_URL with the asyncpg driver."""
+        return self.settings.ASYNC_DATABASE_URL or _asyncpg_url(self.settings.DATABASE_URL)
+
+    @cached_property
+    def async_engine(self) -> AsyncEngine:
+        """Created on first use so asyncpg is only needed in async mode."""
+        return create_async_engine(
+            self.async_url, echo=False, **pool_options(self.settings, use_async=True)
+        )
+
+    @cached_property
+    def async_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+
+    @cached_property
+    def async_replicas(self) -> ReplicaSet:
+        """Replica set for the async engine; replicas use the asyncpg driver."""
+        return self._replica_set(
+            [
+                create_async_engine(
+                    _asyncpg_url(url), echo=False, **pool_options(self.settings, use_async=True)
+                )
+                # The routing session works on the sync facade of each async engine
+                .sync_engine
+                for url in self.settings.DATABASE_REPLICA_URLS
+            ]
+        )
+
+    @cached_property
+    def async_read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Sessions for read-only work on the async engines."""
+        return async_sessionmaker(
+            self.async_engine,
+            sync_session_class=RoutingSession,
+            autoflush=False,
+            expire_on_commit=False,
+            info={REPLICAS_KEY: self.async_replicas},
+        )
+
+    @property
+    def primary(self) -> Engine | AsyncEngine:
+        """The engine requests use: async with DATABASE_ASYNC, sync otherwise."""
+        return self.async_engine if self.settings.DATABASE_ASYNC else self.engine
+
+    def created(self, name: str) -> bool:
+        """Whether the engine, session factory or replica set ``name`` was created."""
+        return name in self.__dict__
+
+    async def dispose(self) -> None:
+        """Close the pools of the engines created so far; later use creates new ones."""
+        if self.created("async_engine"):
+            await self.async_engine.dispose()
+        if self.created("engine"):
+            self.engine.dispose()
+        for name in ("replicas", "async_replicas"):
+            if self.created(name):
+                for replica in getattr(self, name).replicas:
+                    replica.engine.dispose()
+        for name in _CACHED:
+            self.__dict__.pop(name, None)
+
+
+_CACHED = [name for name, value in vars(Database).items() if isinstance(value, cached_property)]
+
+
+@cache
+def get_database() -> Database:
+    """Database for the environment's settings, shared by ``app`` and scripts."""
+    return Database(settings)
+
+
+def get_engine() -> Engine:
+    """Engine of the environment's database; the app's lifespan creates it at startup."""
+    return get_database().engine
 
 
-def get_db() -> Session:
+def get_sessionmaker() -> sessionmaker[Session]:
+    """Session factory bound to the environment's database."""
+    return get_database().session_factory
+
+
+def get_async_engine() -> AsyncEngine:
+    """Async engine of the environment's database."""
+    return get_database().async_engine
+
+
+def get_async_database_url() -> str:
+    """Return the async database URL of the environment's settings."""
+    return get_database().async_url
+
+
+def _database(request: Request) -> Database:
+    return request.app.state.database
+
+
+def get_db(request: Request) -> Session:
     """Get database session."""
-    db = SessionLocal()
+    db = _database(request).session_factory()
     try:
         yield db
     finally:
         db.close()
 
 
+def get_read_db(request: Request) -> Session:
+    """Get a database session for read-only work.
+
+    Queries go to a replica when one is configured and caught up; once the
+    session writes, it stays on the primary.
+    """
+    db = _database(request).read_session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _asyncpg_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+async def get_async_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Get async database session."""
+    async with _database(request).async_session_factory() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Get async database session for read-only work (see get_read_db)."""
+    async with _database(request).async_read_session_factory() as db:
+        yield db
+
+
+def violated_constraint(exc: IntegrityError, names: Collection[str]) -> str | None:
+    """Which of the constraints or unique indexes ``names`` ``exc`` violated, if any."""
+    orig = exc.orig
+    diag = getattr(orig, "diag", None)  # psycopg2
+    # asyncpg's error is the cause of SQLAlchemy's adapted DBAPI error
+    reported = getattr(diag, "constraint_name", None) or getattr(
+        orig.__cause__, "constraint_name", None
+    )
+    return reported if reported in names else None
+
+
 def init_db():
     """Initialize database tables."""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
@@ -1,54 +1,97 @@
-"""FastAPI application entry point with refactored structure."""
+"""FastAPI application entry point.
 
+``create_app(settings)`` builds the application; importing this module does
+not. Routers, and with them SQLAlchemy, bcrypt and jwt, are imported by the
+factory, and the app's database engine is created by the lifespan at startup.
+``app`` is built on first access, so both ``uvicorn app.main:app`` and
+``uvicorn --factory app.main:create_app`` work. ``scripts/profile_startup.py``
+measures import and startup time.
+"""
+
+import asyncio
 import uuid
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
 
-from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.exceptions import RequestValidationError
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from app.api.v1.api import api_router
-from app.core.config import settings
+from app.core.config import Settings
+from app.core.config import settings as default_settings
 from app.core.exceptions import AppException
 from app.core.logging import configure_logging, get_logger
-from app.core.middleware import (
-    RequestLoggingMiddleware,
-    RequestTimingMiddleware,
-    SecurityHeadersMiddleware,
-)
-
-# Configure logging at startup
-configure_logging(
-    json_logs=settings.LOG_JSON_FORMAT,
-    log_level=settings.LOG_LEVEL,
-)
+from app.core.responses import FastJSONResponse
 
 logger = get_logger(__name__)
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
-)
 
-# Add middleware in order (CORS first, then others)
-app.add_middleware(CorrelationIdMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RequestTimingMiddleware)
-app.add_middleware(RequestLoggingMiddleware)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the database engine and build the OpenAPI document on startup.
+
+    The pool is warmed first if DB_POOL_WARMUP is set, and email templates are
+    compiled. With SMTP configured and EMAIL_OUTBOX_DISPATCH set,
+    EMAIL_OUTBOX_WORKERS outbox dispatchers run in threads of their own. With
+    LOG_RULES_BACKEND=redis the logging rules, and with
+    PRINCIPAL_CACHE_INVALIDATION=redis the principal cache, are kept in sync
+    with other workers. On shutdown, the dispatchers finish their batches and
+    engines are disposed of.
+    """
+    from app.api.v1.endpoints.auth import drop_principal, principal_invalidations
+    from app.core.invalidation import watch_invalidations
+    from app.core.log_sampling import watch_rules
+    from app.core.pool import warm_async_pool, warm_pool
+    from app.services.email_outbox import create_dispatcher_pool
+    from app.services.email_templates import get_skeleton, get_templates
+
+    settings = app.state.settings
+    database = app.state.database
+    engine = database.primary
+    if settings.DB_POOL_WARMUP:
+        try:
+            if settings.DATABASE_ASYNC:
+                await warm_async_pool(engine, settings.DB_POOL_SIZE)
+            else:
+                await run_in_threadpool(warm_pool, engine, settings.DB_POOL_SIZE)
+            logger.info("db_pool_warmed", connections=settings.DB_POOL_SIZE)
+        except Exception as e:
+            # Start anyway; connections will be opened on demand once the DB is reachable
+            logger.warning("db_pool_warmup_failed", error=str(e))
+    app.state.openapi_cache.refresh()
+    get_templates()
+    get_skeleton()
+
+    watch = None
+    if app.state.log_rules_store is not None:
+        watch = asyncio.create_task(
+            watch_rules(app.state.log_rules_store, settings.LOG_RULES_SYNC_SECONDS)
+        )
+    watch_principals = None
+    if principal_invalidations is not None:
+        watch_principals = asyncio.create_task(
+            watch_invalidations(
+                principal_invalidations, drop_principal, settings.PRINCIPAL_CACHE_SYNC_SECONDS
+            )
+        )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    dispatchers = None
+    if settings.EMAIL_OUTBOX_DISPATCH and settings.SMTP_USER and settings.SMTP_PASSWORD:
+        dispatchers = create_dispatcher_pool(settings, database.session_factory)
+        dispatchers.start(settings.EMAIL_OUTBOX_POLL_SECONDS)
+
+    yield
+
+    if watch is not None:
+        watch.cancel()
+    if watch_principals is not None:
+        watch_principals.cancel()
+    if dispatchers is not None:
+        await asyncio.to_thread(dispatchers.stop)
+    await database.dispose()
 
 
-@app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
     """Handle custom application exceptions."""
     logger.error(
@@ -61,13 +104,13 @@ async def app_exception_handler(request: Request, exc: AppException):
     content = {"detail": exc.message}
     if exc.extra:
         content["extra"] = exc.extra
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content=content,
+        headers=exc.headers,
     )
 
 
-@app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handle HTTP exceptions."""
     logger.warning(
@@ -76,13 +119,12 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         detail=exc.detail,
         path=request.url.path,
     )
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
     )
 
 
-@app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors."""
     logger.warning(
@@ -90,13 +132,12 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         errors=exc.errors(),
         path=request.url.path,
     )
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=422,
         content={"detail": "Validation error", "errors": exc.errors()},
     )
 
 
-@app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions."""
     error_id = str(uuid.uuid4())
@@ -107,7 +148,7 @@ async def generic_exception_handler(request: Request, exc: Exception):
         str_error=str(exc),
         path=request.url.path,
     )
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={
             "detail": "An unexpected error occurred",
@@ -117,24 +158,155 @@ async def generic_exception_handler(request: Request, exc: Exception):
     )
 
 
-@app.get("/")
 async def root():
     logger.info("root_endpoint_called", path="/")
     return {"message": "Hello from {{PROJECT_NAME}}!"}
 
 
-@app.get("/test-app-exception")
 async def test_app_exception():
     """Test endpoint that raises AppException with extra."""
-    from app.core.exceptions import AppException
-
     raise AppException("Test error", status_code=400, extra={"test": "data"})
 
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build the application for ``settings`` (the environment's by default).
+
+    Configures logging, middleware, exception handlers and routes, and the
+    app's database (engines, pools, replicas) on ``app.state.database``, which
+    requests and the outbox dispatcher use. Services shared by every app in
+    the process are configured from the environment instead: the password
+    hashing pool, JWT signing, the principal and response caches, admin users
+    and access-log rules.
+    """
+    from asgi_correlation_id import CorrelationIdMiddleware
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import Response
+
+    from app.api.v1.api import build_api_router
+    from app.api.v1.endpoints.auth import principal_cache
+    from app.core.compression import CompressionMiddleware
+    from app.core.idempotency import IdempotencyMiddleware, create_idempotency_store
+    from app.core.log_sampling import create_rules_store
+    from app.core.logging import log_queue_stats
+    from app.core.metrics import register_stats, render_metrics
+    from app.core.middleware import RequestMiddleware
+    from app.core.openapi import setup_openapi
+    from app.core.pool import pool_status
+    from app.core.response_cache import response_cache
+    from app.core.security import password_hasher
+    from app.database import Database, get_database
+
+    settings = settings or default_settings
+    configure_logging(
+        json_logs=settings.LOG_JSON_FORMAT,
+        log_level=settings.LOG_LEVEL,
+        queued=settings.LOG_QUEUE_ENABLED,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        batch_size=settings.LOG_QUEUE_BATCH_SIZE,
+        overflow=settings.LOG_QUEUE_OVERFLOW,
+    )
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        # Served by setup_openapi below, from bytes built once
+        openapi_url=None,
+        docs_url=None,
+        redoc_url=None,
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
+    app.state.settings = settings
+    # The environment's app shares its engines with scripts; other settings get their own
+    app.state.database = get_database() if settings is default_settings else Database(settings)
+    app.state.openapi_cache = setup_openapi(
+        app,
+        f"{settings.API_V1_STR}/openapi.json",
+        docs_url="/docs" if settings.DOCS_ENABLED else None,
+        redoc_url="/redoc" if settings.DOCS_ENABLED else None,
+        max_age=settings.OPENAPI_CACHE_MAX_AGE,
+        schema_file=settings.OPENAPI_SCHEMA_FILE,
+    )
+
+    # Add middleware in order (CORS first, then others)
+    idempotency_store = None
+    if settings.IDEMPOTENCY_ENABLED:
+        # Innermost: replays store the handler's response before compression
+        idempotency_store = create_idempotency_store(settings)
+        app.add_middleware(
+            IdempotencyMiddleware,
+            store=idempotency_store,
+            wait_timeout=settings.IDEMPOTENCY_WAIT_SECONDS,
+        )
+    app.state.idempotency_store = idempotency_store
+    app.state.log_rules_store = create_rules_store(settings)
+    if settings.COMPRESSION_ENABLED:
+        # Inside the others, so request metrics and X-Process-Time see the compressed body
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+            zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        )
+    app.add_middleware(CorrelationIdMiddleware)
+    app.add_middleware(RequestMiddleware, metrics=settings.METRICS_ENABLED)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
+    )
+
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(Exception, generic_exception_handler)
+
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/test-app-exception", test_app_exception, methods=["GET"])
+    app.include_router(build_api_router(settings.DATABASE_ASYNC), prefix=settings.API_V1_STR)
+
+    async def metrics():
+        """Prometheus metrics in the text exposition format."""
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
+    def db_pool_stats() -> dict:
+        return pool_status(app.state.database.primary.pool)
+
+    if settings.METRICS_ENABLED:
+        app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+        register_stats(
+            {
+                "db_pool": db_pool_stats,
+                "password_hasher": password_hasher.stats,
+                "log_queue": log_queue_stats,
+                "principal_cache": lambda: {
+                    "entries": len(principal_cache),
+                    "hits": principal_cache.hits,
+                    "misses": principal_cache.misses,
+                },
+                "response_cache": response_cache.stats,
+                **({"idempotency": idempotency_store.stats} if idempotency_store else {}),
+            }
+        )
+
+    return app
+
+
+def __getattr__(name: str):
+    # Build ``app`` on first access rather than at import
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
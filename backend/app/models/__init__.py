@@ -1,7 +1,8 @@
 """Database models."""
 
 from app.models.base import Base
+from app.models.email_outbox import EmailOutbox
 from app.models.item import Item
 from app.models.user import User
 
-__all__ = ["Base", "User", "Item"]
+__all__ = ["Base", "User", "Item", "EmailOutbox"]
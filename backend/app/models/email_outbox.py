@@ -0,0 +1,39 @@
+"""Email outbox model."""
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func, text
+
+from app.models.base import Base
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+
+class EmailOutbox(Base):
+    """Email waiting to be sent, written in the transaction that caused it."""
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Dispatchers scan only pending rows, in order, from the next due one
+        Index(
+            "ix_email_outbox_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+    text_content = Column(Text, nullable=True)
+    status = Column(
+        String(20), nullable=False, default=OUTBOX_PENDING, server_default=OUTBOX_PENDING
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # When the row may next be claimed: due time, then lease or retry backoff
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -3,17 +3,34 @@
 # TODO: Replace with your own model
 # This is a placeholder database model - remove or replace with your model
 
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import BigInteger, Column, Float, Index, Integer, Sequence, String
 
 from app.models.base import Base
 
+# Shared by all rows, so the newest change to the table has the highest version
+items_version_seq = Sequence("items_version_seq", metadata=Base.metadata)
+
 
 class Item(Base):
     """Item model."""
 
     __tablename__ = "items"
+    __table_args__ = (
+        # Composite (sort_key, id) indexes back keyset pagination in read_items
+        Index("ix_items_name_id", "name", "id"),
+        Index("ix_items_price_id", "price", "id"),
+        # max(version) backs the collection ETag of read_items
+        Index("ix_items_version", "version"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     price = Column(Float, nullable=False)
     description = Column(String(1000), nullable=True)
+    # Reassigned from items_version_seq on every insert and update; feeds ETags
+    version = Column(
+        BigInteger,
+        nullable=False,
+        server_default=items_version_seq.next_value(),
+        onupdate=items_version_seq.next_value(),
+    )
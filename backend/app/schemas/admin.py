@@ -0,0 +1,24 @@
+"""Admin schemas."""
+
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RouteLogRule(BaseModel):
+    """Logging overrides for one route template."""
+
+    model_config = ConfigDict(strict=True)
+
+    sample_rate: float | None = Field(None, ge=0, le=1)
+    level: Literal["debug", "info", "warning", "error", "critical"] | None = None
+
+
+class LogSamplingConfig(BaseModel):
+    """Access-log sampling rules and per-route log levels."""
+
+    model_config = ConfigDict(strict=True)
+
+    default_sample_rate: float = Field(1.0, ge=0, le=1)
+    slow_request_ms: float = Field(1000.0, ge=0)
+    routes: dict[str, RouteLogRule] = {}
@@ -3,7 +3,9 @@
 # TODO: Replace with your own schemas
 # This is a placeholder Pydantic schema - remove or replace with your schema
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.core.config import settings
 
 
 class ItemBase(BaseModel):
@@ -20,3 +22,37 @@ class ItemCreate(ItemBase):
 class ItemResponse(ItemBase):
     item_id: int
     q: str | None = None
+
+
+class ItemBulkUpdate(ItemBase):
+    item_id: int
+
+
+class ItemBulkDelete(BaseModel):
+    model_config = ConfigDict(strict=True)
+
+    ids: list[int] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class ItemBulkResult(BaseModel):
+    index: int
+    status: str
+    item_id: int | None = None
+    name: str | None = None
+    price: float | None = None
+
+
+class ItemBulkResponse(BaseModel):
+    results: list[ItemBulkResult]
+
+
+class ItemListQuery(BaseModel):
+    """Query parameters for the paginated items list."""
+
+    limit: int = Field(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT)
+    cursor: str | None = None
+    sort: str = Field("id", pattern=r"^-?(id|name|price)$")
+    min_price: float | None = None
+    max_price: float | None = None
+    name_from: str | None = None
+    name_to: str | None = None
@@ -0,0 +1,349 @@
+"""Transactional email outbox.
+
+``add_email`` writes a message to ``email_outbox`` in the caller's session, so
+it commits (or rolls back) together with the change that caused it: a process
+dying right after signup commits no longer loses the confirmation email.
+Dispatchers drain the table, either in the app (EMAIL_OUTBOX_DISPATCH) or as
+separate processes (``scripts/dispatch_email.py``); each process runs a
+``DispatcherPool`` of EMAIL_OUTBOX_WORKERS dispatchers, in threads of their
+own and each with its own SMTP session. A dispatcher works in rounds:
+
+1. Claim a batch of due rows with ``SELECT ... FOR UPDATE SKIP LOCKED``, count
+   the attempt and push ``available_at`` out by a lease, then commit.
+   Concurrent dispatchers skip rows another has locked, and the lease keeps
+   claimed rows from being claimed again while they are sent.
+2. Send the batch over an SMTP session kept open between batches.
+3. Record each outcome: ``sent``; ``failed`` after a 5xx reply or the last
+   attempt; otherwise due again after an exponential backoff.
+
+Rows of a dispatcher that died or stalled mid-batch are claimed again once
+their lease expires, so delivery is at least once. A claim is identified by
+the attempt count it set, and outcomes are only recorded for rows still held
+under that claim, so a dispatcher whose lease ran out cannot overwrite what
+the one that re-claimed the row recorded. Sent rows are deleted once they are
+older than the retention; failed rows are kept for inspection.
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.email_outbox import OUTBOX_FAILED, OUTBOX_PENDING, OUTBOX_SENT, EmailOutbox
+
+logger = get_logger(__name__)
+
+# Seconds between deletes of sent rows past the retention, per dispatcher
+PRUNE_INTERVAL = 3600
+
+
+def add_email(
+    db: Session, to_email: str, subject: str, html_content: str, text_content: str | None = None
+) -> EmailOutbox:
+    """Add a message to the outbox; it is sent once ``db`` commits."""
+    email = EmailOutbox(
+        to_email=to_email, subject=subject, html_content=html_content, text_content=text_content
+    )
+    db.add(email)
+    return email
+
+
+@dataclass
+class ClaimedEmail:
+    id: int
+    to_email: str
+    subject: str
+    html_content: str
+    text_content: str | None
+    attempts: int
+
+
+class OutboxDispatcher:
+    """Claims due outbox rows in batches and sends them over one SMTP session.
+
+    Args:
+        session_factory: Returns a new ``Session``
+        connection: ``SMTPConnection`` reused for every batch
+        batch_size: Rows claimed per round
+        max_attempts: Sends tried per message before it is marked failed
+        retry_base: Delay before the first retry; doubles with each attempt
+        lease_seconds: How long claimed rows are hidden from other dispatchers
+        retention_seconds: How long sent rows are kept; ``None`` keeps them
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        connection,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        retry_base: float = 1.0,
+        lease_seconds: float = 300.0,
+        retention_seconds: float | None = None,
+    ):
+        self.session_factory = session_factory
+        self.connection = connection
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._pruned_at: float | None = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def claim(self, now: datetime | None = None) -> list[ClaimedEmail]:
+        """Lease up to ``batch_size`` due rows to this dispatcher."""
+        now = now or datetime.now(UTC)
+        with self.session_factory() as db:
+            rows = (
+                db.execute(
+                    select(EmailOutbox)
+                    .where(EmailOutbox.status == OUTBOX_PENDING, EmailOutbox.available_at <= now)
+                    .order_by(EmailOutbox.available_at, EmailOutbox.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                .scalars()
+                .all()
+            )
+            lease = now + timedelta(seconds=self.lease_seconds)
+            claimed = []
+            for row in rows:
+                row.attempts += 1
+                row.available_at = lease
+                claimed.append(
+                    ClaimedEmail(
+                        row.id,
+                        row.to_email,
+                        row.subject,
+                        row.html_content,
+                        row.text_content,
+                        row.attempts,
+                    )
+                )
+            db.commit()
+        return claimed
+
+    def dispatch_batch(self, now: datetime | None = None) -> int:
+        """Claim, send and record one batch; return how many rows it had."""
+        from app.services.email_templates import get_skeleton
+        from app.services.smtp import is_permanent_failure
+
+        claimed = self.claim(now)
+        if not claimed:
+            return 0
+        skeleton = get_skeleton()
+        outcomes = []
+        for email in claimed:
+            started = time.perf_counter()
+            try:
+                msg = skeleton.serialize(
+                    email.to_email, email.subject, email.html_content, email.text_content
+                )
+                self.connection.send(skeleton.from_email, [email.to_email], msg)
+            except Exception as exc:
+                if not is_permanent_failure(exc):
+                    # The session may be unusable; the next message reconnects
+                    self.connection.close()
+                give_up = is_permanent_failure(exc) or email.attempts >= self.max_attempts
+                outcomes.append((email, exc, give_up))
+                continue
+            outcomes.append((email, None, False))
+            logger.info(
+                "email_sent",
+                outbox_id=email.id,
+                to=email.to_email,
+                subject=email.subject,
+                attempts=email.attempts,
+                duration_ms=round((time.perf_counter() - started) * 1000, 3),
+            )
+        self._record(outcomes)
+        return len(claimed)
+
+    def _record(self, outcomes: list[tuple[ClaimedEmail, Exception | None, bool]]) -> None:
+        now = datetime.now(UTC)
+        with self.session_factory() as db:
+            for email, exc, give_up in outcomes:
+                if exc is None:
+                    self.sent += 1
+                    values = {"status": OUTBOX_SENT, "sent_at": now, "last_error": None}
+                elif give_up:
+                    self.failed += 1
+                    logger.error(
+                        "email_delivery_failed",
+                        outbox_id=email.id,
+                        to=email.to_email,
+                        attempts=email.attempts,
+                        error=str(exc),
+                    )
+                    values = {"status": OUTBOX_FAILED, "last_error": str(exc)}
+                else:
+                    self.retried += 1
+                    # Full jitter spreads out the retries of a failed batch
+                    delay = random.uniform(0, self.retry_base * 2 ** (email.attempts - 1))
+                    logger.warning(
+                        "email_delivery_retry",
+                        outbox_id=email.id,
+                        to=email.to_email,
+                        attempts=email.attempts,
+                        delay_s=round(delay, 3),
+                        error=str(exc),
+                    )
+                    values = {
+                        "available_at": now + timedelta(seconds=delay),
+                        "last_error": str(exc),
+                    }
+                # Only while this claim holds the row: its status and attempt count are unchanged
+                result = db.execute(
+                    update(EmailOutbox)
+                    .where(
+                        EmailOutbox.id == email.id,
+                        EmailOutbox.status == OUTBOX_PENDING,
+                        EmailOutbox.attempts == email.attempts,
+                    )
+                    .values(**values)
+                )
+                if result.rowcount == 0:
+                    logger.warning(
+                        "email_outbox_lease_lost",
+                        outbox_id=email.id,
+                        to=email.to_email,
+                        attempts=email.attempts,
+                    )
+            db.commit()
+
+    def prune(self, now: datetime | None = None) -> int:
+        """Delete sent rows older than the retention; return how many were deleted."""
+        if self.retention_seconds is None:
+            return 0
+        cutoff = (now or datetime.now(UTC)) - timedelta(seconds=self.retention_seconds)
+        with self.session_factory() as db:
+            result = db.execute(
+                delete(EmailOutbox).where(
+                    EmailOutbox.status == OUTBOX_SENT, EmailOutbox.sent_at < cutoff
+                )
+            )
+            db.commit()
+        if result.rowcount:
+            logger.info("email_outbox_pruned", deleted=result.rowcount)
+        return result.rowcount
+
+    def drain(self) -> int:
+        """Dispatch batches until no due rows are left; return how many were handled."""
+        total = 0
+        while True:
+            count = self.dispatch_batch()
+            total += count
+            if count < self.batch_size:
+                return total
+
+    def run(self, stop: threading.Event, poll_interval: float = 1.0) -> None:
+        """Drain the outbox every ``poll_interval`` seconds until ``stop`` is set."""
+        try:
+            while not stop.is_set():
+                try:
+                    if not self.drain():
+                        # Nothing due: do not hold the SMTP session while idle
+                        self.connection.close()
+                        if self._pruned_at is None or (
+                            time.monotonic() - self._pruned_at >= PRUNE_INTERVAL
+                        ):
+                            self._pruned_at = time.monotonic()
+                            self.prune()
+                except Exception as exc:
+                    logger.error("email_outbox_dispatch_failed", error=str(exc))
+                stop.wait(poll_interval)
+        finally:
+            self.connection.close()
+
+    def stats(self) -> dict[str, int]:
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+
+class DispatcherPool:
+    """Dispatchers that drain the outbox side by side, one thread and SMTP session each.
+
+    They share nothing but the table: ``SKIP LOCKED`` claims hand each one
+    different rows, so a slow SMTP round trip holds up only its own batch.
+    """
+
+    def __init__(self, dispatchers: list[OutboxDispatcher]):
+        self.dispatchers = dispatchers
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self, poll_interval: float = 1.0) -> None:
+        """Run every dispatcher in a thread of its own until ``stop()``."""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=dispatcher.run,
+                args=(self._stop, poll_interval),
+                name=f"email-outbox-{i}",
+                daemon=True,
+            )
+            for i, dispatcher in enumerate(self.dispatchers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Let every dispatcher finish its batch, then wait for its thread."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def drain(self) -> int:
+        """Drain the outbox with every dispatcher at once; return how many rows were handled."""
+
+        def drain_one(dispatcher: OutboxDispatcher) -> int:
+            try:
+                return dispatcher.drain()
+            finally:
+                dispatcher.connection.close()
+
+        with ThreadPoolExecutor(len(self.dispatchers)) as executor:
+            return sum(executor.map(drain_one, self.dispatchers))
+
+    def prune(self) -> int:
+        return self.dispatchers[0].prune()
+
+    def stats(self) -> dict[str, int]:
+        totals = {"sent": 0, "retried": 0, "failed": 0}
+        for dispatcher in self.dispatchers:
+            for name, value in dispatcher.stats().items():
+                totals[name] += value
+        return totals
+
+
+def create_dispatcher(settings, session_factory: Callable[[], Session]) -> OutboxDispatcher:
+    """Dispatcher configured by the SMTP_*, EMAIL_* and EMAIL_OUTBOX_* settings."""
+    from app.services.smtp import smtp_connection
+
+    return OutboxDispatcher(
+        session_factory,
+        smtp_connection(settings),
+        batch_size=settings.EMAIL_BATCH_SIZE,
+        max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+        retry_base=settings.EMAIL_RETRY_BASE_SECONDS,
+        lease_seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS,
+        retention_seconds=settings.EMAIL_OUTBOX_RETENTION_DAYS * 86400 or None,
+    )
+
+
+def create_dispatcher_pool(
+    settings, session_factory: Callable[[], Session], workers: int | None = None
+) -> DispatcherPool:
+    """``workers`` dispatchers (EMAIL_OUTBOX_WORKERS by default) configured by ``settings``."""
+    workers = workers or settings.EMAIL_OUTBOX_WORKERS
+    return DispatcherPool([create_dispatcher(settings, session_factory) for _ in range(workers)])
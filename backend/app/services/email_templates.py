@@ -0,0 +1,205 @@
+"""Precompiled email templates.
+
+Each template in ``app/templates/email`` is a pair of files: ``<name>.txt``
+(a ``Subject:`` line, a blank line, then the plaintext body) and
+``<name>.html``. Both use ``string.Template`` placeholders (``$name`` or
+``${name}``); values are HTML-escaped in the HTML part. Templates are parsed
+once, at startup, into literal segments and placeholder names, so rendering
+is a join.
+
+The MIME structure of a message (``multipart/alternative`` with a plaintext
+and an HTML part) is also serialized once, by ``MIMESkeleton``, into bytes
+with slots for the recipient, subject and base64-encoded bodies. Each
+message is that skeleton with its slots filled, ready for ``sendmail``,
+instead of a new ``MIMEMultipart`` tree flattened per recipient.
+"""
+
+import base64
+import html
+import re
+import secrets
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from string import Template
+from typing import Any
+
+from app.core.config import settings
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+_SLOT = re.compile(rb"@@(\w+)@@")
+
+
+class CompiledTemplate:
+    """``string.Template`` source split once into literal text and placeholders."""
+
+    def __init__(self, source: str, escape: Callable[[str], str] | None = None):
+        self.escape = escape
+        self._literals: list[str] = []
+        self._names: list[str] = []
+        literal: list[str] = []
+        position = 0
+        for match in Template.pattern.finditer(source):
+            literal.append(source[position : match.start()])
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal.append("$")
+            elif match.group("invalid") is not None:
+                raise ValueError(f"Invalid placeholder at position {match.start()}")
+            else:
+                self._literals.append("".join(literal))
+                self._names.append(match.group("named") or match.group("braced"))
+                literal = []
+        literal.append(source[position:])
+        self._literals.append("".join(literal))
+        self.fields = frozenset(self._names)
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        parts = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:], strict=True):
+            value = str(context[name])
+            parts.append(self.escape(value) if self.escape else value)
+            parts.append(literal)
+        return "".join(parts)
+
+
+@dataclass
+class RenderedEmail:
+    to_email: str
+    subject: str
+    html_content: str
+    text_content: str | None = None
+
+    def as_bytes(self) -> bytes:
+        """The message as sent, from the MIME skeleton."""
+        return get_skeleton().serialize(
+            self.to_email, self.subject, self.html_content, self.text_content
+        )
+
+
+class EmailTemplate:
+    """Compiled subject, plaintext and HTML templates of one email."""
+
+    def __init__(self, subject: str, text: str, html_source: str):
+        self.subject = CompiledTemplate(subject)
+        self.text = CompiledTemplate(text)
+        self.html = CompiledTemplate(html_source, escape=html.escape)
+
+    def render(self, to_email: str, context: Mapping[str, Any]) -> RenderedEmail:
+        return RenderedEmail(
+            to_email,
+            self.subject.render(context),
+            self.html.render(context),
+            self.text.render(context),
+        )
+
+    def render_many(
+        self, recipients: Iterable[tuple[str, Mapping[str, Any]]]
+    ) -> list[RenderedEmail]:
+        """Render one message per ``(to_email, context)``, e.g. for reminder runs."""
+        return [self.render(to_email, context) for to_email, context in recipients]
+
+
+def load_templates(directory: Path = TEMPLATE_DIR) -> dict[str, EmailTemplate]:
+    """Compile every ``<name>.txt``/``<name>.html`` pair in ``directory``."""
+    templates = {}
+    for html_path in sorted(directory.glob("*.html")):
+        text_path = html_path.with_suffix(".txt")
+        header, _, text = text_path.read_text(encoding="utf-8").partition("\n\n")
+        if not header.startswith("Subject:"):
+            raise ValueError(f"{text_path} must start with a 'Subject:' line")
+        templates[html_path.stem] = EmailTemplate(
+            header.removeprefix("Subject:").strip(),
+            text,
+            html_path.read_text(encoding="utf-8"),
+        )
+    return templates
+
+
+def _header(value: str) -> bytes:
+    if "\r" in value or "\n" in value:
+        raise ValueError("Header values cannot contain line breaks")
+    if value.isascii():
+        return value.encode()
+    from email.header import Header
+
+    return Header(value, "utf-8").encode(linesep="\r\n").encode()
+
+
+def _body(content: str) -> bytes:
+    return base64.encodebytes(content.encode()).replace(b"\n", b"\r\n")
+
+
+class MIMESkeleton:
+    """Serialized MIME structure of outgoing email, filled in per recipient.
+
+    Args:
+        from_name: Display name of the sender
+        from_email: Sender address, also used as the envelope sender
+    """
+
+    def __init__(self, from_name: str, from_email: str):
+        from email.utils import formataddr
+
+        self.from_email = from_email
+        self.from_header = formataddr((from_name, from_email))
+        # Base64 bodies cannot contain the boundary
+        boundary = f"==============={secrets.token_hex(16)}=="
+        self._html_only = self._compile(boundary, ("html",))
+        self._alternative = self._compile(boundary, ("text", "html"))
+
+    def _compile(self, boundary: str, parts: tuple[str, ...]) -> list[bytes]:
+        """Literal segments and slot names, alternating, of one structure."""
+        from email import policy
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart("alternative", boundary=boundary)
+        msg["Subject"] = "@@subject@@"
+        msg["From"] = self.from_header
+        msg["To"] = "@@to@@"
+        for part in parts:
+            mime = MIMEText("", "plain" if part == "text" else "html", "utf-8")
+            mime.set_payload(f"@@{part}@@")
+            msg.attach(mime)
+        return _SLOT.split(msg.as_bytes(policy=policy.SMTP))
+
+    def serialize(
+        self, to_email: str, subject: str, html_content: str, text_content: str | None = None
+    ) -> bytes:
+        """The message for one recipient, as bytes for ``sendmail``."""
+        values = {"to": _header(to_email), "subject": _header(subject), "html": _body(html_content)}
+        if text_content is None:
+            segments = self._html_only
+        else:
+            segments = self._alternative
+            values["text"] = _body(text_content)
+        parts = [segments[0]]
+        for i in range(1, len(segments), 2):
+            parts.append(values[segments[i].decode()])
+            parts.append(segments[i + 1])
+        return b"".join(parts)
+
+
+@cache
+def get_templates() -> dict[str, EmailTemplate]:
+    """Templates compiled from ``TEMPLATE_DIR``, loaded on first use or at startup."""
+    return load_templates()
+
+
+@cache
+def get_skeleton() -> MIMESkeleton:
+    """Skeleton with the SMTP_FROM_* sender."""
+    return MIMESkeleton(settings.SMTP_FROM_NAME, settings.SMTP_FROM_EMAIL)
+
+
+def render(name: str, to_email: str, **context: Any) -> RenderedEmail:
+    """Render template ``name`` for one recipient."""
+    return get_templates()[name].render(to_email, context)
+
+
+def render_many(name: str, recipients: Iterable[tuple[str, Mapping[str, Any]]]):
+    """Render template ``name`` for each ``(to_email, context)``."""
+    return get_templates()[name].render_many(recipients)
@@ -0,0 +1,57 @@
+"""Streaming serializers for bulk data export."""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence
+from typing import Any
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+Rows = Sequence[Sequence[Any]]
+
+
+def _ndjson_chunk(rows: Rows, fields: Sequence[str]) -> str:
+    return "".join(
+        json.dumps(dict(zip(fields, row, strict=True)), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows: Rows, fields: Sequence[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+ENCODERS = {
+    "ndjson": _ndjson_chunk,
+    "csv": _csv_chunk,
+}
+
+
+def _header(format: str, fields: Sequence[str]) -> str:
+    return _csv_chunk([fields], fields) if format == "csv" else ""
+
+
+def iter_export(format: str, batches: Iterable[Rows], fields: Sequence[str]) -> Iterator[str]:
+    """Yield an optional header chunk, then one encoded chunk per batch of rows."""
+    encode = ENCODERS[format]
+    if header := _header(format, fields):
+        yield header
+    for rows in batches:
+        yield encode(rows, fields)
+
+
+async def aiter_export(
+    format: str, batches: AsyncIterable[Rows], fields: Sequence[str]
+) -> AsyncIterator[str]:
+    """Async counterpart of iter_export for rows streamed from an async session."""
+    encode = ENCODERS[format]
+    if header := _header(format, fields):
+        yield header
+    async for rows in batches:
+        yield encode(rows, fields)
@@ -0,0 +1,87 @@
+"""SMTP sessions kept open between messages.
+
+``SMTPConnection`` does STARTTLS and login once per session rather than once per
+message; outbox dispatchers (``app.services.email_outbox``) send every batch over
+one. ``is_permanent_failure`` tells 5xx rejections, which retrying cannot help,
+from transient errors.
+"""
+
+import smtplib
+
+
+class SMTPConnection:
+    """One SMTP session, opened (STARTTLS, login) on first use and then reused."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str = "",
+        password: str = "",
+        starttls: bool = True,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connects = 0
+        self._smtp: smtplib.SMTP | None = None
+
+    def _open(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        self.connects += 1
+        return smtp
+
+    def send(self, from_addr: str, to_addrs: list[str], msg: bytes) -> None:
+        """Send ``msg``, reconnecting once if the server dropped the idle session."""
+        if self._smtp is None:
+            self._smtp = self._open()
+        try:
+            self._smtp.sendmail(from_addr, to_addrs, msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._smtp = self._open()
+            self._smtp.sendmail(from_addr, to_addrs, msg)
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        smtp, self._smtp = self._smtp, None
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    @property
+    def is_open(self) -> bool:
+        return self._smtp is not None
+
+
+def is_permanent_failure(exc: Exception) -> bool:
+    """Whether retrying cannot help: the server rejected the message with a 5xx reply."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def smtp_connection(settings) -> SMTPConnection:
+    """Connection configured by the SMTP_* settings."""
+    return SMTPConnection(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        user=settings.SMTP_USER,
+        password=settings.SMTP_PASSWORD,
+        starttls=settings.SMTP_STARTTLS,
+        timeout=settings.SMTP_TIMEOUT_SECONDS,
+    )
@@ -0,0 +1,25 @@
+"""Pick a BCRYPT_ROUNDS value for a target hashing latency on this host."""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.core.security import calibrate_bcrypt_rounds
+
+
+def main():
+    """Print the highest bcrypt cost that hashes within the target time."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--target-ms", type=float, default=250, help="maximum time per hash (default: 250)"
+    )
+    args = parser.parse_args()
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms / 1000)
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
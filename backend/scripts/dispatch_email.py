@@ -0,0 +1,53 @@
+"""Send email from the email_outbox table with a pool of dispatchers; run several for more."""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.database import get_sessionmaker
+from app.services.email_outbox import create_dispatcher_pool
+
+
+def main():
+    """Drain the outbox once, or keep polling it until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--once", action="store_true", help="exit once no email is due")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=settings.EMAIL_OUTBOX_POLL_SECONDS,
+        help=f"seconds between polls (default: {settings.EMAIL_OUTBOX_POLL_SECONDS})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.EMAIL_OUTBOX_WORKERS,
+        help=f"dispatchers, each with its own SMTP session "
+        f"(default: {settings.EMAIL_OUTBOX_WORKERS})",
+    )
+    args = parser.parse_args()
+
+    configure_logging(json_logs=settings.LOG_JSON_FORMAT, log_level=settings.LOG_LEVEL)
+    dispatchers = create_dispatcher_pool(settings, get_sessionmaker(), args.workers)
+    if args.once:
+        count = dispatchers.drain()
+        dispatchers.prune()
+        print(f"Dispatched {count} emails: {dispatchers.stats()}")
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    dispatchers.start(args.poll_interval)
+    stop.wait()
+    dispatchers.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Write the OpenAPI document to a file, for OPENAPI_SCHEMA_FILE or client codegen."""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.core.openapi import export_openapi
+from app.main import app
+
+
+def main():
+    """Export the document of the app as currently configured."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--output", default="openapi.json", help="file to write (default: openapi.json)"
+    )
+    args = parser.parse_args()
+
+    body = export_openapi(app)
+    with open(args.output, "wb") as f:
+        f.write(body)
+    print(f"Wrote {len(body)} bytes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Report import time per module and time to first request for the app."""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+BUILD_APP = "import app.main; app.main.create_app()"
+
+
+def import_times() -> list[tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for each module imported while building the app."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BUILD_APP],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        times.append((module.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+async def first_request(application, path: str) -> tuple[float, float, int]:
+    """Run the lifespan startup, then one GET; return both durations and the status."""
+    started = time.perf_counter()
+    async with application.router.lifespan_context(application):
+        ready = time.perf_counter()
+        status = 0
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.4"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"localhost")],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        await application(scope, receive, send)
+        return ready - started, time.perf_counter() - ready, status
+
+
+def main():
+    """Print the slowest imports, imports by package, and startup phases."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=20, help="modules to list (default: 20)")
+    parser.add_argument("--path", default="/", help="path of the first request (default: /)")
+    args = parser.parse_args()
+
+    times = import_times()
+    by_package: dict[str, int] = defaultdict(int)
+    for module, self_us, _ in times:
+        by_package[module.split(".")[0]] += self_us
+
+    print(f"Slowest imports by cumulative time ({len(times)} modules):")
+    for module, self_us, cumulative_us in sorted(times, key=lambda t: -t[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {module}")
+    print("\nImport time by top-level package:")
+    for package, self_us in sorted(by_package.items(), key=lambda p: -p[1])[: args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {package}")
+
+    # Measured in this process, which has not imported the app yet
+    started = time.perf_counter()
+    import app.main
+
+    imported = time.perf_counter()
+    application = app.main.create_app()
+    created = time.perf_counter()
+    startup, request, status = asyncio.run(first_request(application, args.path))
+
+    print("\nTime to first request:")
+    print(f"  {(imported - started) * 1000:9.1f} ms  import app.main")
+    print(f"  {(created - imported) * 1000:9.1f} ms  create_app()")
+    print(f"  {startup * 1000:9.1f} ms  lifespan startup")
+    print(f"  {request * 1000:9.1f} ms  GET {args.path} ({status})")
+    print(f"  {(created - started + startup + request) * 1000:9.1f} ms  total")
+
+
+if __name__ == "__main__":
+    main()
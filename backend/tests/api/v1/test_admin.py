@@ -0,0 +1,141 @@
+"""Test admin endpoints."""
+
+import asyncio
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import log_sampling
+from app.core.config import settings
+from app.core.log_sampling import AccessLogPolicy, RedisRulesStore, rules_from_dict, watch_rules
+
+
+class TestLoggingAdmin:
+    """Test runtime control of log sampling."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_policy(self, monkeypatch):
+        """Restore the process-wide rules after each test."""
+        rules = log_sampling.access_log_policy.rules
+        monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["test_admin"])
+        yield
+        log_sampling.access_log_policy.update(rules)
+
+    def _headers(self, client: TestClient, username: str, password: str) -> dict:
+        response = client.post(
+            "/api/v1/auth/login", data={"username": username, "password": password}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_non_admin_is_forbidden(self, client: TestClient):
+        """Test that users not in ADMIN_USERNAMES get 403."""
+        headers = self._headers(client, "test_user", "user123")
+        response = client.get("/api/v1/admin/logging", headers=headers)
+        assert response.status_code == 403
+
+    def test_requires_authentication(self, client: TestClient):
+        """Test that anonymous requests get 401."""
+        response = client.get("/api/v1/admin/logging")
+        assert response.status_code == 401
+
+    def test_read_rules(self, client: TestClient):
+        """Test that an admin can read the current rules."""
+        headers = self._headers(client, "test_admin", "admin123")
+        response = client.get("/api/v1/admin/logging", headers=headers)
+        assert response.status_code == 200
+        assert set(response.json()) == {"default_sample_rate", "slow_request_ms", "routes"}
+
+    def test_update_rules(self, client: TestClient):
+        """Test that an admin update takes effect in this process immediately."""
+        headers = self._headers(client, "test_admin", "admin123")
+        body = {
+            "default_sample_rate": 0.1,
+            "slow_request_ms": 250.0,
+            "routes": {"/api/v1/health/": {"sample_rate": 0.0, "level": "warning"}},
+        }
+        response = client.put("/api/v1/admin/logging", json=body, headers=headers)
+        assert response.status_code == 200
+        assert response.json() == body
+
+        policy: AccessLogPolicy = log_sampling.access_log_policy
+        assert policy.sample_rate("/api/v1/health/") == 0.0
+        assert policy.sample_rate("/api/v1/items") == 0.1
+        assert policy.rules.slow_request_ms == 250.0
+
+    def test_invalid_rules_rejected(self, client: TestClient):
+        """Test that out-of-range rates are rejected with 422."""
+        headers = self._headers(client, "test_admin", "admin123")
+        response = client.put(
+            "/api/v1/admin/logging", json={"default_sample_rate": 2.0}, headers=headers
+        )
+        assert response.status_code == 422
+
+
+class TestSharedLoggingRules:
+    """Test logging rules shared between workers through Redis."""
+
+    BODY = {
+        "default_sample_rate": 0.5,
+        "slow_request_ms": 100.0,
+        "routes": {"/api/v1/items": {"sample_rate": 0.0, "level": None}},
+    }
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        """Serve the app's rules from a fake Redis; restore the process-wide rules after."""
+        from app.main import app
+
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["test_admin"])
+        monkeypatch.setattr(app.state, "log_rules_store", self.store(server))
+        rules = log_sampling.access_log_policy.rules
+        yield server
+        log_sampling.access_log_policy.update(rules)
+
+    def store(self, server) -> RedisRulesStore:
+        return RedisRulesStore(client=fakeredis.FakeRedis(server=server))
+
+    def headers(self, client: TestClient) -> dict:
+        response = client.post(
+            "/api/v1/auth/login", data={"username": "test_admin", "password": "admin123"}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_update_is_saved_for_other_workers(self, client: TestClient, server):
+        """Test that an update is stored where another worker's store reads it."""
+        response = client.put("/api/v1/admin/logging", json=self.BODY, headers=self.headers(client))
+        assert response.status_code == 200
+        other = AccessLogPolicy()
+        assert other.sync(self.store(server)) is True
+        assert other.sample_rate("/api/v1/items") == 0.0
+        assert other.rules.default_sample_rate == 0.5
+        assert other.sync(self.store(server)) is False
+
+    def test_read_adopts_rules_saved_elsewhere(self, client: TestClient, server):
+        """Test that a read returns, and applies, rules another worker saved."""
+        self.store(server).save(rules_from_dict(self.BODY))
+        response = client.get("/api/v1/admin/logging", headers=self.headers(client))
+        assert response.json() == self.BODY
+        assert log_sampling.access_log_policy.sample_rate("/api/v1/items") == 0.0
+
+    def test_store_unavailable(self, client: TestClient, server):
+        """Test that an update that cannot be shared fails with 503 and changes nothing."""
+        headers = self.headers(client)
+        before = log_sampling.access_log_policy.rules
+        server.connected = False
+        response = client.put("/api/v1/admin/logging", json=self.BODY, headers=headers)
+        assert response.status_code == 503
+        assert log_sampling.access_log_policy.rules == before
+
+    def test_watch_rules(self, server):
+        """Test that the background sync adopts saved rules."""
+        self.store(server).save(rules_from_dict(self.BODY))
+
+        async def watch_briefly():
+            task = asyncio.create_task(watch_rules(self.store(server), interval=0.01))
+            await asyncio.sleep(0.1)
+            task.cancel()
+
+        asyncio.run(watch_briefly())
+        assert log_sampling.access_log_policy.sample_rate("/api/v1/items") == 0.0
@@ -156,3 +156,554 @@ class TestItemsEndpoints:
 
         response = client.delete(f"/api/v1/items/{test_item.id}")
         assert response.status_code == 401
+
+
+class TestItemsPagination:
+    """Test keyset pagination, sorting and filtering of the items list."""
+
+    @pytest.fixture
+    def auth_headers(self, client: TestClient):
+        """Get auth headers with valid token."""
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "test_user", "password": "user123"},
+        )
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    @pytest.fixture
+    def many_items(self, db_session):
+        """Add items with duplicate prices to exercise the id tie-breaker."""
+        from app.models import Item
+
+        db_session.add_all(
+            [
+                Item(name="Apple", price=5.00),
+                Item(name="Banana", price=5.00),
+                Item(name="Cherry", price=30.00),
+                Item(name="Date", price=15.00),
+                Item(name="Elderberry", price=5.00),
+            ]
+        )
+        db_session.commit()
+
+    def _collect(self, client: TestClient, headers, **params):
+        """Walk all pages and return the items in order."""
+        collected = []
+        pages = 0
+        while True:
+            response = client.get("/api/v1/items", params=params, headers=headers)
+            assert response.status_code == 200
+            collected.extend(response.json())
+            pages += 1
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                return collected, pages
+            params = {**params, "cursor": cursor}
+
+    def test_limit_and_cursor_cover_all_items(self, client: TestClient, auth_headers, many_items):
+        """Test walking pages returns every item exactly once in id order."""
+        items, pages = self._collect(client, auth_headers, limit=2)
+        ids = [item["item_id"] for item in items]
+        assert len(ids) == 7
+        assert ids == sorted(ids)
+        assert pages == 4
+
+    def test_last_page_has_no_cursor(self, client: TestClient, auth_headers):
+        """Test that a page holding the remaining rows has no next cursor."""
+        response = client.get("/api/v1/items", params={"limit": 10}, headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        assert "x-next-cursor" not in response.headers
+
+    def test_sort_by_price_descending(self, client: TestClient, auth_headers, many_items):
+        """Test descending sort uses the id as tie-breaker across pages."""
+        items, _ = self._collect(client, auth_headers, limit=2, sort="-price")
+        keys = [(item["price"], item["item_id"]) for item in items]
+        assert keys == sorted(keys, reverse=True)
+        assert len(keys) == 7
+
+    def test_sort_by_name(self, client: TestClient, auth_headers, many_items):
+        """Test ascending sort by name."""
+        items, _ = self._collect(client, auth_headers, limit=3, sort="name")
+        names = [item["name"] for item in items]
+        assert names == sorted(names)
+
+    def test_price_range_filter(self, client: TestClient, auth_headers, many_items):
+        """Test min_price and max_price bound the results."""
+        items, _ = self._collect(
+            client, auth_headers, limit=2, sort="price", min_price=5, max_price=15
+        )
+        prices = [item["price"] for item in items]
+        assert prices == [5.00, 5.00, 5.00, 10.00, 15.00]
+
+    def test_name_range_filter(self, client: TestClient, auth_headers, many_items):
+        """Test name_from is inclusive and name_to is exclusive."""
+        response = client.get(
+            "/api/v1/items",
+            params={"sort": "name", "name_from": "Banana", "name_to": "Date"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert [item["name"] for item in response.json()] == ["Banana", "Cherry"]
+
+    def test_invalid_cursor(self, client: TestClient, auth_headers):
+        """Test that a malformed cursor is rejected."""
+        response = client.get(
+            "/api/v1/items", params={"cursor": "not-a-cursor"}, headers=auth_headers
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+    def test_cursor_from_other_sort_rejected(self, client: TestClient, auth_headers, many_items):
+        """Test that a cursor cannot be reused with a different sort."""
+        response = client.get(
+            "/api/v1/items", params={"limit": 1, "sort": "price"}, headers=auth_headers
+        )
+        cursor = response.headers["x-next-cursor"]
+        response = client.get(
+            "/api/v1/items", params={"cursor": cursor, "sort": "name"}, headers=auth_headers
+        )
+        assert response.status_code == 400
+
+    def test_limit_is_bounded(self, client: TestClient, auth_headers):
+        """Test that limits outside the allowed range are rejected."""
+        response = client.get("/api/v1/items", params={"limit": 0}, headers=auth_headers)
+        assert response.status_code == 422
+        response = client.get("/api/v1/items", params={"limit": 100000}, headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_invalid_sort_rejected(self, client: TestClient, auth_headers):
+        """Test that unknown sort columns are rejected."""
+        response = client.get(
+            "/api/v1/items", params={"sort": "description"}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+
+class TestItemsExport:
+    """Test streaming item export."""
+
+    @pytest.fixture
+    def auth_headers(self, client: TestClient):
+        """Get auth headers with valid token."""
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "test_user", "password": "user123"},
+        )
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_export_ndjson(self, client: TestClient, auth_headers):
+        """Test exporting items as newline-delimited JSON."""
+        import json
+
+        response = client.get("/api/v1/items/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "items.ndjson" in response.headers["content-disposition"]
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["name"] for row in rows] == ["Test Item 1", "Test Item 2"]
+        assert rows[0]["description"] == "First test item"
+
+    def test_export_csv(self, client: TestClient, auth_headers):
+        """Test exporting items as CSV."""
+        import csv
+        import io
+
+        response = client.get(
+            "/api/v1/items/export", params={"format": "csv"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["item_id", "name", "price", "description"]
+        assert len(rows) == 3
+        assert rows[1][1] == "Test Item 1"
+
+    def test_export_spans_multiple_batches(self, client: TestClient, db_session, auth_headers):
+        """Test that rows beyond one batch are all exported."""
+        from app.core.config import settings
+        from app.models import Item
+
+        db_session.add_all(
+            [Item(name=f"Bulk {i}", price=float(i)) for i in range(settings.EXPORT_BATCH_SIZE)]
+        )
+        db_session.commit()
+
+        response = client.get("/api/v1/items/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == settings.EXPORT_BATCH_SIZE + 2
+
+    def test_export_invalid_format(self, client: TestClient, auth_headers):
+        """Test that unsupported formats are rejected."""
+        response = client.get(
+            "/api/v1/items/export", params={"format": "xml"}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+    def test_export_unauthorized(self, client: TestClient):
+        """Test exporting items without auth returns 401."""
+        response = client.get("/api/v1/items/export")
+        assert response.status_code == 401
+
+
+class TestItemsBulk:
+    """Test bulk create/update/delete endpoints."""
+
+    @pytest.fixture
+    def auth_headers(self, client: TestClient):
+        """Get auth headers with valid token."""
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "test_user", "password": "user123"},
+        )
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_bulk_create(self, client: TestClient, db_session, auth_headers):
+        """Test creating many items returns per-row results in input order."""
+        from app.models import Item
+
+        payload = [{"name": f"Bulk {i}", "price": float(i)} for i in range(5)]
+        response = client.post("/api/v1/items/bulk", json=payload, headers=auth_headers)
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["index"] for r in results] == list(range(5))
+        assert all(r["status"] == "created" for r in results)
+        assert [r["name"] for r in results] == [p["name"] for p in payload]
+        assert db_session.query(Item).count() == 7
+
+    def test_bulk_update(self, client: TestClient, db_session, auth_headers):
+        """Test updating many items reports updated and missing rows."""
+        from app.models import Item
+
+        items = [Item(name="A", price=1.00), Item(name="B", price=2.00)]
+        db_session.add_all(items)
+        db_session.commit()
+
+        payload = [
+            {"item_id": items[0].id, "name": "A2", "price": 1.50},
+            {"item_id": 99999, "name": "Ghost", "price": 0.50},
+            {"item_id": items[1].id, "name": "B2", "price": 2.50},
+        ]
+        response = client.put("/api/v1/items/bulk", json=payload, headers=auth_headers)
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == ["updated", "not_found", "updated"]
+        assert results[2]["name"] == "B2"
+
+        db_session.expire_all()
+        assert db_session.get(Item, items[0].id).name == "A2"
+        assert db_session.get(Item, items[1].id).price == 2.50
+
+    def test_bulk_update_duplicate_ids(self, client: TestClient, auth_headers):
+        """Test that duplicate ids in one bulk update are rejected."""
+        payload = [
+            {"item_id": 1, "name": "X", "price": 1.00},
+            {"item_id": 1, "name": "Y", "price": 2.00},
+        ]
+        response = client.put("/api/v1/items/bulk", json=payload, headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_bulk_delete_duplicate_ids(self, client: TestClient, auth_headers):
+        """Test that duplicate ids in one bulk delete are rejected."""
+        response = client.request(
+            "DELETE", "/api/v1/items/bulk", json={"ids": [1, 1]}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+    def test_bulk_delete(self, client: TestClient, db_session, auth_headers):
+        """Test deleting many items reports deleted and missing rows."""
+        from app.models import Item
+
+        response = client.request(
+            "DELETE", "/api/v1/items/bulk", json={"ids": [1, 99999, 2]}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == ["deleted", "not_found", "deleted"]
+        assert db_session.query(Item).count() == 0
+
+    def test_bulk_limits(self, client: TestClient, auth_headers):
+        """Test that empty and oversized batches are rejected."""
+        from app.core.config import settings
+
+        response = client.post("/api/v1/items/bulk", json=[], headers=auth_headers)
+        assert response.status_code == 422
+
+        payload = [{"name": "X", "price": 1.0}] * (settings.BULK_MAX_ITEMS + 1)
+        response = client.post("/api/v1/items/bulk", json=payload, headers=auth_headers)
+        assert response.status_code == 422
+
+        response = client.request(
+            "DELETE", "/api/v1/items/bulk", json={"ids": []}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+        ids = list(range(1, settings.BULK_MAX_ITEMS + 2))
+        response = client.request(
+            "DELETE", "/api/v1/items/bulk", json={"ids": ids}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+    def test_bulk_unauthorized(self, client: TestClient):
+        """Test bulk endpoints without auth return 401."""
+        response = client.post("/api/v1/items/bulk", json=[{"name": "X", "price": 1.0}])
+        assert response.status_code == 401
+
+
+class TestItemsResponseCache:
+    """Test that item reads are cached and item writes invalidate them."""
+
+    @pytest.fixture
+    def auth_headers(self, client: TestClient):
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "test_user", "password": "user123"},
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def _rename_directly(self, db_session, item_id: int, name: str):
+        """Change a row behind the API's back, so only a cache miss can see it."""
+        from app.models import Item
+
+        db_session.query(Item).filter(Item.id == item_id).update({"name": name})
+        db_session.commit()
+
+    def test_read_item_served_from_cache(self, client: TestClient, db_session, auth_headers):
+        """Test that a repeated read does not go back to the database."""
+        assert client.get("/api/v1/items/1", headers=auth_headers).json()["name"] == "Test Item 1"
+        self._rename_directly(db_session, 1, "Changed")
+        assert client.get("/api/v1/items/1", headers=auth_headers).json()["name"] == "Test Item 1"
+
+    def test_update_invalidates_item_and_lists(self, client: TestClient, auth_headers):
+        """Test that an update is visible in the next item and list reads."""
+        client.get("/api/v1/items/1", headers=auth_headers)
+        client.get("/api/v1/items", headers=auth_headers)
+
+        client.put("/api/v1/items/1", json={"name": "Renamed", "price": 11.0}, headers=auth_headers)
+
+        assert client.get("/api/v1/items/1", headers=auth_headers).json()["name"] == "Renamed"
+        names = [item["name"] for item in client.get("/api/v1/items", headers=auth_headers).json()]
+        assert "Renamed" in names
+
+    def test_cache_loads_read_the_primary(self, client: TestClient, auth_headers):
+        """Test that a miss loads from the primary, so a lagging replica is never cached."""
+        from fastapi import Request
+
+        from app.core.replicas import PRIMARY_ONLY_KEY
+        from app.database import get_read_db
+        from app.main import app
+
+        sessions = []
+
+        def read_db(request: Request):
+            for db in get_read_db(request):
+                sessions.append(db)
+                yield db
+
+        app.dependency_overrides[get_read_db] = read_db
+        try:
+            for _ in range(2):
+                client.get("/api/v1/items/1", headers=auth_headers)
+        finally:
+            app.dependency_overrides.pop(get_read_db)
+        assert [db.info.get(PRIMARY_ONLY_KEY, False) for db in sessions] == [True, False]
+
+    def test_create_invalidates_lists(self, client: TestClient, auth_headers):
+        """Test that a created item appears in a previously cached page."""
+        assert len(client.get("/api/v1/items", headers=auth_headers).json()) == 2
+        client.post("/api/v1/items", json={"name": "New", "price": 1.0}, headers=auth_headers)
+        assert len(client.get("/api/v1/items", headers=auth_headers).json()) == 3
+
+    def test_delete_invalidates_item(self, client: TestClient, auth_headers):
+        """Test that a deleted item is no longer served from the cache."""
+        assert client.get("/api/v1/items/2", headers=auth_headers).status_code == 200
+        client.delete("/api/v1/items/2", headers=auth_headers)
+        assert client.get("/api/v1/items/2", headers=auth_headers).status_code == 404
+
+    def test_query_params_are_part_of_the_key(self, client: TestClient, auth_headers):
+        """Test that different query parameters are cached separately."""
+        first = client.get("/api/v1/items?limit=1", headers=auth_headers)
+        both = client.get("/api/v1/items?limit=2", headers=auth_headers)
+        assert len(first.json()) == 1
+        assert len(both.json()) == 2
+        assert first.headers["x-next-cursor"]
+        again = client.get("/api/v1/items?limit=1", headers=auth_headers)
+        assert again.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+
+
+class TestItemsConditionalRequests:
+    """Test ETag, If-None-Match and If-Match handling."""
+
+    @pytest.fixture
+    def auth_headers(self, client: TestClient):
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "test_user", "password": "user123"},
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_read_item_etag_and_not_modified(self, client: TestClient, auth_headers):
+        """Test that a matching If-None-Match yields an empty 304."""
+        response = client.get("/api/v1/items/1", headers=auth_headers)
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        response = client.get("/api/v1/items/1", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_weak_if_none_match_also_matches(self, client: TestClient, auth_headers):
+        """Test that If-None-Match compares weakly."""
+        etag = client.get("/api/v1/items/1", headers=auth_headers).headers["etag"]
+        headers = {**auth_headers, "If-None-Match": f'"other", W/{etag}'}
+        assert client.get("/api/v1/items/1", headers=headers).status_code == 304
+
+    def test_update_changes_item_etag(self, client: TestClient, auth_headers):
+        """Test that an update returns a new ETag and old validators stop matching."""
+        old = client.get("/api/v1/items/1", headers=auth_headers).headers["etag"]
+        response = client.put(
+            "/api/v1/items/1", json={"name": "Renamed", "price": 1.0}, headers=auth_headers
+        )
+        new = response.headers["etag"]
+        assert new != old
+
+        response = client.get("/api/v1/items/1", headers={**auth_headers, "If-None-Match": old})
+        assert response.status_code == 200
+        assert response.headers["etag"] == new
+
+    def test_collection_etag(self, client: TestClient, auth_headers):
+        """Test that the list ETag is stable until any matching item changes."""
+        etag = client.get("/api/v1/items", headers=auth_headers).headers["etag"]
+        conditional = {**auth_headers, "If-None-Match": etag}
+        assert client.get("/api/v1/items", headers=conditional).status_code == 304
+
+        client.delete("/api/v1/items/2", headers=auth_headers)
+        response = client.get("/api/v1/items", headers=conditional)
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_collection_etag_depends_on_query(self, client: TestClient, auth_headers):
+        """Test that different pages of the same collection have different ETags."""
+        first = client.get("/api/v1/items?limit=1", headers=auth_headers).headers["etag"]
+        both = client.get("/api/v1/items?limit=2", headers=auth_headers).headers["etag"]
+        assert first != both
+
+    def test_if_match_update(self, client: TestClient, auth_headers):
+        """Test optimistic concurrency: a stale If-Match is rejected with 412."""
+        etag = client.get("/api/v1/items/1", headers=auth_headers).headers["etag"]
+        conditional = {**auth_headers, "If-Match": etag}
+
+        body = {"name": "First", "price": 1.0}
+        response = client.put("/api/v1/items/1", json=body, headers=conditional)
+        assert response.status_code == 200
+
+        body = {"name": "Second", "price": 2.0}
+        response = client.put("/api/v1/items/1", json=body, headers=conditional)
+        assert response.status_code == 412
+        assert client.get("/api/v1/items/1", headers=auth_headers).json()["name"] == "First"
+
+    def test_if_match_rejects_weak_tags(self, client: TestClient, auth_headers):
+        """Test that If-Match compares strongly."""
+        etag = client.get("/api/v1/items/1", headers=auth_headers).headers["etag"]
+        response = client.request(
+            "DELETE", "/api/v1/items/1", headers={**auth_headers, "If-Match": f"W/{etag}"}
+        )
+        assert response.status_code == 412
+
+    def test_if_match_delete(self, client: TestClient, auth_headers):
+        """Test that a delete with a current If-Match succeeds."""
+        etag = client.get("/api/v1/items/1", headers=auth_headers).headers["etag"]
+        response = client.delete("/api/v1/items/1", headers={**auth_headers, "If-Match": etag})
+        assert response.status_code == 200
+        response = client.delete("/api/v1/items/1", headers={**auth_headers, "If-Match": "*"})
+        assert response.status_code == 412
+
+    def test_if_match_with_compressed_etag(self, auth_headers):
+        """Test that the ETag of a compressed response still works as a validator."""
+        from app.core.config import settings
+        from app.main import create_app
+
+        app = create_app(settings.model_copy(update={"COMPRESSION_MINIMUM_SIZE": 0}))
+        client = TestClient(app)
+        gzip = {**auth_headers, "Accept-Encoding": "gzip"}
+        response = client.get("/api/v1/items/1", headers=gzip)
+        assert response.headers["content-encoding"] == "gzip"
+        etag = response.headers["etag"]
+        assert etag.startswith('"item-1-') and etag.endswith('-gzip"')
+
+        response = client.get("/api/v1/items/1", headers={**gzip, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        body = {"name": "Renamed", "price": 1.0}
+        conditional = {**gzip, "If-Match": etag}
+        assert client.put("/api/v1/items/1", json=body, headers=conditional).status_code == 200
+        assert client.put("/api/v1/items/1", json=body, headers=conditional).status_code == 412
+
+
+class TestItemsWriteStatements:
+    """Test that each item write is a single statement."""
+
+    @pytest.fixture
+    def auth_headers(self, client: TestClient):
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "test_user", "password": "user123"},
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    @pytest.fixture
+    def item_statements(self):
+        """Record the statements that touch the items table."""
+        from sqlalchemy import event
+
+        from app.database import get_engine
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "items" in statement:
+                statements.append(statement.split()[0])
+
+        engine = get_engine()
+        event.listen(engine, "before_cursor_execute", record)
+        yield statements
+        event.remove(engine, "before_cursor_execute", record)
+
+    def test_create(self, client: TestClient, auth_headers, item_statements):
+        """Test that a create is one INSERT ... RETURNING, with no reload."""
+        response = client.post(
+            "/api/v1/items", json={"name": "New", "price": 3.5}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "New"
+        assert item_statements == ["INSERT"]
+
+    def test_update(self, client: TestClient, auth_headers, item_statements):
+        """Test that an update is one UPDATE ... RETURNING, with no lookup."""
+        response = client.put(
+            "/api/v1/items/1", json={"name": "Renamed", "price": 1.0}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json() == {**response.json(), "name": "Renamed", "price": 1.0}
+        assert item_statements == ["UPDATE"]
+
+    def test_conditional_update(self, client: TestClient, auth_headers, item_statements):
+        """Test that If-Match is checked by the UPDATE itself."""
+        etag = client.get("/api/v1/items/1", headers=auth_headers).headers["etag"]
+        item_statements.clear()
+        conditional = {**auth_headers, "If-Match": etag}
+        body = {"name": "Renamed", "price": 1.0}
+        assert client.put("/api/v1/items/1", json=body, headers=conditional).status_code == 200
+        assert client.put("/api/v1/items/1", json=body, headers=conditional).status_code == 412
+        assert item_statements == ["UPDATE", "UPDATE"]
+
+    def test_delete(self, client: TestClient, auth_headers, item_statements):
+        """Test that a delete is one DELETE ... RETURNING, and a missing item is a 404."""
+        assert client.delete("/api/v1/items/1", headers=auth_headers).status_code == 200
+        assert client.delete("/api/v1/items/1", headers=auth_headers).status_code == 404
+        assert item_statements == ["DELETE", "DELETE"]
@@ -0,0 +1 @@
+"""Benchmarks (run with: pytest -m benchmark)."""
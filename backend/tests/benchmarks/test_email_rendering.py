@@ -0,0 +1,82 @@
+"""Messages rendered per second for a bulk send of the confirmation email.
+
+Compares building each message the old way (an f-string body and a fresh
+``MIMEMultipart`` tree flattened to bytes) with the precompiled templates and
+the serialized MIME skeleton, which also add a plaintext part.
+"""
+
+import time
+
+import pytest
+
+from app.services.email_templates import get_skeleton, render_many
+
+pytestmark = pytest.mark.benchmark
+
+MESSAGES = 2_000
+
+
+def legacy_message(to_email: str, username: str, confirmation_url: str) -> bytes:
+    from email import policy
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2>Welcome, {username}!</h2>
+        <p>Thank you for signing up. Please confirm your account by clicking the button below:</p>
+        <p>
+            <a href="{confirmation_url}"
+               style="background-color: #4CAF50; color: white; padding: 12px 24px;
+                      text-decoration: none; border-radius: 4px; display: inline-block;">
+                Confirm Account
+            </a>
+        </p>
+        <p>Or copy and paste this link into your browser:</p>
+        <p style="word-break: break-all; color: #666;">{confirmation_url}</p>
+        <p>This link will expire in 24 hours.</p>
+        <hr>
+        <p style="color: #999; font-size: 12px;">
+            If you didn't create an account, please ignore this email.
+        </p>
+    </body>
+    </html>
+    """
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = "Confirm your account"
+    msg["From"] = "App Name <noreply@example.com>"
+    msg["To"] = to_email
+    msg.attach(MIMEText(html_content, "html"))
+    return msg.as_bytes(policy=policy.SMTP)
+
+
+def test_render_rate():
+    """The compiled templates and skeleton render messages faster than MIMEMultipart."""
+    recipients = [
+        (
+            f"user{i}@example.com",
+            {"username": f"user{i}", "confirmation_url": f"https://example.com/c?token={i}"},
+        )
+        for i in range(MESSAGES)
+    ]
+    skeleton = get_skeleton()
+
+    started_at = time.perf_counter()
+    for to_email, context in recipients:
+        legacy_message(to_email, **context)
+    legacy = MESSAGES / (time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    for message in render_many("confirmation", recipients):
+        skeleton.serialize(
+            message.to_email, message.subject, message.html_content, message.text_content
+        )
+    compiled = MESSAGES / (time.perf_counter() - started_at)
+
+    print(
+        f"\n{MESSAGES} messages: MIMEMultipart {legacy:,.0f}/s, "
+        f"compiled templates + skeleton {compiled:,.0f}/s"
+    )
+    assert compiled > legacy
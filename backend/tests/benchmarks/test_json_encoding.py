@@ -0,0 +1,48 @@
+"""Encoding cost of a 10k-item list response.
+
+Compares FastAPI's path for endpoints that return plain data
+(``jsonable_encoder`` then stdlib ``json``) with ``FastJSONResponse`` and
+with pydantic-core serialization of validated models.
+"""
+
+import time
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse, PydanticJSONResponse
+from app.schemas.item import ItemResponse
+
+pytestmark = pytest.mark.benchmark
+
+ITEMS = 10_000
+ROUNDS = 20
+
+
+def measure(encode) -> float:
+    """Mean seconds per call of ``encode``."""
+    encode()
+    started_at = time.perf_counter()
+    for _ in range(ROUNDS):
+        encode()
+    return (time.perf_counter() - started_at) / ROUNDS
+
+
+def test_list_encoding():
+    """orjson over the cached dicts beats the default jsonable_encoder path."""
+    rows = [{"item_id": i, "name": f"Item {i}", "price": i * 1.5} for i in range(ITEMS)]
+    models = [ItemResponse(**row) for row in rows]
+    adapter = TypeAdapter(list[ItemResponse])
+
+    default = measure(lambda: JSONResponse(jsonable_encoder(rows)))
+    fast = measure(lambda: FastJSONResponse(rows))
+    pydantic = measure(lambda: PydanticJSONResponse(models, adapter=adapter))
+
+    print(
+        f"\n{ITEMS} items: jsonable_encoder+json {default * 1e3:.1f} ms, "
+        f"orjson {fast * 1e3:.1f} ms, TypeAdapter {pydantic * 1e3:.1f} ms"
+    )
+    assert fast < default
+    assert pydantic < default
@@ -0,0 +1,104 @@
+"""Per-request overhead of the middleware stack.
+
+Compares the former three ``BaseHTTPMiddleware`` layers with the single
+pure-ASGI ``RequestMiddleware`` by driving each stack directly over ASGI, so
+neither an HTTP client nor a server adds noise.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+
+from app.core import middleware
+from app.core.middleware import SECURITY_HEADERS, RequestMiddleware
+
+pytestmark = pytest.mark.benchmark
+
+REQUESTS = 2000
+
+
+class LegacyTimingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+        return response
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        # Same work as RequestMiddleware minus the actual log calls
+        _ = (request.method, request.url.path, request.client)
+        response = await call_next(request)
+        _ = response.status_code
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+def endpoint(scope, receive, send):
+    return PlainTextResponse("ok")(scope, receive, send)
+
+
+def legacy_stack():
+    return LegacyLoggingMiddleware(
+        LegacyTimingMiddleware(LegacySecurityHeadersMiddleware(endpoint))
+    )
+
+
+async def measure(app) -> float:
+    """Mean seconds per request for ``app``."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(100):
+        await app(dict(scope), receive, send)
+    started_at = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started_at) / REQUESTS
+
+
+def test_middleware_overhead(monkeypatch):
+    """Single pure-ASGI layer adds less per-request overhead than the legacy stack."""
+    # Logging cost is the same either way; leave it out of the comparison
+    monkeypatch.setattr(middleware, "logger", SimpleNamespace(info=lambda *args, **kwargs: None))
+
+    baseline = asyncio.run(measure(endpoint))
+    legacy = asyncio.run(measure(legacy_stack())) - baseline
+    current = asyncio.run(measure(RequestMiddleware(endpoint))) - baseline
+
+    print(
+        f"\nmiddleware overhead per request: legacy {legacy * 1e6:.1f} us, "
+        f"pure ASGI {current * 1e6:.1f} us ({legacy / max(current, 1e-9):.1f}x)"
+    )
+    assert current < legacy
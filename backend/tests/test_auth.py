@@ -1,13 +1,22 @@
 """Test authentication and JWT functionality."""
 
+import asyncio
+import threading
 from datetime import UTC, datetime, timedelta
 
+import pytest
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
 from app.core.security import (
+    PasswordHasher,
+    calibrate_bcrypt_rounds,
     create_access_token,
     decode_access_token,
     get_password_hash,
+    needs_rehash,
+    password_hasher,
     verify_password,
 )
 
@@ -33,6 +42,60 @@ class TestPasswordHashing:
         """Test verify_password with invalid hash."""
         assert verify_password("password", "invalid_hash") is False
 
+    def test_hash_uses_configured_rounds(self):
+        """Test that hashes are made at BCRYPT_ROUNDS unless overridden."""
+        assert get_password_hash("secret").split("$")[2] == f"{settings.BCRYPT_ROUNDS:02d}"
+        assert get_password_hash("secret", rounds=5).split("$")[2] == "05"
+
+    def test_needs_rehash(self):
+        """Test detecting hashes made at a different cost."""
+        assert needs_rehash(get_password_hash("secret")) is False
+        assert needs_rehash(get_password_hash("secret", rounds=settings.BCRYPT_ROUNDS + 1))
+        assert needs_rehash("invalid_hash") is False
+
+    def test_calibrate_bcrypt_rounds(self):
+        """Test that calibration stays within the allowed range."""
+        assert calibrate_bcrypt_rounds(0) == 4
+        assert 4 <= calibrate_bcrypt_rounds(0.05, max_rounds=8) <= 8
+
+
+class TestPasswordHasher:
+    """Test the bounded password hashing pool."""
+
+    def test_hash_and_verify(self):
+        """Test hashing and verifying through the pool."""
+        hasher = PasswordHasher(max_workers=1, max_pending=1)
+
+        async def roundtrip():
+            hashed = await hasher.hash("secret")
+            return await hasher.verify("secret", hashed), await hasher.verify("wrong", hashed)
+
+        assert asyncio.run(roundtrip()) == (True, False)
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["in_flight"] == 0
+
+    def test_rejects_when_saturated(self):
+        """Test that calls beyond workers plus pending fail fast with 503."""
+        hasher = PasswordHasher(max_workers=1, max_pending=0)
+        release = threading.Event()
+
+        async def saturate():
+            blocker = asyncio.ensure_future(hasher.run(release.wait))
+            await asyncio.sleep(0)
+            try:
+                with pytest.raises(ServiceUnavailableException) as exc_info:
+                    await hasher.run(verify_password, "secret", "hash")
+            finally:
+                release.set()
+                await blocker
+            return exc_info.value
+
+        exc = asyncio.run(saturate())
+        assert exc.status_code == 503
+        assert exc.headers == {"Retry-After": "1"}
+        assert hasher.stats()["rejected"] == 1
+
 
 class TestJWTToken:
     """Test JWT token creation and validation."""
@@ -116,6 +179,33 @@ class TestAuthEndpoints:
         assert response.status_code == 401
         assert response.json()["detail"] == "Incorrect username or password"
 
+    def test_login_hasher_saturated(self, client: TestClient, monkeypatch):
+        """Test that login returns 503 instead of queueing when hashing is saturated."""
+        monkeypatch.setattr(password_hasher, "max_workers", 0)
+        monkeypatch.setattr(password_hasher, "max_pending", 0)
+        response = client.post(
+            "/api/v1/auth/login", data={"username": "test_admin", "password": "admin123"}
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_login_rehashes_password_at_new_cost(self, client: TestClient, db_session):
+        """Test that a hash stored at another cost is replaced on successful login."""
+        from app.models import User
+
+        user = db_session.query(User).filter(User.username == "test_user").one()
+        user.hashed_password = get_password_hash("user123", rounds=settings.BCRYPT_ROUNDS + 1)
+        db_session.commit()
+
+        response = client.post(
+            "/api/v1/auth/login", data={"username": "test_user", "password": "user123"}
+        )
+        assert response.status_code == 200
+
+        db_session.refresh(user)
+        assert needs_rehash(user.hashed_password) is False
+        assert verify_password("user123", user.hashed_password)
+
     def test_read_users_me(self, client: TestClient):
         """Test reading current user info."""
         # First login to get token
@@ -215,6 +305,60 @@ class TestSignupEndpoint:
         assert response.status_code == 400
         assert response.json()["detail"] == "Email already registered"
 
+    def test_signup_is_one_insert_per_table(self, client: TestClient):
+        """Test that signup checks for duplicates in its INSERT, not with lookups first."""
+        from sqlalchemy import event
+
+        from app.database import get_engine
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0:3])
+
+        engine = get_engine()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.post(
+                "/api/v1/auth/signup",
+                json={"username": "single", "email": "single@example.com", "password": "pass1234"},
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert response.status_code == 201
+        assert sorted(statements) == [
+            ["INSERT", "INTO", "email_outbox"],
+            ["INSERT", "INTO", "users"],
+        ]
+
+    def test_concurrent_duplicate_signups(self, client: TestClient, db_session):
+        """Test that racing signups for one username create one user."""
+        import httpx
+
+        from app.main import app
+        from app.models import User
+
+        async def signup_twice():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                return await asyncio.gather(
+                    *(
+                        ac.post(
+                            "/api/v1/auth/signup",
+                            json={
+                                "username": "racer",
+                                "email": f"racer{i}@example.com",
+                                "password": "pass1234",
+                            },
+                        )
+                        for i in range(2)
+                    )
+                )
+
+        responses = asyncio.run(signup_twice())
+        assert sorted(response.status_code for response in responses) == [201, 400]
+        assert db_session.query(User).filter(User.username == "racer").count() == 1
+
     def test_signup_inactive_user_cannot_login(self, client: TestClient, db_session):
         """Test that signup creates inactive user who cannot login."""
         # Signup new user
@@ -337,3 +481,81 @@ class TestConfirmSignupEndpoint:
         )
         assert login_response.status_code == 200
         assert "access_token" in login_response.json()
+
+
+class TestPrincipalCache:
+    """Test caching of the authenticated user between requests."""
+
+    def test_repeat_request_skips_user_lookup(self, client: TestClient, db_session):
+        """Test that a second request with the same token is served from the cache."""
+        from app.models import User
+
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'test_admin'})}"}
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        db_session.query(User).filter(User.username == "test_admin").delete()
+        db_session.commit()
+
+        response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["username"] == "test_admin"
+
+    def test_cache_is_keyed_by_token_id(self, client: TestClient, db_session):
+        """Test that a different token for the same user is not served from the cache."""
+        from app.models import User
+
+        first = {"Authorization": f"Bearer {create_access_token({'sub': 'test_admin'})}"}
+        second = {"Authorization": f"Bearer {create_access_token({'sub': 'test_admin'})}"}
+        assert client.get("/api/v1/auth/me", headers=first).status_code == 200
+
+        db_session.query(User).filter(User.username == "test_admin").delete()
+        db_session.commit()
+
+        assert client.get("/api/v1/auth/me", headers=second).status_code == 401
+
+    def test_confirm_signup_invalidates_cache(self, client: TestClient, db_session):
+        """Test that confirming an account refreshes its cached principal."""
+        from app.models import User
+
+        db_session.add(
+            User(
+                username="cached_user",
+                email="cached@example.com",
+                hashed_password=get_password_hash("password123"),
+                is_active=False,
+                confirmation_token="cache-token-123",
+            )
+        )
+        db_session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'cached_user'})}"}
+
+        assert client.get("/api/v1/auth/me", headers=headers).json()["is_active"] is False
+        client.get("/api/v1/auth/confirm/cache-token-123")
+        assert client.get("/api/v1/auth/me", headers=headers).json()["is_active"] is True
+
+    def test_confirm_signup_publishes_invalidation(
+        self, client: TestClient, db_session, monkeypatch
+    ):
+        """Test that a confirmation is shared with other workers through Redis."""
+        import fakeredis
+
+        from app.api.v1.endpoints import auth
+        from app.core.invalidation import RedisInvalidationLog
+        from app.models import User
+
+        log = RedisInvalidationLog(client=fakeredis.FakeRedis(), key="principals")
+        monkeypatch.setattr(auth, "principal_invalidations", log)
+        db_session.add(
+            User(
+                username="shared_user",
+                email="shared@example.com",
+                hashed_password=get_password_hash("password123"),
+                is_active=False,
+                confirmation_token="shared-token-123",
+            )
+        )
+        db_session.commit()
+
+        client.get("/api/v1/auth/confirm/shared-token-123")
+        client.get("/api/v1/auth/confirm/shared-token-123")
+        assert log.read(b"0-0")[0] == ["shared_user"]
@@ -0,0 +1,51 @@
+"""Tests for the in-process TTL cache."""
+
+import time
+
+from app.core.cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_and_set(self):
+        """Test storing and reading a value."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the oldest unused entry is dropped when full."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire(self):
+        """Test that entries are dropped after their TTL."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_disabled(self):
+        """Test that a zero TTL disables caching."""
+        cache = TTLCache(maxsize=2, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+    def test_delete_matching(self):
+        """Test removing entries by key predicate."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set(("alice", "1"), 1)
+        cache.set(("alice", "2"), 2)
+        cache.set(("bob", "1"), 3)
+        assert cache.delete_matching(lambda key: key[0] == "alice") == 2
+        assert cache.get(("bob", "1")) == 3
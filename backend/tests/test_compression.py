@@ -0,0 +1,179 @@
+"""Test response compression."""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from app.core.compression import CompressionMiddleware, compress, negotiate
+from app.main import app as main_app
+
+PAYLOAD = [{"item_id": i, "name": f"Item {i}", "price": 1.5} for i in range(200)]
+
+
+def run(app, accept_encoding: str | None = "gzip") -> tuple[dict, bytes, int]:
+    """Drive ``app`` over ASGI; return response headers, raw body and body message count."""
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    scope = {
+        "type": "http",
+        # 2.4: streaming responses do not listen for a disconnect
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "method": "GET",
+        "path": "/",
+        "headers": headers,
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    bodies = [message for message in messages[1:] if message["type"] == "http.response.body"]
+    response_headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return response_headers, b"".join(message["body"] for message in bodies), len(bodies)
+
+
+def json_app(content=PAYLOAD, headers=None):
+    return JSONResponse(content, headers=headers)
+
+
+class TestNegotiate:
+    """Test Accept-Encoding negotiation."""
+
+    def test_server_preference_breaks_ties(self):
+        """Test that the first offered encoding wins at equal quality."""
+        assert negotiate("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+
+    def test_client_quality_wins(self):
+        """Test that q-values override the server's preference."""
+        assert negotiate("zstd;q=0.5, gzip", ["zstd", "gzip"]) == "gzip"
+
+    def test_refused_and_wildcard(self):
+        """Test q=0 refusals, the * wildcard and identity fallback."""
+        assert negotiate("gzip;q=0, *", ["gzip", "br"]) == "br"
+        assert negotiate("*;q=0", ["gzip"]) is None
+        assert negotiate("identity", ["gzip"]) is None
+
+
+class TestCompressionMiddleware:
+    """Test the compression middleware."""
+
+    def test_gzip_large_body(self):
+        """Test that a large body is compressed with Vary and Content-Length set."""
+        middleware = CompressionMiddleware(json_app(), encodings=["gzip"])
+        headers, body, _ = run(middleware)
+        assert headers["content-encoding"] == "gzip"
+        assert headers["vary"] == "Accept-Encoding"
+        assert int(headers["content-length"]) == len(body)
+        assert json.loads(gzip.decompress(body)) == PAYLOAD
+
+    def test_small_body_not_compressed(self):
+        """Test that bodies under the threshold pass through."""
+        middleware = CompressionMiddleware(json_app({"ok": True}), minimum_size=1024)
+        headers, body, _ = run(middleware)
+        assert "content-encoding" not in headers
+        assert json.loads(body) == {"ok": True}
+
+    def test_no_accept_encoding(self):
+        """Test that clients that accept no encoding get identity."""
+        headers, body, _ = run(CompressionMiddleware(json_app()), accept_encoding=None)
+        assert "content-encoding" not in headers
+        assert json.loads(body) == PAYLOAD
+
+    def test_strong_etag_per_encoding(self):
+        """Test that compressing gives a strong ETag its own tag per encoding."""
+        middleware = CompressionMiddleware(json_app(headers={"ETag": '"v1"'}), encodings=["gzip"])
+        headers, _, _ = run(middleware)
+        assert headers["etag"] == '"v1-gzip"'
+
+    def test_weak_etag_kept(self):
+        """Test that a weak ETag, which ignores encodings, is left as it is."""
+        middleware = CompressionMiddleware(json_app(headers={"ETag": 'W/"v1"'}), encodings=["gzip"])
+        headers, _, _ = run(middleware)
+        assert headers["etag"] == 'W/"v1"'
+
+    def test_compressed_types_skipped(self):
+        """Test that already compressed media types are left alone."""
+        image = Response(b"\x89PNG" + b"0" * 5000, media_type="image/png")
+        headers, body, _ = run(CompressionMiddleware(image))
+        assert "content-encoding" not in headers
+        assert body.startswith(b"\x89PNG")
+
+    def test_existing_content_encoding_skipped(self):
+        """Test that responses the endpoint already encoded are left alone."""
+        encoded = gzip.compress(b"x" * 5000)
+        response = Response(encoded, media_type="text/plain", headers={"Content-Encoding": "gzip"})
+        _, body, _ = run(CompressionMiddleware(response, encodings=["gzip"]))
+        assert body == encoded
+
+    def test_streaming_response(self):
+        """Test that streaming bodies are compressed chunk by chunk."""
+
+        async def rows():
+            for row in PAYLOAD:
+                yield json.dumps(row) + "\n"
+
+        streaming = StreamingResponse(rows(), media_type="application/x-ndjson")
+        headers, body, count = run(CompressionMiddleware(streaming, encodings=["gzip"]))
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        assert count > 1
+        lines = gzip.decompress(body).decode().splitlines()
+        assert [json.loads(line) for line in lines] == PAYLOAD
+
+    def test_level_trades_cpu_for_bytes(self):
+        """Test that the configured level is used."""
+        words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+        text = " ".join(words[i * 7 % 8] + words[i * 13 % 5] for i in range(20000))
+        fast = CompressionMiddleware(json_app(text), encodings=["gzip"], gzip_level=1)
+        small = CompressionMiddleware(json_app(text), encodings=["gzip"], gzip_level=9)
+        assert len(run(small)[1]) < len(run(fast)[1])
+
+    def test_brotli(self):
+        """Test brotli output when the client prefers it."""
+        brotli = pytest.importorskip("brotli")
+        headers, body, _ = run(CompressionMiddleware(json_app()), accept_encoding="br, gzip")
+        assert headers["content-encoding"] == "br"
+        assert json.loads(brotli.decompress(body)) == PAYLOAD
+
+    def test_zstd(self):
+        """Test zstd output when the client accepts it."""
+        zstd = pytest.importorskip("compression.zstd")
+        headers, body, _ = run(CompressionMiddleware(json_app()), accept_encoding="zstd")
+        assert headers["content-encoding"] == "zstd"
+        assert json.loads(zstd.decompress(body)) == PAYLOAD
+
+
+class TestCompress:
+    """Test one-shot compression of stored bodies."""
+
+    def test_gzip_round_trip(self):
+        """Test that output at the default (highest) and a given level decompresses."""
+        body = json.dumps(PAYLOAD).encode()
+        assert gzip.decompress(compress(body, "gzip")) == body
+        assert gzip.decompress(compress(body, "gzip", level=1)) == body
+
+    def test_brotli_round_trip(self):
+        """Test brotli output at the highest quality."""
+        brotli = pytest.importorskip("brotli")
+        body = json.dumps(PAYLOAD).encode()
+        assert brotli.decompress(compress(body, "br")) == body
+
+
+class TestAppCompression:
+    """Test that the application compresses large responses."""
+
+    def test_openapi_document_compressed(self):
+        """Test that the OpenAPI document goes out gzip-encoded."""
+        client = TestClient(main_app)
+        response = client.get("/api/v1/openapi.json", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "paths" in response.json()
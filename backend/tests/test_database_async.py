@@ -0,0 +1,130 @@
+"""Test the async database engine and async endpoint variants."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+pytest.importorskip("asyncpg")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.api.v1.api import build_api_router  # noqa: E402
+from app.database import (  # noqa: E402
+    get_async_database_url,
+    get_async_db,
+    get_async_read_db,
+)
+
+
+@pytest.fixture
+def async_client():
+    """Client for an app serving the async handlers on the test database."""
+    # NullPool: each TestClient runs its own event loop, so connections can't be reused
+    engine = create_async_engine(get_async_database_url(), poolclass=NullPool)
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(build_api_router(use_async=True), prefix="/api/v1")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def auth_headers(async_client: TestClient):
+    """Get auth headers from the async login endpoint."""
+    response = async_client.post(
+        "/api/v1/auth/login",
+        data={"username": "test_user", "password": "user123"},
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestAsyncDatabaseUrl:
+    """Test async URL derivation."""
+
+    def test_async_url_uses_asyncpg_driver(self):
+        """Test the sync DATABASE_URL is rewritten for asyncpg."""
+        assert get_async_database_url().startswith("postgresql+asyncpg://")
+
+
+class TestAsyncEndpoints:
+    """Test DB-backed endpoints served by async handlers."""
+
+    def test_health_check_db(self, async_client: TestClient):
+        """Test the async DB health check."""
+        response = async_client.get("/api/v1/health/db")
+        assert response.status_code == 200
+        assert response.json()["database"] == "connected"
+
+    def test_login_wrong_password(self, async_client: TestClient):
+        """Test async login rejects a wrong password."""
+        response = async_client.post(
+            "/api/v1/auth/login",
+            data={"username": "test_user", "password": "wrong"},
+        )
+        assert response.status_code == 401
+
+    def test_read_users_me(self, async_client: TestClient, auth_headers):
+        """Test the async current-user lookup."""
+        response = async_client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["username"] == "test_user"
+
+    def test_item_crud(self, async_client: TestClient, auth_headers):
+        """Test create, read, update and delete through the async handlers."""
+        response = async_client.post(
+            "/api/v1/items", json={"name": "Async", "price": 1.50}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        item_id = response.json()["item_id"]
+
+        response = async_client.put(
+            f"/api/v1/items/{item_id}",
+            json={"name": "Async 2", "price": 2.50},
+            headers=auth_headers,
+        )
+        assert response.json()["name"] == "Async 2"
+
+        response = async_client.get(f"/api/v1/items/{item_id}", headers=auth_headers)
+        assert response.json()["price"] == 2.50
+
+        response = async_client.delete(f"/api/v1/items/{item_id}", headers=auth_headers)
+        assert response.status_code == 200
+        response = async_client.get(f"/api/v1/items/{item_id}", headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_read_items_paginated(self, async_client: TestClient, auth_headers):
+        """Test async list endpoint paginates with a cursor."""
+        response = async_client.get("/api/v1/items", params={"limit": 1}, headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+        cursor = response.headers["x-next-cursor"]
+
+        response = async_client.get(
+            "/api/v1/items", params={"limit": 1, "cursor": cursor}, headers=auth_headers
+        )
+        assert response.json()[0]["name"] == "Test Item 2"
+
+    def test_export_streams_rows(self, async_client: TestClient, auth_headers):
+        """Test async export streams every row."""
+        response = async_client.get(
+            "/api/v1/items/export", params={"format": "csv"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == 3
+
+    def test_signup(self, async_client: TestClient):
+        """Test async signup and duplicate detection."""
+        payload = {"username": "async_user", "email": "async@example.com", "password": "pw"}
+        response = async_client.post("/api/v1/auth/signup", json=payload)
+        assert response.status_code == 201
+        response = async_client.post("/api/v1/auth/signup", json=payload)
+        assert response.status_code == 400
@@ -0,0 +1,201 @@
+"""Test the transactional email outbox and its dispatcher."""
+
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.models import EmailOutbox
+from app.services.email_outbox import DispatcherPool, OutboxDispatcher, add_email
+from app.services.smtp import SMTPConnection
+from tests.conftest import TestingSessionLocal
+
+
+def add_emails(db_session, recipients: list[str]) -> None:
+    for recipient in recipients:
+        add_email(db_session, recipient, "Hello", "<p>Hi</p>")
+    db_session.commit()
+
+
+def make_dispatcher(port: int, **kwargs) -> OutboxDispatcher:
+    kwargs.setdefault("retry_base", 0)
+    return OutboxDispatcher(
+        TestingSessionLocal,
+        SMTPConnection("127.0.0.1", port, starttls=False, timeout=5),
+        **kwargs,
+    )
+
+
+def outbox(db_session) -> dict[str, EmailOutbox]:
+    db_session.expire_all()
+    return {row.to_email: row for row in db_session.scalars(select(EmailOutbox))}
+
+
+class TestSignupOutbox:
+    """Test that signup writes its email with the user."""
+
+    def test_signup_adds_confirmation(self, client, db_session):
+        """Test that the confirmation email is stored, not sent, by the request."""
+        response = client.post(
+            "/api/v1/auth/signup",
+            json={"username": "outbox", "email": "outbox@example.com", "password": "pass1234"},
+        )
+        assert response.status_code == 201
+        row = outbox(db_session)["outbox@example.com"]
+        assert row.subject == "Confirm your account"
+        assert row.status == "pending"
+        assert row.attempts == 0
+        assert "/confirm-signup?token=" in row.html_content
+
+    def test_rejected_signup_adds_nothing(self, client, db_session):
+        """Test that no email is stored when the user is not created."""
+        response = client.post(
+            "/api/v1/auth/signup",
+            json={"username": "test_user", "email": "other@example.com", "password": "pass1234"},
+        )
+        assert response.status_code == 400
+        assert outbox(db_session) == {}
+
+
+class TestDispatcher:
+    """Test claiming, sending and recording outbox rows."""
+
+    def test_drain_sends_over_one_session(self, smtp_server, db_session):
+        """Test that every batch goes out over a single login and is marked sent."""
+        handler, port = smtp_server
+        recipients = [f"user{i}@example.com" for i in range(5)]
+        add_emails(db_session, recipients)
+        dispatcher = make_dispatcher(port, batch_size=2)
+        assert dispatcher.drain() == 5
+        dispatcher.connection.close()
+        assert sorted(handler.received) == recipients
+        assert dispatcher.connection.connects == 1
+        rows = outbox(db_session).values()
+        assert {row.status for row in rows} == {"sent"}
+        assert all(row.attempts == 1 and row.sent_at is not None for row in rows)
+
+    def test_transient_failure_retried(self, smtp_server, db_session):
+        """Test that a 4xx reply leaves the row due again and it is sent next round."""
+        handler, port = smtp_server
+        handler.replies["slow@example.com"] = ["451 Try again later"]
+        add_emails(db_session, ["slow@example.com"])
+        dispatcher = make_dispatcher(port)
+        dispatcher.drain()
+        row = outbox(db_session)["slow@example.com"]
+        assert (row.status, row.attempts) == ("pending", 1)
+        assert "Try again later" in row.last_error
+        dispatcher.drain()
+        row = outbox(db_session)["slow@example.com"]
+        assert (row.status, row.attempts, row.last_error) == ("sent", 2, None)
+        assert handler.received == ["slow@example.com"]
+
+    def test_permanent_failure_not_retried(self, smtp_server, db_session):
+        """Test that a 5xx reply marks the row failed after one attempt."""
+        handler, port = smtp_server
+        handler.replies["gone@example.com"] = ["550 No such user"]
+        add_emails(db_session, ["gone@example.com", "ok@example.com"])
+        dispatcher = make_dispatcher(port)
+        dispatcher.drain()
+        rows = outbox(db_session)
+        assert (rows["gone@example.com"].status, rows["gone@example.com"].attempts) == (
+            "failed",
+            1,
+        )
+        assert rows["ok@example.com"].status == "sent"
+        assert dispatcher.stats() == {"sent": 1, "retried": 0, "failed": 1}
+
+    def test_gives_up_after_max_attempts(self, smtp_server, db_session):
+        """Test that a row failing every attempt is marked failed."""
+        handler, port = smtp_server
+        handler.replies["slow@example.com"] = ["451 Try again later"] * 5
+        add_emails(db_session, ["slow@example.com"])
+        dispatcher = make_dispatcher(port, max_attempts=2)
+        dispatcher.drain()
+        dispatcher.drain()
+        dispatcher.drain()
+        row = outbox(db_session)["slow@example.com"]
+        assert (row.status, row.attempts) == ("failed", 2)
+        assert handler.received == []
+
+    def test_expired_lease_does_not_overwrite(self, smtp_server, db_session):
+        """Test that a dispatcher whose lease ran out cannot record over the next claim."""
+        handler, port = smtp_server
+        add_emails(db_session, ["a@example.com"])
+        stalled = make_dispatcher(port, lease_seconds=0)
+        [email] = stalled.claim()
+        dispatcher = make_dispatcher(port)
+        assert dispatcher.drain() == 1
+        stalled._record([(email, TimeoutError("timed out"), True)])
+        row = outbox(db_session)["a@example.com"]
+        assert (row.status, row.attempts, row.last_error) == ("sent", 2, None)
+        assert handler.received == ["a@example.com"]
+
+    def test_prune_deletes_old_sent_rows(self, smtp_server, db_session):
+        """Test that only sent rows older than the retention are deleted."""
+        handler, port = smtp_server
+        handler.replies["gone@example.com"] = ["550 No such user"]
+        add_emails(db_session, ["old@example.com", "new@example.com", "gone@example.com"])
+        dispatcher = make_dispatcher(port, retention_seconds=86400)
+        dispatcher.drain()
+        db_session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.to_email == "old@example.com")
+            .values(sent_at=datetime.now(UTC) - timedelta(days=2))
+        )
+        db_session.commit()
+        assert dispatcher.prune() == 1
+        assert sorted(outbox(db_session)) == ["gone@example.com", "new@example.com"]
+        assert make_dispatcher(port).prune() == 0
+
+
+class TestDispatcherPool:
+    """Test several dispatchers draining the outbox side by side."""
+
+    def test_drain_with_every_worker(self, smtp_server, db_session):
+        """Test that the workers send every row once and close their sessions."""
+        handler, port = smtp_server
+        recipients = [f"user{i}@example.com" for i in range(10)]
+        add_emails(db_session, recipients)
+        pool = DispatcherPool([make_dispatcher(port, batch_size=2) for _ in range(3)])
+        assert pool.drain() == 10
+        assert sorted(handler.received) == recipients
+        assert pool.stats() == {"sent": 10, "retried": 0, "failed": 0}
+        assert not any(dispatcher.connection.is_open for dispatcher in pool.dispatchers)
+
+    def test_start_and_stop(self, smtp_server, db_session):
+        """Test that started workers poll the outbox until stopped."""
+        handler, port = smtp_server
+        pool = DispatcherPool([make_dispatcher(port) for _ in range(2)])
+        pool.start(poll_interval=0.01)
+        add_emails(db_session, ["a@example.com", "b@example.com"])
+        deadline = time.monotonic() + 5
+        while len(handler.received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pool.stop()
+        assert sorted(handler.received) == ["a@example.com", "b@example.com"]
+        assert {row.status for row in outbox(db_session).values()} == {"sent"}
+        assert not any(dispatcher.connection.is_open for dispatcher in pool.dispatchers)
+
+
+class TestClaim:
+    """Test that dispatchers never claim the same row twice."""
+
+    def test_leased_rows_not_claimed_again(self, db_session):
+        """Test that claimed rows stay hidden from other dispatchers until the lease ends."""
+        add_emails(db_session, ["a@example.com", "b@example.com"])
+        first = make_dispatcher(0)
+        second = make_dispatcher(0)
+        assert [email.to_email for email in first.claim()] == ["a@example.com", "b@example.com"]
+        assert second.claim() == []
+
+    def test_locked_rows_skipped(self, db_session):
+        """Test that rows locked by a dispatcher mid-claim are skipped, not waited for."""
+        add_emails(db_session, ["a@example.com", "b@example.com"])
+        with TestingSessionLocal() as other:
+            locked = other.scalars(
+                select(EmailOutbox.to_email).order_by(EmailOutbox.id).limit(1).with_for_update()
+            ).all()
+            claimed = make_dispatcher(0).claim()
+            other.rollback()
+        assert locked == ["a@example.com"]
+        assert [email.to_email for email in claimed] == ["b@example.com"]
@@ -0,0 +1,122 @@
+"""Test precompiled email templates and the MIME skeleton."""
+
+import email
+from email import policy
+
+import pytest
+
+from app.services.email_templates import (
+    CompiledTemplate,
+    EmailTemplate,
+    MIMESkeleton,
+    get_templates,
+    load_templates,
+    render,
+    render_many,
+)
+
+
+def parse(raw: bytes):
+    return email.message_from_bytes(raw, policy=policy.default)
+
+
+class TestCompiledTemplate:
+    """Test placeholder substitution."""
+
+    def test_render(self):
+        """Test that both placeholder forms and ``$$`` are handled like string.Template."""
+        template = CompiledTemplate("$$5 for ${name}'s $item.")
+        assert template.render({"name": "Ann", "item": "tea"}) == "$5 for Ann's tea."
+        assert template.fields == {"name", "item"}
+
+    def test_escape(self):
+        """Test that values, but not the template, are escaped."""
+        template = CompiledTemplate("<b>$name</b>", escape=lambda value: value.upper())
+        assert template.render({"name": "ann"}) == "<b>ANN</b>"
+
+    def test_missing_value(self):
+        """Test that a missing value raises KeyError."""
+        with pytest.raises(KeyError):
+            CompiledTemplate("Hi $name").render({})
+
+    def test_invalid_placeholder(self):
+        """Test that a malformed placeholder is rejected when compiling."""
+        with pytest.raises(ValueError):
+            CompiledTemplate("Costs $5")
+
+
+class TestEmailTemplate:
+    """Test rendering whole emails."""
+
+    def test_confirmation(self):
+        """Test that the confirmation template renders both parts, escaping HTML only."""
+        rendered = render(
+            "confirmation",
+            "ann@example.com",
+            username="<Ann>",
+            confirmation_url="https://example.com/confirm-signup?token=1&x=2",
+        )
+        assert rendered.to_email == "ann@example.com"
+        assert rendered.subject == "Confirm your account"
+        assert "Welcome, &lt;Ann&gt;!" in rendered.html_content
+        assert "token=1&amp;x=2" in rendered.html_content
+        assert "Welcome, <Ann>!" in rendered.text_content
+        assert "token=1&x=2" in rendered.text_content
+
+    def test_render_many(self):
+        """Test that one message is rendered per recipient."""
+        recipients = [
+            (f"user{i}@example.com", {"username": f"user{i}", "confirmation_url": f"/c/{i}"})
+            for i in range(3)
+        ]
+        rendered = render_many("confirmation", recipients)
+        assert [message.to_email for message in rendered] == [r[0] for r in recipients]
+        assert "/c/2" in rendered[2].html_content
+
+    def test_compiled_once(self):
+        """Test that the templates are loaded once and reused."""
+        assert get_templates() is get_templates()
+        assert get_templates()["confirmation"].html.fields == {"username", "confirmation_url"}
+
+    def test_load_requires_subject(self, tmp_path):
+        """Test that a plaintext template without a Subject line is rejected."""
+        (tmp_path / "bad.html").write_text("<p>$name</p>")
+        (tmp_path / "bad.txt").write_text("Hello $name")
+        with pytest.raises(ValueError):
+            load_templates(tmp_path)
+
+
+class TestMIMESkeleton:
+    """Test messages filled in from the serialized skeleton."""
+
+    def test_alternative_message(self):
+        """Test that a filled skeleton parses as text and HTML alternatives."""
+        template = EmailTemplate("Hi $name", "Hello $name", "<p>Hello $name</p>")
+        skeleton = MIMESkeleton("App", "noreply@example.com")
+        rendered = template.render("ann@example.com", {"name": "Ann"})
+        raw = skeleton.serialize(
+            rendered.to_email, rendered.subject, rendered.html_content, rendered.text_content
+        )
+        msg = parse(raw)
+        assert msg["From"] == "App <noreply@example.com>"
+        assert msg["To"] == "ann@example.com"
+        assert msg["Subject"] == "Hi Ann"
+        assert msg.get_body(("plain",)).get_content() == "Hello Ann"
+        assert msg.get_body(("html",)).get_content() == "<p>Hello Ann</p>"
+        assert raw.count(b"\n") == raw.count(b"\r\n")
+
+    def test_html_only_and_unicode(self):
+        """Test a message without plaintext, with a non-ASCII subject."""
+        skeleton = MIMESkeleton("Äpp", "noreply@example.com")
+        msg = parse(skeleton.serialize("ann@example.com", "Grüße ✓", "<p>Grüße</p>"))
+        assert msg["Subject"] == "Grüße ✓"
+        assert msg["From"] == "Äpp <noreply@example.com>"
+        assert msg.get_content_type() == "multipart/alternative"
+        assert [part.get_content_type() for part in msg.iter_parts()] == ["text/html"]
+        assert msg.get_body().get_content() == "<p>Grüße</p>"
+
+    def test_header_injection(self):
+        """Test that line breaks in header values are rejected."""
+        skeleton = MIMESkeleton("App", "noreply@example.com")
+        with pytest.raises(ValueError):
+            skeleton.serialize("ann@example.com\r\nBcc: eve@example.com", "Hi", "<p>Hi</p>")
@@ -0,0 +1,36 @@
+"""Test ETag helpers."""
+
+from app.core.etag import digest, encoded_etag, etag_matches, make_etag, strip_encoding
+
+
+class TestEtag:
+    """Test ETag construction and matching."""
+
+    def test_make_etag(self):
+        """Test that parts are joined into a quoted strong tag."""
+        assert make_etag("item", 1, 7) == '"item-1-7"'
+        assert len(digest("items?limit=10")) == 16
+        assert digest(b"items?limit=10") == digest("items?limit=10")
+
+    def test_matches_list_and_wildcard(self):
+        """Test comma-separated lists and the * wildcard."""
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"b"')
+
+    def test_weak_and_strong_comparison(self):
+        """Test that only weak comparison ignores W/ prefixes."""
+        assert etag_matches('W/"a"', '"a"')
+        assert etag_matches('"a"', 'W/"a"')
+        assert not etag_matches('W/"a"', '"a"', weak=False)
+        assert etag_matches('"a"', '"a"', weak=False)
+
+    def test_encoded_etag(self):
+        """Test that a compressed representation's tag matches the resource's, strongly."""
+        etag = make_etag("item", 1, 7)
+        assert encoded_etag(etag, "gzip") == '"item-1-7-gzip"'
+        assert strip_encoding('"item-1-7-br"') == etag
+        assert strip_encoding(etag) == etag
+        assert etag_matches(encoded_etag(etag, "zstd"), etag, weak=False)
+        assert not etag_matches('"item-1-8-gzip"', etag, weak=False)
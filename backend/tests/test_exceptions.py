@@ -6,6 +6,7 @@ from fastapi.testclient import TestClient
 from app.core.exceptions import (
     AppException,
     NotFoundException,
+    ServiceUnavailableException,
     UnauthorizedException,
     ValidationException,
 )
@@ -45,6 +46,13 @@ class TestExceptions:
         assert exc.message == "Unauthorized"
         assert exc.status_code == 401
 
+    def test_service_unavailable_exception(self):
+        """Test ServiceUnavailableException defaults."""
+        exc = ServiceUnavailableException()
+        assert exc.message == "Service unavailable"
+        assert exc.status_code == 503
+        assert exc.headers == {"Retry-After": "1"}
+
     def test_custom_exception_handler(self):
         """Test that custom exceptions are handled properly."""
         test_app = FastAPI()
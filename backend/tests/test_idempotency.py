@@ -0,0 +1,229 @@
+"""Test Idempotency-Key handling."""
+
+import asyncio
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.core.idempotency import (
+    IdempotencyMiddleware,
+    IdempotencyStore,
+    MemoryIdempotencyBackend,
+    RedisIdempotencyBackend,
+)
+
+
+def make_backend(kind: str, server=None):
+    if kind == "memory":
+        return MemoryIdempotencyBackend(maxsize=100, ttl=60)
+    return RedisIdempotencyBackend(client=fakeredis.FakeRedis(server=server))
+
+
+def make_app(store: IdempotencyStore, delay: float = 0.0, **kwargs):
+    """App whose POST /things counts its calls; ``?status=`` picks the status code.
+
+    ``?no_store=true`` marks the response ``Cache-Control: no-store``.
+    """
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/things", status_code=201)
+    async def create_thing(
+        request: Request, response: Response, status: int = 201, no_store: bool = False
+    ):
+        app.state.calls += 1
+        payload = await request.json()
+        await asyncio.sleep(delay)
+        response.status_code = status
+        if no_store:
+            response.headers["Cache-Control"] = "no-store"
+        return {"call": app.state.calls, **payload}
+
+    app.add_middleware(IdempotencyMiddleware, store=store, **kwargs)
+    return app
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    return IdempotencyStore(make_backend(request.param), ttl=60)
+
+
+class TestIdempotencyKey:
+    """Test replays, mismatches and pass-through."""
+
+    def test_retry_is_replayed(self, store):
+        """Test that a retry gets the stored response without running the handler."""
+        app = make_app(store)
+        client = TestClient(app)
+        headers = {"Idempotency-Key": "abc"}
+        first = client.post("/things", json={"name": "a"}, headers=headers)
+        second = client.post("/things", json={"name": "a"}, headers=headers)
+        assert app.state.calls == 1
+        assert first.status_code == second.status_code == 201
+        assert second.json() == first.json() == {"call": 1, "name": "a"}
+        assert second.headers["content-type"] == "application/json"
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert store.stats()["replays"] == 1
+
+    def test_without_key(self, store):
+        """Test that requests without the header all run."""
+        app = make_app(store)
+        client = TestClient(app)
+        for _ in range(2):
+            client.post("/things", json={"name": "a"})
+        assert app.state.calls == 2
+
+    def test_key_reused_for_other_request(self, store):
+        """Test that a key sent with a different body is rejected."""
+        app = make_app(store)
+        client = TestClient(app)
+        client.post("/things", json={"name": "a"}, headers={"Idempotency-Key": "abc"})
+        response = client.post("/things", json={"name": "b"}, headers={"Idempotency-Key": "abc"})
+        assert response.status_code == 422
+        assert "different request" in response.json()["detail"]
+        assert app.state.calls == 1
+
+    def test_key_scoped_to_caller(self, store):
+        """Test that callers with different credentials do not share keys."""
+        app = make_app(store)
+        client = TestClient(app)
+        for token in ("one", "two"):
+            client.post(
+                "/things",
+                json={"name": "a"},
+                headers={"Idempotency-Key": "abc", "Authorization": f"Bearer {token}"},
+            )
+        assert app.state.calls == 2
+
+    def test_server_errors_are_not_stored(self, store):
+        """Test that a retry after a 5xx runs the handler again."""
+        app = make_app(store)
+        client = TestClient(app)
+        headers = {"Idempotency-Key": "abc"}
+        first = client.post("/things?status=503", json={}, headers=headers)
+        assert first.status_code == 503
+        second = client.post("/things?status=503", json={}, headers=headers)
+        assert app.state.calls == 2
+        assert "idempotent-replayed" not in second.headers
+
+    def test_no_store_responses_are_not_stored(self, store):
+        """Test that a retry of a no-store response runs the handler again."""
+        app = make_app(store)
+        client = TestClient(app)
+        headers = {"Idempotency-Key": "abc"}
+        for _ in range(2):
+            response = client.post("/things?no_store=true", json={}, headers=headers)
+            assert response.status_code == 201
+            assert "idempotent-replayed" not in response.headers
+        assert app.state.calls == 2
+
+    def test_invalid_key(self, store):
+        """Test that an overlong key is rejected."""
+        app = make_app(store)
+        response = TestClient(app).post("/things", json={}, headers={"Idempotency-Key": "x" * 256})
+        assert response.status_code == 400
+        assert app.state.calls == 0
+
+
+class TestConcurrentDuplicates:
+    """Test duplicates that arrive while the first request is running."""
+
+    async def post_twice(self, *apps, headers=None):
+        clients = [
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+            for app in apps
+        ]
+        headers = headers or {"Idempotency-Key": "abc"}
+        try:
+            return await asyncio.gather(
+                *(
+                    clients[i % len(clients)].post("/things", json={"name": "a"}, headers=headers)
+                    for i in range(2)
+                )
+            )
+        finally:
+            for client in clients:
+                await client.aclose()
+
+    def test_duplicate_waits_for_result(self, store):
+        """Test that a concurrent duplicate gets the first request's response."""
+        app = make_app(store, delay=0.05)
+        first, second = asyncio.run(self.post_twice(app))
+        assert app.state.calls == 1
+        assert first.json() == second.json()
+        replayed = [r for r in (first, second) if "idempotent-replayed" in r.headers]
+        assert len(replayed) == 1
+
+    def test_duplicate_in_other_process(self):
+        """Test that workers sharing Redis poll for each other's result."""
+        server = fakeredis.FakeServer()
+        apps = [
+            make_app(IdempotencyStore(make_backend("redis", server)), delay=0.05),
+            make_app(IdempotencyStore(make_backend("redis", server)), delay=0.05),
+        ]
+        first, second = asyncio.run(self.post_twice(*apps))
+        assert apps[0].state.calls + apps[1].state.calls == 1
+        assert first.json() == second.json()
+
+    def test_claim_held_past_lock_ttl(self):
+        """Test that a request running longer than the lock TTL keeps its key."""
+        server = fakeredis.FakeServer()
+        apps = [
+            make_app(IdempotencyStore(make_backend("redis", server), lock_ttl=0.03), delay=0.2)
+            for _ in range(2)
+        ]
+        first, second = asyncio.run(self.post_twice(*apps))
+        assert apps[0].state.calls + apps[1].state.calls == 1
+        assert first.json() == second.json()
+
+    def test_wait_timeout(self):
+        """Test that a duplicate still waiting after the timeout gets 409."""
+        store = IdempotencyStore(make_backend("memory"))
+        app = make_app(store, delay=0.2, wait_timeout=0.01)
+        responses = asyncio.run(self.post_twice(app))
+        assert sorted(response.status_code for response in responses) == [201, 409]
+        assert app.state.calls == 1
+        assert store.stats()["timeouts"] == 1
+
+
+class TestAppIdempotency:
+    """Test the header against the application's endpoints."""
+
+    def test_create_item_retry(self, client: TestClient, db_session):
+        """Test that a retried create returns the same item and adds one row."""
+        from app.models import Item
+
+        token = client.post(
+            "/api/v1/auth/login", data={"username": "test_user", "password": "user123"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "create-1"}
+        item = {"name": "Retried", "price": 5.0}
+        first = client.post("/api/v1/items", json=item, headers=headers)
+        second = client.post("/api/v1/items", json=item, headers=headers)
+        assert first.status_code == second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["idempotent-replayed"] == "true"
+        assert db_session.query(Item).filter(Item.name == "Retried").count() == 1
+
+    def test_login_not_stored(self, client: TestClient):
+        """Test that issued tokens are not kept for replay."""
+        form = {"username": "test_user", "password": "user123"}
+        headers = {"Idempotency-Key": "login-1"}
+        for _ in range(2):
+            response = client.post("/api/v1/auth/login", data=form, headers=headers)
+            assert response.status_code == 200
+            assert response.headers["cache-control"] == "no-store"
+            assert "idempotent-replayed" not in response.headers
+
+    def test_signup_retry(self, client: TestClient):
+        """Test that a retried signup replays its 201 instead of hashing and failing."""
+        user = {"username": "retry", "email": "retry@example.com", "password": "password123"}
+        headers = {"Idempotency-Key": "signup-1"}
+        first = client.post("/api/v1/auth/signup", json=user, headers=headers)
+        second = client.post("/api/v1/auth/signup", json=user, headers=headers)
+        assert first.status_code == second.status_code == 201
+        assert second.headers["idempotent-replayed"] == "true"
@@ -0,0 +1,77 @@
+"""Test cache invalidations shared through Redis."""
+
+import asyncio
+
+import fakeredis
+
+from app.core.invalidation import RedisInvalidationLog, watch_invalidations
+
+
+def make_log(server) -> RedisInvalidationLog:
+    return RedisInvalidationLog(client=fakeredis.FakeRedis(server=server), key="test")
+
+
+class TestRedisInvalidationLog:
+    """Test publishing and reading invalidated names."""
+
+    def test_read_after_latest(self):
+        """Test that a reader sees only names published after its position."""
+        server = fakeredis.FakeServer()
+        publisher, reader = make_log(server), make_log(server)
+        publisher.publish("old")
+        after = reader.latest()
+        publisher.publish("alice")
+        publisher.publish("bob")
+        names, after = reader.read(after)
+        assert names == ["alice", "bob"]
+        assert reader.read(after) == ([], after)
+
+    def test_empty_stream(self):
+        """Test reading a stream nothing was published to."""
+        log = make_log(fakeredis.FakeServer())
+        assert log.read(log.latest()) == ([], b"0-0")
+
+    def test_stream_is_capped(self):
+        """Test that old entries are trimmed (lazily, as MAXLEN ~ allows)."""
+        log = RedisInvalidationLog(client=fakeredis.FakeRedis(), key="test", maxlen=5)
+        for i in range(300):
+            log.publish(f"user{i}")
+        assert log.client.xlen("test") < 300
+
+
+class TestWatchInvalidations:
+    """Test the background sync between workers."""
+
+    def test_other_workers_invalidations_applied(self):
+        """Test that names published elsewhere reach the callback."""
+        server = fakeredis.FakeServer()
+        dropped = []
+
+        async def watch_briefly():
+            task = asyncio.create_task(watch_invalidations(make_log(server), dropped.append, 0.01))
+            await asyncio.sleep(0.05)
+            make_log(server).publish("alice")
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(watch_briefly())
+        assert dropped == ["alice"]
+
+    def test_unreachable_redis(self):
+        """Test that the watcher keeps running while Redis is down."""
+        server = fakeredis.FakeServer()
+        server.connected = False
+        dropped = []
+
+        async def watch_briefly():
+            task = asyncio.create_task(watch_invalidations(make_log(server), dropped.append, 0.01))
+            await asyncio.sleep(0.05)
+            server.connected = True
+            await asyncio.sleep(0.05)
+            make_log(server).publish("alice")
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            task.cancel()
+
+        asyncio.run(watch_briefly())
+        assert dropped == ["alice"]
@@ -0,0 +1,157 @@
+"""Test access-log sampling and per-route log levels."""
+
+import pytest
+import structlog
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import log_sampling, middleware
+from app.core.log_sampling import (
+    AccessLogPolicy,
+    LogSamplingRules,
+    RouteLogRule,
+    bind_request_scope,
+    route_level_filter,
+    unbind_request_scope,
+)
+from app.core.middleware import RequestMiddleware
+
+log_sampling_logger = structlog.get_logger("log_sampling_test")
+
+
+class RecordingLogger:
+    """Collects (level, event, fields) instead of logging."""
+
+    def __init__(self):
+        self.records = []
+
+    def __getattr__(self, level):
+        return lambda event, **fields: self.records.append((level, event, fields))
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    policy = AccessLogPolicy()
+    monkeypatch.setattr(log_sampling, "access_log_policy", policy)
+    monkeypatch.setattr(middleware, "access_log_policy", policy)
+    return policy
+
+
+@pytest.fixture
+def access_log(monkeypatch):
+    recorder = RecordingLogger()
+    monkeypatch.setattr(middleware, "logger", recorder)
+    return recorder
+
+
+@pytest.fixture
+def sampled_client():
+    app = FastAPI()
+
+    @app.get("/things/{thing_id}")
+    def read_thing(thing_id: int):
+        log_sampling_logger.debug("thing_debug")
+        return {"id": thing_id}
+
+    @app.get("/broken")
+    def broken():
+        return app.state.missing
+
+    app.add_middleware(RequestMiddleware, metrics=False)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestAccessLogPolicy:
+    """Test the sampling decisions."""
+
+    def test_default_logs_everything_at_info(self):
+        """Test that a rate of 1.0 logs every request."""
+        policy = AccessLogPolicy()
+        assert all(policy.access_level("/a", 200, 1.0) == "info" for _ in range(50))
+
+    def test_zero_rate_drops_successful_requests(self):
+        """Test that sampled-out requests produce no access line."""
+        policy = AccessLogPolicy(LogSamplingRules(default_sample_rate=0.0))
+        assert policy.access_level("/a", 200, 1.0) is None
+
+    def test_errors_and_slow_requests_are_always_logged(self):
+        """Test that 5xx and slow requests bypass sampling."""
+        policy = AccessLogPolicy(LogSamplingRules(default_sample_rate=0.0, slow_request_ms=500))
+        assert policy.access_level("/a", 503, 1.0) == "error"
+        assert policy.access_level("/a", 200, 500.0) == "warning"
+
+    def test_route_rate_overrides_default(self):
+        """Test that a per-route rate takes precedence over the default."""
+        policy = AccessLogPolicy(
+            LogSamplingRules(
+                default_sample_rate=0.0, routes={"/health": RouteLogRule(sample_rate=1.0)}
+            )
+        )
+        assert policy.access_level("/health", 200, 1.0) == "info"
+        assert policy.access_level("/other", 200, 1.0) is None
+
+    def test_partial_rate_samples(self, monkeypatch):
+        """Test that a rate between 0 and 1 keeps roughly that fraction."""
+        policy = AccessLogPolicy(LogSamplingRules(default_sample_rate=0.25))
+        monkeypatch.setattr(log_sampling.random, "random", lambda: 0.2)
+        assert policy.access_level("/a", 200, 1.0) == "info"
+        monkeypatch.setattr(log_sampling.random, "random", lambda: 0.3)
+        assert policy.access_level("/a", 200, 1.0) is None
+
+    def test_invalid_rule_rejected(self):
+        """Test that out-of-range rates and unknown levels are rejected."""
+        with pytest.raises(ValueError):
+            RouteLogRule(sample_rate=1.5)
+        with pytest.raises(ValueError):
+            RouteLogRule(level="loud")
+
+
+class TestRouteLevelFilter:
+    """Test the structlog processor applying per-route levels."""
+
+    def test_drops_events_below_route_level(self, policy):
+        """Test that events below the route's level are dropped inside that route."""
+        policy.update(LogSamplingRules(routes={"/quiet": RouteLogRule(level="warning")}))
+        scope = {"route": type("Route", (), {"path_format": "/quiet"})(), "path": "/quiet"}
+        token = bind_request_scope(scope)
+        try:
+            with pytest.raises(structlog.DropEvent):
+                route_level_filter(None, "info", {"event": "chatty"})
+            assert route_level_filter(None, "error", {"event": "bad"}) == {"event": "bad"}
+        finally:
+            unbind_request_scope(token)
+
+    def test_passes_events_outside_requests(self, policy):
+        """Test that events outside a request are never filtered."""
+        policy.update(LogSamplingRules(routes={"/quiet": RouteLogRule(level="critical")}))
+        assert route_level_filter(None, "debug", {"event": "startup"}) == {"event": "startup"}
+
+
+class TestSampledAccessLog:
+    """Test the access line written by RequestMiddleware."""
+
+    def test_single_access_line_per_request(self, sampled_client, policy, access_log):
+        """Test that a request produces one http_request line with its route template."""
+        sampled_client.get("/things/7")
+        assert len(access_log.records) == 1
+        level, event, fields = access_log.records[0]
+        assert (level, event) == ("info", "http_request")
+        assert fields["route"] == "/things/{thing_id}"
+        assert fields["path"] == "/things/7"
+        assert fields["status_code"] == 200
+        assert fields["sample_rate"] == 1.0
+
+    def test_sampled_out_request_not_logged(self, sampled_client, policy, access_log):
+        """Test that a sampled-out request writes no access line."""
+        policy.update(LogSamplingRules(default_sample_rate=0.0))
+        sampled_client.get("/things/7")
+        assert access_log.records == []
+
+    def test_server_error_logged_despite_sampling(self, sampled_client, policy, access_log):
+        """Test that a 500 is logged at error level even with sampling at zero."""
+        policy.update(LogSamplingRules(default_sample_rate=0.0))
+        response = sampled_client.get("/broken")
+        assert response.status_code == 500
+        assert [(level, event) for level, event, _ in access_log.records] == [
+            ("error", "http_request")
+        ]
@@ -1,8 +1,17 @@
 """Test logging configuration."""
 
+import io
+import json
+import threading
 
-
-from app.core.logging import configure_logging, get_logger
+from app.core import logging as app_logging
+from app.core.logging import (
+    LogQueue,
+    configure_logging,
+    get_logger,
+    log_queue_stats,
+    shutdown_logging,
+)
 
 
 class TestLogging:
@@ -29,3 +38,107 @@ class TestLogging:
         logger = get_logger("test")
         bound_logger = logger.bind(request_id="12345")
         assert bound_logger is not None
+
+
+class BlockingStream(io.BytesIO):
+    """Stream whose writes wait until released, to simulate a stalled stdout pipe."""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, data):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(data)
+
+
+class TestLogQueue:
+    """Test the queued, batched log writer."""
+
+    def test_records_are_written_as_json_lines(self):
+        """Test that event dicts are serialized one per line."""
+        stream = io.BytesIO()
+        log_queue = LogQueue(stream)
+        log_queue.put({"event": "first", "n": 1})
+        log_queue.put("plain line")
+        log_queue.close()
+
+        lines = stream.getvalue().decode().splitlines()
+        assert json.loads(lines[0]) == {"event": "first", "n": 1}
+        assert lines[1] == "plain line"
+        assert log_queue.stats()["written"] == 2
+
+    def test_full_queue_drops_and_counts(self):
+        """Test that records are dropped, counted and reported when the queue is full."""
+        stream = BlockingStream()
+        log_queue = LogQueue(stream, maxsize=1, overflow="drop")
+        log_queue.put({"event": "a"})
+        assert stream.writing.wait(5)
+        log_queue.put({"event": "b"})
+        log_queue.put({"event": "c"})
+        assert log_queue.stats()["dropped"] == 1
+
+        stream.release.set()
+        log_queue.close()
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [event["event"] for event in events] == ["a", "b", "log_records_dropped"]
+        assert events[-1]["count"] == 1
+
+    def test_writes_after_close_are_synchronous(self):
+        """Test that records logged after shutdown are still written."""
+        stream = io.BytesIO()
+        log_queue = LogQueue(stream)
+        log_queue.close()
+        log_queue.put({"event": "late"})
+        assert json.loads(stream.getvalue()) == {"event": "late"}
+
+    def test_queued_structlog_pipeline(self, capsys):
+        """Test that structlog events go through the queue when queued mode is on."""
+        configure_logging(json_logs=True, log_level="INFO", queued=True)
+        try:
+            get_logger("queued_test").info("queued_event", key="value")
+            get_logger("queued_test").debug("filtered_event")
+            assert "dropped" in log_queue_stats()
+        finally:
+            shutdown_logging()
+            configure_logging(json_logs=False, log_level="INFO")
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line]
+        events = [line["event"] for line in lines]
+        assert "queued_event" in events
+        assert "filtered_event" not in events
+        record = lines[events.index("queued_event")]
+        assert record["key"] == "value"
+        assert record["logger"] == "queued_test"
+
+    def test_reconfigure_reaches_existing_loggers(self, capsys):
+        """Test that a logger used before a reconfigure follows the new configuration."""
+        logger = get_logger("reconfigured_test")
+        configure_logging(json_logs=True, log_level="INFO", queued=True)
+        try:
+            logger.info("first_event")
+            configure_logging(json_logs=False, log_level="INFO", queued=True)
+            logger.info("second_event")
+        finally:
+            shutdown_logging()
+            configure_logging(json_logs=False, log_level="INFO")
+
+        lines = [line for line in capsys.readouterr().out.splitlines() if "_event" in line]
+        assert json.loads(lines[0])["event"] == "first_event"
+        assert "second_event" in lines[1]
+        assert not lines[1].startswith("{")
+
+    def test_shutdown_registered_once(self, monkeypatch):
+        """Test that reconfiguring does not stack atexit flush handlers."""
+        registered = []
+        monkeypatch.setattr(app_logging, "_shutdown_registered", False)
+        monkeypatch.setattr(app_logging.atexit, "register", registered.append)
+        try:
+            for _ in range(3):
+                configure_logging(json_logs=True, log_level="INFO", queued=True)
+        finally:
+            shutdown_logging()
+            configure_logging(json_logs=False, log_level="INFO")
+        assert registered == [shutdown_logging]
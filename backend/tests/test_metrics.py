@@ -0,0 +1,68 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import StatsCollector, render_metrics
+
+
+def get_auth_headers(client: TestClient) -> dict:
+    response = client.post(
+        "/api/v1/auth/login", data={"username": "test_user", "password": "user123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestMetricsEndpoint:
+    """Tests for /metrics."""
+
+    def test_text_exposition_format(self, client: TestClient):
+        """Test that metrics are served in the Prometheus text format."""
+        client.get("/api/v1/health/")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+    def test_routes_are_labelled_by_template(self, client: TestClient):
+        """Test that path parameters do not end up in label values."""
+        headers = get_auth_headers(client)
+        client.get("/api/v1/items/1", headers=headers)
+        client.get("/api/v1/items/2", headers=headers)
+
+        text = client.get("/metrics").text
+        assert 'route="/api/v1/items/{item_id}"' in text
+        assert 'route="/api/v1/items/1"' not in text
+
+    def test_status_and_size_metrics(self, client: TestClient):
+        """Test status counts, request/response sizes and the in-progress gauge."""
+        client.get("/does-not-exist")
+        text = client.get("/metrics").text
+        assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in text
+        assert "http_request_size_bytes_bucket" in text
+        assert "http_response_size_bytes_sum" in text
+        assert "http_requests_in_progress" in text
+
+    def test_application_stats(self, client: TestClient):
+        """Test that pool, hasher and principal cache stats are exposed as gauges."""
+        text = client.get("/metrics").text
+        assert "db_pool_checked_out" in text
+        assert "password_hasher_in_flight" in text
+        assert "principal_cache_hits" in text
+
+
+class TestMultiprocess:
+    """Tests for multiprocess mode."""
+
+    def test_render_from_multiproc_dir(self, tmp_path, monkeypatch):
+        """Test that metrics are aggregated from the shared directory when configured."""
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        body, content_type = render_metrics()
+        assert content_type.startswith("text/plain")
+        # Per-process stats are labelled with the worker pid
+        assert b'pid="' in body
+
+    def test_stats_collector_skips_non_numeric(self):
+        """Test that only numeric stats become gauges."""
+        collector = StatsCollector({"demo": lambda: {"count": 3, "name": "x", "ok": True}})
+        names = [metric.name for metric in collector.collect()]
+        assert names == ["demo_count"]
@@ -33,3 +33,43 @@ class TestMiddleware:
         assert response.status_code == 200
         assert "x-process-time" in response.headers
         assert "x-content-type-options" in response.headers
+
+    def test_streaming_response_passes_through(self):
+        """Test that streamed bodies are forwarded chunk by chunk with headers added."""
+        from fastapi import FastAPI
+        from fastapi.responses import StreamingResponse
+
+        from app.core.middleware import RequestMiddleware
+
+        test_app = FastAPI()
+
+        @test_app.get("/stream")
+        async def stream():
+            async def chunks():
+                for i in range(3):
+                    yield f"chunk{i}\n"
+
+            return StreamingResponse(chunks(), media_type="text/plain")
+
+        test_app.add_middleware(RequestMiddleware)
+        with TestClient(test_app).stream("GET", "/stream") as response:
+            body = "".join(response.iter_text())
+        assert body == "chunk0\nchunk1\nchunk2\n"
+        assert response.headers["x-frame-options"] == "DENY"
+        assert "x-process-time" in response.headers
+
+    def test_existing_security_header_is_kept(self):
+        """Test that a header set by the endpoint is not duplicated or overridden."""
+        from fastapi import FastAPI, Response
+
+        from app.core.middleware import RequestMiddleware
+
+        test_app = FastAPI()
+
+        @test_app.get("/framed")
+        async def framed():
+            return Response("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+
+        test_app.add_middleware(RequestMiddleware)
+        response = TestClient(test_app).get("/framed")
+        assert response.headers.get_list("x-frame-options") == ["SAMEORIGIN"]
@@ -0,0 +1,207 @@
+"""Test the precomputed OpenAPI document and docs pages."""
+
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI, Query
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core.openapi import FINGERPRINT_KEY, export_openapi, route_fingerprint, setup_openapi
+from app.main import app as main_app
+
+OPENAPI_URL = "/openapi.json"
+
+
+def make_app(**kwargs):
+    app = FastAPI(title="Test API", openapi_url=None, docs_url=None, redoc_url=None)
+
+    @app.get("/things/{thing_id}")
+    def read_thing(thing_id: int):
+        return {"thing_id": thing_id}
+
+    cache = setup_openapi(app, OPENAPI_URL, **kwargs)
+    return app, cache
+
+
+class TestOpenAPIDocument:
+    """Test how the document is served."""
+
+    def test_identity(self):
+        """Test the uncompressed document, its validators and cache headers."""
+        app, _ = make_app(max_age=600)
+        response = TestClient(app).get(OPENAPI_URL, headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["cache-control"] == "public, max-age=600"
+        assert response.headers["etag"].startswith('"openapi-')
+        assert "content-encoding" not in response.headers
+        schema = response.json()
+        assert "/things/{thing_id}" in schema["paths"]
+        assert schema[FINGERPRINT_KEY] == route_fingerprint(app)
+
+    def test_precompressed_variants(self):
+        """Test that each encoding is served from its own bytes under its own tag."""
+        app, cache = make_app()
+        client = TestClient(app)
+        identity = client.get(OPENAPI_URL, headers={"Accept-Encoding": "identity"})
+        gzipped = client.get(OPENAPI_URL, headers={"Accept-Encoding": "gzip"})
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.headers["vary"] == "Accept-Encoding"
+        assert gzipped.headers["etag"] != identity.headers["etag"]
+        assert gzip.decompress(cache.document().bodies["gzip"]) == identity.content
+
+    def test_brotli(self):
+        """Test the brotli variant when the client prefers it."""
+        pytest.importorskip("brotli")
+        app, _ = make_app()
+        response = TestClient(app).get(OPENAPI_URL, headers={"Accept-Encoding": "gzip;q=0.5, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert "paths" in response.json()
+
+    def test_not_modified(self):
+        """Test that any representation's tag revalidates, and other tags do not."""
+        app, _ = make_app()
+        client = TestClient(app)
+        etag = client.get(OPENAPI_URL, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        response = client.get(
+            OPENAPI_URL, headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["cache-control"].startswith("public")
+        response = client.get(OPENAPI_URL, headers={"If-None-Match": '"openapi-stale"'})
+        assert response.status_code == 200
+
+    def test_root_path_in_servers(self):
+        """Test that a proxy prefix is advertised, in a document of its own."""
+        app, cache = make_app()
+        response = TestClient(app, root_path="/proxy").get(OPENAPI_URL)
+        assert response.json()["servers"] == [{"url": "/proxy"}]
+        assert "servers" not in json.loads(cache.document().bodies["identity"])
+
+
+class TestOpenAPIBuild:
+    """Test when the document is built."""
+
+    def test_built_once(self, monkeypatch):
+        """Test that repeated fetches reuse the encoded document."""
+        app, cache = make_app()
+        calls = []
+        original = app.openapi
+        monkeypatch.setattr(app, "openapi", lambda: calls.append(1) or original())
+        client = TestClient(app)
+        for _ in range(3):
+            client.get(OPENAPI_URL)
+        assert len(calls) == 1
+        assert cache.builds == 1
+
+    def test_refresh_only_when_routes_change(self):
+        """Test that refresh keeps a current document and rebuilds a stale one."""
+        app, cache = make_app()
+        assert cache.refresh() is True
+        assert cache.refresh() is False
+
+        @app.get("/widgets")
+        def read_widgets():
+            return []
+
+        assert cache.refresh() is True
+        assert cache.builds == 2
+        assert "/widgets" in json.loads(cache.document().bodies["identity"])["paths"]
+
+    def test_schema_file(self, tmp_path):
+        """Test that an exported file matching the routes is served as-is."""
+        app, _ = make_app()
+        schema = json.loads(export_openapi(app))
+        schema["info"]["description"] = "from the build"
+        path = tmp_path / "openapi.json"
+        path.write_text(json.dumps(schema))
+
+        app, cache = make_app(schema_file=str(path))
+        response = TestClient(app).get(OPENAPI_URL)
+        assert response.json()["info"]["description"] == "from the build"
+
+    def test_stale_or_missing_schema_file(self, tmp_path):
+        """Test that a file for other routes, or no file, falls back to the app."""
+        path = tmp_path / "openapi.json"
+        path.write_text(json.dumps({"paths": {}, FINGERPRINT_KEY: "0000"}))
+        for schema_file in (path, tmp_path / "missing.json"):
+            app, _ = make_app(schema_file=str(schema_file))
+            response = TestClient(app).get(OPENAPI_URL)
+            assert "/things/{thing_id}" in response.json()["paths"]
+
+    def test_schema_file_stale_after_model_change(self, tmp_path):
+        """Test that adding a field to a response model rebuilds the document from the app."""
+
+        def make_model_app(model):
+            app = FastAPI(title="Test API", openapi_url=None, docs_url=None, redoc_url=None)
+
+            @app.get("/things/{thing_id}", response_model=model)
+            def read_thing(thing_id: int):
+                return {"thing_id": thing_id}
+
+            return app
+
+        class Thing(BaseModel):
+            thing_id: int
+
+        path = tmp_path / "openapi.json"
+        path.write_bytes(export_openapi(make_model_app(Thing)))
+
+        class Thing(BaseModel):  # noqa: F811 - the same model after a deploy
+            thing_id: int
+            name: str = ""
+
+        app = make_model_app(Thing)
+        cache = setup_openapi(app, OPENAPI_URL, schema_file=str(path))
+        schema = TestClient(app).get(OPENAPI_URL).json()
+        assert "name" in schema["components"]["schemas"]["Thing"]["properties"]
+        assert schema[FINGERPRINT_KEY] != json.loads(path.read_bytes())[FINGERPRINT_KEY]
+        assert cache.builds == 1
+
+    def test_fingerprint_covers_parameters(self):
+        """Test that changing a query parameter changes the fingerprint."""
+
+        def make_param_app(default: int):
+            app = FastAPI(title="Test API", openapi_url=None)
+
+            @app.get("/things")
+            def read_things(limit: int = Query(default, le=100)):
+                return []
+
+            return app
+
+        assert route_fingerprint(make_param_app(10)) == route_fingerprint(make_param_app(10))
+        assert route_fingerprint(make_param_app(10)) != route_fingerprint(make_param_app(20))
+
+
+class TestDocsPages:
+    """Test the Swagger UI and ReDoc pages."""
+
+    def test_pages(self):
+        """Test that the pages point at the document."""
+        app, _ = make_app()
+        client = TestClient(app)
+        for url in ("/docs", "/redoc"):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert OPENAPI_URL in response.text
+        assert client.get("/docs/oauth2-redirect").status_code == 200
+
+    def test_disabled(self):
+        """Test that the pages can be left out."""
+        app, _ = make_app(docs_url=None, redoc_url=None)
+        client = TestClient(app)
+        assert client.get("/docs").status_code == 404
+        assert client.get("/redoc").status_code == 404
+        assert client.get(OPENAPI_URL).status_code == 200
+
+    def test_main_app(self):
+        """Test that the application serves its document under the API prefix."""
+        client = TestClient(main_app)
+        response = client.get("/api/v1/openapi.json")
+        assert response.status_code == 200
+        assert "/api/v1/auth/login" in response.json()["paths"]
+        assert client.get("/docs").status_code == 200
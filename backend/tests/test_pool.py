@@ -0,0 +1,69 @@
+"""Tests for the instrumented connection pool."""
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.pool import InstrumentedQueuePool, pool_status, warm_pool
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def small_engine():
+    """Engine with a single-connection pool and a short checkout timeout."""
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestInstrumentedPool:
+    """Tests for pool statistics and warm-up."""
+
+    def test_checkouts_are_counted(self, small_engine):
+        """Test that each checkout is recorded."""
+        with small_engine.connect():
+            pass
+        with small_engine.connect():
+            pass
+
+        status = pool_status(small_engine.pool)
+        assert status["checkouts"] == 2
+        assert status["timeouts"] == 0
+
+    def test_timeout_is_counted(self, small_engine):
+        """Test that a checkout timing out on an exhausted pool is recorded."""
+        with small_engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                small_engine.connect()
+
+        status = pool_status(small_engine.pool)
+        assert status["timeouts"] == 1
+        assert status["wait_seconds_max"] >= 0.1
+
+    def test_warm_pool_leaves_connections_checked_in(self):
+        """Test that warm-up opens connections and returns them to the pool."""
+        engine = create_engine(TEST_DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=3)
+        try:
+            warm_pool(engine, 3)
+            status = pool_status(engine.pool)
+            assert status["checked_in"] == 3
+            assert status["checked_out"] == 0
+        finally:
+            engine.dispose()
+
+
+class TestPoolEndpoint:
+    """Tests for the pool gauges endpoint."""
+
+    def test_pool_status(self, client):
+        """Test that the endpoint reports gauges and counters."""
+        response = client.get("/api/v1/health/pool")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ("size", "checked_in", "checked_out", "overflow", "checkouts", "timeouts"):
+            assert key in data
@@ -0,0 +1,141 @@
+"""Tests for read-replica routing."""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.replicas import REPLICAS_KEY, ReplicaSet, RoutingSession, use_primary
+from app.models import Item
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def engines():
+    """A primary and two "replica" engines, all pointing at the test database."""
+    created = [create_engine(TEST_DATABASE_URL) for _ in range(3)]
+    yield created
+    for engine in created:
+        engine.dispose()
+
+
+def make_replica_set(engines, lags=None, **kwargs) -> ReplicaSet:
+    replica_set = ReplicaSet(engines, **kwargs)
+    if lags is not None:
+        replica_set.measure_lag = lambda replica: lags[replica.engine]
+    return replica_set
+
+
+class TestReplicaSet:
+    """Tests for replica selection."""
+
+    def test_round_robin(self, engines):
+        """Test that healthy replicas are used in turn."""
+        _, first, second = engines
+        replica_set = make_replica_set([first, second], lags={first: 0.0, second: 0.0})
+        assert [replica_set.choose() for _ in range(4)] == [first, second, first, second]
+
+    def test_least_connections(self, engines):
+        """Test that the replica with fewer checked-out connections is chosen."""
+        _, first, second = engines
+        replica_set = make_replica_set(
+            [first, second],
+            lags={first: 0.0, second: 0.0},
+            balancing="least_connections",
+        )
+        with first.connect():
+            assert replica_set.choose() is second
+
+    def test_lagging_replica_is_skipped(self, engines):
+        """Test that a replica beyond the lag limit is not chosen."""
+        _, first, second = engines
+        replica_set = make_replica_set(
+            [first, second], lags={first: 30.0, second: 0.0}, max_lag=5.0
+        )
+        assert {replica_set.choose() for _ in range(3)} == {second}
+
+    def test_all_lagging_falls_back_to_primary(self, engines):
+        """Test that no replica is returned when every replica lags."""
+        _, first, second = engines
+        replica_set = make_replica_set(
+            [first, second], lags={first: 30.0, second: 30.0}, max_lag=5.0
+        )
+        assert replica_set.choose() is None
+
+    def test_unreachable_replica_is_skipped(self, engines):
+        """Test that a replica whose lag check fails is treated as unhealthy."""
+        _, first, _ = engines
+        replica_set = ReplicaSet([first])
+
+        def fail(replica):
+            raise ConnectionError("replica down")
+
+        replica_set.measure_lag = fail
+        assert replica_set.choose() is None
+        assert replica_set.status()[0]["healthy"] is False
+
+    def test_lag_is_cached(self, engines):
+        """Test that lag is measured at most once per check interval."""
+        _, first, _ = engines
+        calls = []
+        replica_set = ReplicaSet([first], check_interval=60)
+        replica_set.measure_lag = lambda replica: calls.append(replica) or 0.0
+        for _ in range(5):
+            replica_set.choose()
+        assert len(calls) == 1
+
+    def test_primary_reports_zero_lag(self, engines):
+        """Test that the lag query reports no lag for a server that is not a standby."""
+        _, first, _ = engines
+        replica_set = ReplicaSet([first])
+        assert replica_set.measure_lag(replica_set.replicas[0]) == 0
+
+    def test_unknown_balancing(self, engines):
+        """Test that an unknown strategy is rejected."""
+        with pytest.raises(ValueError):
+            ReplicaSet(engines, balancing="random")
+
+
+class TestRoutingSession:
+    """Tests for routing statements between primary and replicas."""
+
+    @pytest.fixture
+    def session(self, engines):
+        primary, replica, _ = engines
+        replica_set = make_replica_set([replica], lags={replica: 0.0})
+        factory = sessionmaker(
+            class_=RoutingSession, bind=primary, info={REPLICAS_KEY: replica_set}
+        )
+        db = factory()
+        yield db
+        db.rollback()
+        db.close()
+
+    def test_select_uses_replica(self, session, engines):
+        """Test that reads are sent to a replica."""
+        _, replica, _ = engines
+        assert session.get_bind(clause=select(Item)) is replica
+
+    def test_read_your_writes(self, session, engines):
+        """Test that the session sticks to the primary after a flush."""
+        primary, _, _ = engines
+        session.add(Item(name="Sticky", price=1))
+        session.flush()
+        assert session.get_bind(clause=select(Item)) is primary
+        assert session.query(Item).filter(Item.name == "Sticky").one().price == 1
+
+    def test_use_primary(self, session, engines):
+        """Test that a session pinned to the primary reads from it."""
+        primary, _, _ = engines
+        use_primary(session)
+        assert session.get_bind(clause=select(Item)) is primary
+
+    def test_without_replicas_uses_primary(self, engines):
+        """Test that a routing session with no replicas behaves like a plain session."""
+        primary, _, _ = engines
+        db = sessionmaker(
+            class_=RoutingSession, bind=primary, info={REPLICAS_KEY: ReplicaSet([])}
+        )()
+        try:
+            assert db.get_bind(clause=select(Item)) is primary
+        finally:
+            db.close()
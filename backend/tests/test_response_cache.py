@@ -0,0 +1,287 @@
+"""Test the response cache, its backends and single-flight loading."""
+
+import asyncio
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from app.core.response_cache import (
+    MemoryCacheBackend,
+    NullCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    SingleFlight,
+    cache_key,
+)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryCacheBackend(maxsize=100, ttl=60)
+    return RedisCacheBackend(client=fakeredis.FakeRedis())
+
+
+class TestCacheKey:
+    """Test cache key construction."""
+
+    def test_params_are_sorted_and_none_dropped(self):
+        """Test that equal parameter sets give equal keys regardless of order."""
+        assert cache_key("items", sort="id", limit=10, cursor=None) == cache_key(
+            "items", limit=10, sort="id"
+        )
+        assert cache_key("items", limit=10) != cache_key("items", limit=20)
+        assert cache_key("items", limit=10) != cache_key("other", limit=10)
+
+
+class TestBackends:
+    """Behaviour shared by the memory and Redis backends."""
+
+    def test_set_and_get(self, backend):
+        """Test that a stored payload is returned as equal JSON data."""
+        backend.set("k", {"item_id": 1, "name": "a"}, 60, ("item:1",))
+        assert backend.get("k") == {"item_id": 1, "name": "a"}
+        assert backend.get("missing") is None
+
+    def test_invalidate_by_tag(self, backend):
+        """Test that invalidating a tag drops only the entries stored under it."""
+        backend.set("page", [1, 2], 60, ("items",))
+        backend.set("one", {"item_id": 1}, 60, ("item:1",))
+        backend.set("two", {"item_id": 2}, 60, ("item:2",))
+        backend.invalidate(("items", "item:1"))
+        assert backend.get("page") is None
+        assert backend.get("one") is None
+        assert backend.get("two") == {"item_id": 2}
+
+    def test_set_skipped_after_invalidation(self, backend):
+        """Test that a payload loaded before an invalidation of its tags is not stored."""
+        generation = backend.generation(("items",))
+        backend.invalidate(("items",))
+        backend.set("k", "stale", 60, ("items",), generation)
+        assert backend.get("k") is None
+        backend.set("k", "fresh", 60, ("items",), backend.generation(("items",)))
+        assert backend.get("k") == "fresh"
+
+    def test_entries_expire(self, backend):
+        """Test that entries expire after their TTL."""
+        backend.set("k", 1, 0.05, ())
+        time.sleep(0.1)
+        assert backend.get("k") is None
+
+
+class TestMemoryBackend:
+    """Test memory backend specifics."""
+
+    def test_lru_eviction_prunes_tag_index(self):
+        """Test that evicted keys do not pile up in the tag index."""
+        backend = MemoryCacheBackend(maxsize=2, ttl=60)
+        for item_id in range(10):
+            backend.set(f"k{item_id}", item_id, 60, (f"item:{item_id}",))
+        assert backend.stats()["entries"] == 2
+        assert len(backend._tags) <= 4
+
+
+class TestRedisBackend:
+    """Test Redis backend specifics."""
+
+    def test_errors_degrade_to_misses(self):
+        """Test that an unreachable Redis is treated as an empty cache."""
+        server = fakeredis.FakeServer()
+        server.connected = False
+        backend = RedisCacheBackend(client=fakeredis.FakeRedis(server=server))
+        assert backend.get("k") is None
+        backend.set("k", 1, 60, ("items",))
+        backend.invalidate(("items",))
+
+    def test_invalidation_in_another_worker(self):
+        """Test that one worker's load racing another's write is not stored."""
+        server = fakeredis.FakeServer()
+        first = ResponseCache(RedisCacheBackend(client=fakeredis.FakeRedis(server=server)), 60)
+        second = ResponseCache(RedisCacheBackend(client=fakeredis.FakeRedis(server=server)), 60)
+
+        def stale_load():
+            first.invalidate("item:1")
+            return "stale"
+
+        assert second.get_or_load("k", ("items", "item:1"), stale_load) == "stale"
+        assert second.get_or_load("k", ("items", "item:1"), lambda: "fresh") == "fresh"
+        assert first.get_or_load("k", ("items", "item:1"), lambda: "unused") == "fresh"
+
+    def test_generation_unknown_when_unreachable(self):
+        """Test that nothing is stored when the generation could not be read."""
+        server = fakeredis.FakeServer()
+        backend = RedisCacheBackend(client=fakeredis.FakeRedis(server=server))
+        server.connected = False
+        generation = backend.generation(("items",))
+        server.connected = True
+        backend.set("k", 1, 60, ("items",), generation)
+        assert backend.get("k") is None
+
+    def test_shared_between_instances(self):
+        """Test that two processes' backends on one server see each other's writes."""
+        server = fakeredis.FakeServer()
+        first = RedisCacheBackend(client=fakeredis.FakeRedis(server=server))
+        second = RedisCacheBackend(client=fakeredis.FakeRedis(server=server))
+        first.set("k", {"v": 1}, 60, ("items",))
+        assert second.get("k") == {"v": 1}
+        second.invalidate(("items",))
+        assert first.get("k") is None
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent loads."""
+
+    def test_concurrent_threads_share_one_call(self):
+        """Test that threads missing on one key run the loader once."""
+        flight = SingleFlight()
+        calls = 0
+        release = threading.Event()
+
+        def load():
+            nonlocal calls
+            calls += 1
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", load))) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        while flight.coalesced < 7:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert calls == 1
+        assert results == ["value"] * 8
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failed load raises in the leader and is not remembered."""
+        flight = SingleFlight()
+
+        def fail():
+            raise LookupError
+
+        with pytest.raises(LookupError):
+            flight.do("k", fail)
+        assert flight.do("k", lambda: "retry") == "retry"
+
+    def test_concurrent_tasks_share_one_call(self):
+        """Test that tasks missing on one key await the loader once."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def main():
+            return await asyncio.gather(*(flight.ado("k", load) for _ in range(8)))
+
+        assert asyncio.run(main()) == ["value"] * 8
+        assert calls == 1
+        assert flight.coalesced == 7
+
+    def test_cancelled_leader_does_not_fail_followers(self):
+        """Test that the load outlives a cancelled caller and still reaches the others."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "value"
+
+        async def main():
+            leader = asyncio.create_task(flight.ado("k", load))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(flight.ado("k", load)) for _ in range(3)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            results = await asyncio.gather(*followers)
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return results
+
+        assert asyncio.run(main()) == ["value"] * 3
+        assert calls == 1
+
+    def test_async_errors_reach_every_caller(self):
+        """Test that a failed async load raises in every caller and is not remembered."""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise LookupError
+
+        async def retry():
+            return "retry"
+
+        async def main():
+            results = await asyncio.gather(
+                *(flight.ado("k", fail) for _ in range(3)), return_exceptions=True
+            )
+            return results, await flight.ado("k", retry)
+
+        results, retried = asyncio.run(main())
+        assert all(isinstance(result, LookupError) for result in results)
+        assert retried == "retry"
+
+
+class TestResponseCache:
+    """Test read-through loading and invalidation."""
+
+    def test_second_read_is_a_hit(self):
+        """Test that the loader only runs on a miss."""
+        cache = ResponseCache(MemoryCacheBackend(100, 60), ttl=60)
+        loads = []
+        for _ in range(3):
+            assert cache.get_or_load("k", ("items",), lambda: loads.append(1) or {"v": 1}) == {
+                "v": 1
+            }
+        assert len(loads) == 1
+        assert cache.stats()["hits"] == 2
+
+    def test_invalidation_during_load_is_not_overwritten(self):
+        """Test that a load racing a write does not cache the pre-write payload."""
+        cache = ResponseCache(MemoryCacheBackend(100, 60), ttl=60)
+
+        def stale_load():
+            cache.invalidate("items")
+            return "stale"
+
+        assert cache.get_or_load("k", ("items",), stale_load) == "stale"
+        assert cache.get_or_load("k", ("items",), lambda: "fresh") == "fresh"
+
+    def test_async_read_through_with_blocking_backend(self):
+        """Test the async path against a backend that runs in the threadpool."""
+        cache = ResponseCache(RedisCacheBackend(client=fakeredis.FakeRedis()), ttl=60)
+
+        async def load():
+            return [1, 2]
+
+        async def main():
+            first = await cache.aget_or_load("k", ("items",), load)
+            second = await cache.aget_or_load("k", ("items",), load)
+            await cache.ainvalidate("items")
+            third = await cache.aget_or_load("k", ("items",), load)
+            return first, second, third
+
+        assert asyncio.run(main()) == ([1, 2], [1, 2], [1, 2])
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_null_backend_never_stores(self):
+        """Test that the none backend always calls the loader."""
+        cache = ResponseCache(NullCacheBackend(), ttl=60)
+        loads = []
+        cache.get_or_load("k", (), lambda: loads.append(1))
+        cache.get_or_load("k", (), lambda: loads.append(1))
+        assert len(loads) == 2
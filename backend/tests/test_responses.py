@@ -0,0 +1,62 @@
+"""Test JSON response classes."""
+
+import json
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse, PydanticJSONResponse
+from app.schemas.item import ItemResponse
+
+
+class TestFastJSONResponse:
+    """Test the orjson-backed default response class."""
+
+    def test_renders_plain_data(self):
+        """Test that dicts and lists render compactly as UTF-8 JSON."""
+        response = FastJSONResponse([{"item_id": 1, "name": "ä", "price": 1.5}])
+        assert response.body == '[{"item_id":1,"name":"ä","price":1.5}]'.encode()
+        assert response.headers["content-type"] == "application/json"
+
+    def test_renders_types_orjson_lacks(self):
+        """Test pydantic models, Decimal, datetimes and non-string keys."""
+        content = {
+            "model": ItemResponse(item_id=1, name="A", price=1.0),
+            "amount": Decimal("1.10"),
+            "at": datetime(2026, 1, 1, tzinfo=UTC),
+            1: "int key",
+        }
+        data = json.loads(FastJSONResponse(content).body)
+        assert data["model"] == {"name": "A", "price": 1.0, "item_id": 1, "q": None}
+        assert data["amount"] == "1.10"
+        assert data["at"].startswith("2026-01-01T00:00:00")
+        assert data["1"] == "int key"
+
+    def test_unknown_types_fall_back_to_str(self):
+        """Test that values nothing can serialize are rendered as strings."""
+        data = json.loads(FastJSONResponse({"error": ValueError("bad")}).body)
+        assert data == {"error": "bad"}
+
+
+class TestPydanticJSONResponse:
+    """Test direct pydantic-core serialization."""
+
+    def test_model(self):
+        """Test that a model is dumped by its own serializer."""
+        response = PydanticJSONResponse(ItemResponse(item_id=1, name="A", price=1.0))
+        assert isinstance(response.body, bytes)
+        assert json.loads(response.body) == {"name": "A", "price": 1.0, "item_id": 1, "q": None}
+
+    def test_list_with_adapter(self):
+        """Test that a TypeAdapter serializes a list of models in one pass."""
+        adapter = TypeAdapter(list[ItemResponse])
+        items = [ItemResponse(item_id=i, name=f"Item {i}", price=1.0) for i in range(3)]
+        data = json.loads(PydanticJSONResponse(items, adapter=adapter).body)
+        assert [item["item_id"] for item in data] == [0, 1, 2]
+
+    def test_requires_model_or_adapter(self):
+        """Test that arbitrary values are rejected."""
+        with pytest.raises(TypeError):
+            PydanticJSONResponse({"a": 1})